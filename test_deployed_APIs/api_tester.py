@@ -2,22 +2,78 @@ import requests
 import json
 import os
 import logging
+import threading
 import uuid
-from time import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from time import perf_counter, sleep
 from api_tester_config import APITesterConfig
+from auth_cache import auth_cache_key, token_expiry
+from body_policy import ACCEPT_ENCODING, add_transfer, parse_body_policy, read_body, summarize_transfer, transfer_sizes
+from case_expansion import expand_api_cases, route_template
+from latency_histogram import LatencyHistogram
+from request_timing import RequestTimer, TimedHTTPAdapter
+from result_writer import JsonlResultWriter
+from shard import filter_shard, shard_suffix
+from retry_policy import RetryPolicy
+
+# calls that can finish ahead of the oldest unfinished one, per worker
+PENDING_CALLS_PER_WORKER = 16
 
 class APITester:
-    def __init__(self, configs: APITesterConfig, script_dir, microservice, env):
+    def __init__(self, configs: APITesterConfig, script_dir, microservice, env, concurrency=1, slow_request_threshold=None, stream_results=False, body_policy="full", baseline=None, auth_cache=None, retry_policy=None, shard=None, metrics=None, cassette=None, history=None, pool_size=None, pool_block=False, verify_tls=True, accept_encoding=None, rate_limiter=None):
         self.results = {}
         self.config = configs
         self.status_log = {"200": [], "500": [], "Other": {}}
-        self.session = requests.Session()
+        self.latency_histograms = {}
         self.script_dir = script_dir
         self.microservice = microservice
         self.env = env
+        self.concurrency = max(1, concurrency)
+        # every concurrent call needs its own connection to the host, a smaller pool would keep opening and discarding them
+        self.pool_size = pool_size or max(10, self.concurrency)
+        self.pool_block = pool_block
+        self.session = requests.Session()
+        # one verify setting for every call: auth, session and API calls share the same pooled connections
+        self.session.verify = verify_tls
+        self.session.headers["Accept-Encoding"] = accept_encoding or ACCEPT_ENCODING
+        # a cassette records every exchange, auth and session calls included, or serves them back without network
+        for prefix in ("http://", "https://"):
+            adapter_class = cassette.adapter if cassette is not None else TimedHTTPAdapter
+            self.session.mount(prefix, adapter_class(pool_maxsize=self.pool_size, pool_block=pool_block, rate_limiter=rate_limiter))
+        self.connection_stats = {"new": 0, "reused": 0}
+        self.connection_stats_lock = threading.Lock()
+        self.rate_limiter = rate_limiter
+        self.rate_limit_stats = {"delayed_calls": 0, "wait_sec": 0.0}
+        self.rate_limit_stats_lock = threading.Lock()
+        self.transfer_stats = {}
+        self.wall_time = 0.0
+        self.slow_request_threshold = slow_request_threshold
+        self.slow_requests = []
+        self.stream_results = stream_results
+        self.result_writer = None
+        self.body_policy = body_policy
+        self.baseline = baseline
+        self.auth_cache = auth_cache
+        self.auth_cache_key = auth_cache_key(microservice, env, configs) if auth_cache is not None else None
+        self.auth_lock = threading.Lock()
+        self.token = None
+        self.session_id = None
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.shard = shard
+        self.metrics = metrics
+        self.history = history
+        self.history_recorder = None
         self.apis_to_test_file = os.path.join(script_dir, "api_configs", "apis_to_test_golia.json") if microservice == "golia" else os.path.join(script_dir, "api_configs", "apis_to_test.json")
 
-    def authenticate(self):
+    def authenticate(self, use_cache=True):
+        if use_cache and self.auth_cache is not None:
+            cached_token = self.auth_cache.get_token(self.auth_cache_key)
+            if cached_token:
+                self._set_token(cached_token)
+                print("Authentication skipped. JWT token reused from cache.")
+                return
+
         try:
 
             headers = {
@@ -30,52 +86,65 @@ class APITester:
                 self.config.auth_url,
                 data=self.config.auth_payload,
                 headers=headers,
-                verify=False
+                timeout=self.retry_policy.timeout
             )
 
             response.raise_for_status()
-            self.token = response.json().get("access_token")
+            token_response = response.json()
+            token = token_response.get("access_token")
 
-            if not self.token:
+            if not token:
                 raise ValueError("Authentication failed: No access_token in response.")
 
-            self.session.headers.update({"Authorization": f"Bearer {self.token}"})
+            self._set_token(token)
+            if self.auth_cache is not None:
+                self.auth_cache.put_token(self.auth_cache_key, token, token_expiry(token_response, token))
             print("Authentication successful. JWT token obtained.")
 
         except requests.exceptions.RequestException as e:
             print(f"Authentication failed: {e}")
             raise
     
-    def create_session(self):
+    def _set_token(self, token):
+        self.token = token
+        self.session.headers.update({"Authorization": f"Bearer {self.token}"})
+
+    def create_session(self, use_cache=True):
+        if use_cache and self.auth_cache is not None:
+            cached_session_id = self.auth_cache.get_session_id(self.auth_cache_key)
+            if cached_session_id:
+                self.session_id = cached_session_id
+                self.session.headers.update({"X-BEAR-SESSION-TOKEN": self.session_id})
+                print(f"Session creation skipped. session_id reused from cache: {self.session_id}")
+                return
+
         try:    
             headers = {
                 "Content-Type": "application/json",
                 "User-Agent": "APITester/1.0"
             }
 
-            self.session_id = ""
-
             if self.microservice == "golia":
                 # creating session
                 response = self.session.post(
                     f"{self.config.session_manager_url}/api/session",
                     json=self.config.golia_session_manager_create_payload,
                     headers=headers,
-                    verify=False
+                    timeout=self.retry_policy.timeout
                 )
 
                 response.raise_for_status()
-                self.session_id = response.json().get("payload")
+                session_id = response.json().get("payload")
 
-                if not self.session_id:
+                if not session_id:
                     raise ValueError("Error creating session with session manager. No sessionId was found")
 
                 # updating session
                 response = self.session.post(
-                    f"{self.config.session_manager_url}/api/session/customer/{self.session_id}",
+                    f"{self.config.session_manager_url}/api/session/customer/{session_id}",
                     json=self.config.golia_session_manager_update_payload,
                     headers=headers,
-                    verify=False
+                    timeout=self.retry_policy.timeout
                 )
 
                 response.raise_for_status()
@@ -86,16 +155,20 @@ class APITester:
                     self.config.session_manager_url,
                     json=self.config.session_manager_payload,
                     headers=headers,
-                    verify=False
+                    timeout=self.retry_policy.timeout
                 )
 
                 response.raise_for_status()
-                self.session_id = response.json().get("sessionId")
+                session_id = response.json().get("sessionId")
 
-                if not self.session_id:
+                if not session_id:
                     raise ValueError("Error creating session with session manager. No sessionId was found")
             
+            # the new id replaces the current one only once created, workers keep using the old one meanwhile
+            self.session_id = session_id
             self.session.headers.update({"X-BEAR-SESSION-TOKEN": self.session_id})
+            if self.auth_cache is not None:
+                self.auth_cache.put_session_id(self.auth_cache_key, self.session_id)
             print(f"Session created succesfully. session_id: {self.session_id}")
 
         except requests.exceptions.RequestException as e:
@@ -106,75 +179,445 @@ class APITester:
         logging.info(f"--------------------------------------------begin script run -------------------------------------------------")
         logging.info(f"microservice: {self.microservice}, env: {self.env}")
 
+        run_summary = None
+        if self.stream_results:
+            self.result_writer = JsonlResultWriter(self._results_filename("api_responses", "jsonl"))
+
         try:
-            apis_to_test = self._load_apis_to_test()
+            apis_to_test = self._expand_apis_to_test(self._load_apis_to_test())
+
+            self.history_recorder = self.history.start_run(self.microservice, self.env, "suite") if self.history is not None else None
+            start_time = perf_counter()
             total_response_time = self._call_all_apis(apis_to_test)
+            self.wall_time = perf_counter() - start_time
+
+            if self.history_recorder is not None:
+                self.history_recorder.finish(self.wall_time, self.latency_histograms)
+
+            if self.result_writer is None:
+                self._save_results_into_file(self._results_filename("api_responses"), self.results)
+            else:
+                run_summary = self._run_summary(total_response_time)
+
+            self._save_results_into_file(self._results_filename("api_status"), self.status_log)
+            self._save_results_into_file(self._results_filename("api_latency"), self._latency_histograms_to_dict())
+            self._save_results_into_file(self._results_filename("api_transfer"), self._transfer_summary())
+            if self.slow_request_threshold is not None:
+                self._save_results_into_file(self._results_filename("api_slow_requests"), self.slow_requests)
 
-            self._save_results_into_file(f"api_responses_{self.microservice}_{self.env}.json", self.results)
-            self._save_results_into_file(f"api_status_{self.microservice}_{self.env}.json", self.status_log)
+            if self.baseline is not None:
+                self.baseline.compare_latency(self.latency_histograms)
+                self._save_results_into_file(self._results_filename("api_baseline"), self.baseline.report())
 
         finally:
+            # a run interrupted halfway still leaves every call written so far on disk
+            if self.result_writer is not None:
+                self.result_writer.close(run_summary)
+                self.result_writer = None
+
             logging.info(f"--------------------------------------------end script run ---------------------------------------------------")
 
-        print(f"API testing completed. Total duration time: {round(total_response_time, 2)}s. Check log file and api_results/ directory for more infos.")
+        self._print_latency_summary()
+        self._print_connections_summary()
+        self._print_rate_limit_summary()
+        self._print_transfer_summary()
+        if self.baseline is not None:
+            self._print_baseline_summary()
+        print(f"<{self.microservice}> <{self.env}> API testing completed. Wall-clock time: {round(self.wall_time, 2)}s, summed response time: {round(total_response_time, 2)}s (concurrency: {self.concurrency}). Check log file and api_results/ directory for more infos.")
         return total_response_time
 
     def _load_apis_to_test(self):
         with open(self.apis_to_test_file, "r") as file:
-            return json.load(file)
+            apis_to_test = json.load(file)
+
+        # an invalid per-route policy fails the run before the first call instead of halfway through it
+        for api_info in apis_to_test:
+            validate_api_policies(api_info)
+
+        return apis_to_test
+
+    def _expand_apis_to_test(self, apis_to_test):
+        api_cases = expand_api_cases(apis_to_test, os.path.dirname(self.apis_to_test_file))
+        return filter_shard(api_cases, self.shard) if self.shard else api_cases
+
+    def _results_filename(self, prefix, extension="json"):
+        return f"{prefix}_{self.microservice}_{self.env}{shard_suffix(self.shard)}.{extension}"
 
     def _call_all_apis(self, apis_to_test):
         total_response_time = 0.0
-        for api_info in apis_to_test:
-            total_response_time += self._call_single_api_and_store_response(api_info)
+
+        if self.concurrency == 1:
+            for api_info in apis_to_test:
+                total_response_time += self._call_single_api_and_store_response(api_info) or 0.0
+            return total_response_time
+
+        # calls overlap, but responses are stored in the same order as apis_to_test
+        for api_info, outcome in self._call_apis_concurrently(apis_to_test):
+            total_response_time += self._store_response(api_info, outcome) or 0.0
         return total_response_time
 
+    def _call_apis_concurrently(self, apis_to_test):
+        api_cases = iter(apis_to_test)
+        # calls finishing ahead of a slow one are buffered, the workers keep going instead of waiting for it
+        max_pending = self.concurrency * PENDING_CALLS_PER_WORKER
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            pending = deque()
+            in_flight = set()
+            exhausted = False
+
+            while pending or not exhausted:
+                # keep every worker busy, within a bounded window of calls not yet yielded
+                while not exhausted and len(in_flight) < self.concurrency and len(pending) < max_pending:
+                    api_info = next(api_cases, None)
+                    if api_info is None:
+                        exhausted = True
+                        break
+                    future = executor.submit(self._call_single_api, api_info)
+                    pending.append((api_info, future))
+                    in_flight.add(future)
+
+                # outcomes are yielded in the order of apis_to_test as soon as the head of the window is done
+                while pending and pending[0][1].done():
+                    done_api_info, future = pending.popleft()
+                    yield done_api_info, future.result()
+
+                if in_flight:
+                    _, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+
     def _call_single_api_and_store_response(self, api_info):
+        return self._store_response(api_info, self._call_single_api(api_info))
+
+    def _call_single_api(self, api_info):
+        if self.metrics is not None:
+            self.metrics.request_started(self.microservice, self.env)
+        start_time = perf_counter()
+
+        # ties together the log lines of one call, retries and token refresh included
+        correlation_id = uuid.uuid4().hex
+        token = self.token
+        session_id = self.session_id
+        outcome = self._send_request(api_info, correlation_id)
+
+        # an expired token is refreshed once and the call retried, instead of failing every remaining call
+        if outcome.get("status_code") == 401 and token is not None and self._refresh_token(token):
+            logging.info("API: %s returned 401, retrying with a refreshed token", api_info["route"], extra=self._log_context(api_info, correlation_id))
+            outcome = self._send_request(api_info, correlation_id)
+
+            # still refused with a new token: the session manager session expired too (e.g. in a long --watch run)
+            if outcome.get("status_code") == 401 and session_id and self._refresh_session(session_id):
+                logging.info("API: %s returned 401 with a refreshed token, retrying with a new session", api_info["route"], extra=self._log_context(api_info, correlation_id))
+                outcome = self._send_request(api_info, correlation_id)
+        outcome["correlation_id"] = correlation_id
+
+        # the live duration covers retries and the token refresh, as seen by whoever scrapes the run
+        if self.metrics is not None:
+            self.metrics.request_finished(self.microservice, self.env, api_info.get("method", "GET").upper(), route_template(api_info), outcome.get("status_code"), perf_counter() - start_time)
+
+        return outcome
+
+    def _refresh_token(self, stale_token):
+        with self.auth_lock:
+            # another worker may have refreshed the token while this call was in flight
+            if self.token != stale_token:
+                return True
+
+            try:
+                self.authenticate(use_cache=False)
+                return True
+            except (requests.RequestException, ValueError) as e:
+                logging.error("Token refresh failed: %s", e, extra={"microservice": self.microservice, "env": self.env})
+                return False
+
+    def _refresh_session(self, stale_session_id):
+        with self.auth_lock:
+            # another worker may have created a new session while this call was in flight
+            if self.session_id != stale_session_id:
+                return True
+
+            try:
+                self.create_session(use_cache=False)
+                return True
+            except (requests.RequestException, ValueError) as e:
+                logging.error("Session refresh failed: %s", e, extra={"microservice": self.microservice, "env": self.env})
+                return False
+
+    def _send_request(self, api_info, correlation_id=None):
+        retry_policy = self.retry_policy.override(api_info.get("retry_policy"))
+        attempts = []
+        rate_limit_wait_sec = 0.0
+
+        while True:
+            outcome, exception, retry_after = self._send_attempt(api_info, retry_policy)
+            rate_limit_wait_sec += outcome.get("rate_limit_wait_sec", 0.0)
+
+            attempt = len(attempts) + 1
+            attempts.append({"attempt": attempt, "elapsed_sec": round(outcome.get("response_time", outcome.get("elapsed", 0.0)), 3)})
+            if "error" in outcome:
+                attempts[-1]["error"] = outcome["error"]
+                retryable = exception is not None and retry_policy.should_retry_exception(exception)
+            else:
+                attempts[-1]["status_code"] = outcome["status_code"]
+                retryable = retry_policy.should_retry_status(outcome["status_code"])
+
+            if not retryable or attempt >= retry_policy.max_attempts:
+                break
+
+            wait_time = retry_policy.backoff(attempt, retry_after)
+            attempts[-1]["wait_sec"] = round(wait_time, 3)
+            logging.warning("API: %s attempt %s failed (%s), retrying in %ss", api_info["route"], attempt, attempts[-1].get("status_code", attempts[-1].get("error")), attempts[-1]["wait_sec"], extra=self._log_context(api_info, correlation_id))
+            sleep(wait_time)
+
+        outcome.pop("elapsed", None)
+        # the limiter wait of every attempt, so that callers timing the whole call can leave it out
+        if rate_limit_wait_sec:
+            outcome["rate_limit_wait_sec"] = round(rate_limit_wait_sec, 4)
+        if len(attempts) > 1:
+            outcome["attempts"] = attempts
+        return outcome
+
+    def _send_attempt(self, api_info, retry_policy):
         api_route = api_info['route']
         url = f"{self.config.base_url.rstrip('/')}{api_route}"
         method = api_info.get("method", "GET").upper()
         headers = api_info.get("headers", {})
         query_params = api_info.get("query_params", {})
         request_body = api_info.get("body", {})
+        body_policy = api_info.get("body_policy", self.body_policy)
 
+        start_time = perf_counter()
         try:
-            start_time = time()
-            response = self.session.request(
-                method, 
-                url, 
-                params=query_params,
-                headers=headers,
-                json=request_body
-            )
+            with RequestTimer() as timer:
+                response = self.session.request(
+                    method, 
+                    url, 
+                    params=query_params,
+                    headers=headers,
+                    json=request_body,
+                    stream=True,
+                    timeout=retry_policy.timeout
+                )
+                body = read_body(response, body_policy)
+                end_time = perf_counter()
+            transfer = transfer_sizes(response, body)
 
-            response_time = round(time() - start_time, 3)  # Response time in seconds
+            # time spent waiting on the rate limiter is not part of the response time
+            response_time = end_time - start_time - timer.rate_limit_wait_sec  # Response time in seconds
+            self._record_rate_limit_wait(timer.rate_limit_wait_sec)
 
-            self.results["microservice"] = self.microservice
-            self.results["env"] = self.env
-            self.results[api_route] = {
-                "query_param": query_params,
-                "request_body": request_body,
+            if timer.observed:
+                with self.connection_stats_lock:
+                    self.connection_stats["new" if timer.new_connection else "reused"] += 1
+
+            outcome = {
+                "url": response.url,
+                "method": method,
                 "status_code": response.status_code,
-                "response_time_sec": response_time,
-                "response": response.json()
+                "response_time": response_time,
+                "phases": timer.phases(end_time),
+                "transfer": transfer,
+                "body": body
             }
-
-            self.status_log["microservice"] = self.microservice
-            self.status_log["env"] = self.env
-            if response.status_code == 200:
-                self.status_log["200"].append(api_route)
-            elif response.status_code == 500:
-                self.status_log["500"].append(api_route)
-            else:
-                self.status_log["Other"][api_route] = str(response.status_code)
-
-            logging.info(f"url: {response.url}, Method: {method}, Status: {response.status_code}, Time: {response_time}s")
-
-            return response_time
+            if timer.rate_limit_wait_sec:
+                outcome["rate_limit_wait_sec"] = round(timer.rate_limit_wait_sec, 4)
+            return outcome, None, response.headers.get("Retry-After")
 
         except requests.RequestException as e:
-            self.results[api_route] = {"error": str(e)}
-            logging.error(f"API: {api_route} failed with error: {str(e)}")
+            self._record_rate_limit_wait(timer.rate_limit_wait_sec)
+            outcome = {"error": str(e), "elapsed": perf_counter() - start_time - timer.rate_limit_wait_sec}
+            if timer.rate_limit_wait_sec:
+                outcome["rate_limit_wait_sec"] = round(timer.rate_limit_wait_sec, 4)
+            return outcome, e, None
+
+    def _record_rate_limit_wait(self, wait_sec):
+        if wait_sec:
+            with self.rate_limit_stats_lock:
+                self.rate_limit_stats["delayed_calls"] += 1
+                self.rate_limit_stats["wait_sec"] += wait_sec
+
+    def _store_response(self, api_info, outcome):
+        api_route = api_info['route']
+        # stats are aggregated per template, results and statuses are still written per expanded case
+        stats_route = route_template(api_info)
+        query_params = api_info.get("query_params", {})
+        request_body = api_info.get("body", {})
+
+        if "error" in outcome:
+            if self.baseline is not None:
+                self.baseline.compare_call(api_route, outcome)
+            error_result = {"error": outcome["error"]}
+            if "attempts" in outcome:
+                error_result["attempts"] = outcome["attempts"]
+            self._write_result(api_route, error_result)
+            if self.history_recorder is not None:
+                self.history_recorder.add_call(stats_route, api_info.get("method", "GET").upper(), error=outcome["error"])
+            logging.error("API: %s failed with error: %s", api_route, outcome["error"], extra=self._log_context(api_info, outcome.get("correlation_id")))
+            return None
+
+        status_code = outcome["status_code"]
+        response_time = round(outcome["response_time"], 3)
+
+        # percentiles are computed once at the end of the run, for the latency file and the console summary
+        self.latency_histograms.setdefault(stats_route, LatencyHistogram()).record(outcome["response_time"])
+
+        result = {
+            "query_param": query_params,
+            "request_body": request_body,
+            "status_code": status_code,
+            "response_time_sec": response_time,
+            **outcome["body"]
+        }
+
+        if stats_route != api_route:
+            result["route_template"] = stats_route
+
+        phases = outcome.get("phases")
+        if phases is not None:
+            result["phases"] = phases
+
+        result["transfer"] = outcome["transfer"]
+        if "rate_limit_wait_sec" in outcome:
+            result["rate_limit_wait_sec"] = outcome["rate_limit_wait_sec"]
+        self._record_transfer(stats_route, outcome["transfer"])
+
+        if "attempts" in outcome:
+            result["attempts"] = outcome["attempts"]
+
+        if self.baseline is not None:
+            self.baseline.compare_call(api_route, result)
+
+        if self.result_writer is None:
+            self.results["microservice"] = self.microservice
+            self.results["env"] = self.env
+        self._write_result(api_route, result)
+        if self.history_recorder is not None:
+            self.history_recorder.add_call(stats_route, outcome["method"], status_code, outcome["response_time"])
+
+        if self.slow_request_threshold is not None and response_time >= self.slow_request_threshold:
+            self.slow_requests.append({
+                "url": outcome["url"],
+                "method": outcome["method"],
+                "status_code": status_code,
+                "response_time_sec": response_time,
+                "phases": phases
+            })
+            logging.warning("Slow request: %s %s took %ss, phases: %s", outcome["method"], outcome["url"], response_time, phases, extra={**self._log_context(api_info, outcome.get("correlation_id")), "response_time_sec": response_time})
+
+        self.status_log["microservice"] = self.microservice
+        self.status_log["env"] = self.env
+        if status_code == 200:
+            self.status_log["200"].append(api_route)
+        elif status_code == 500:
+            self.status_log["500"].append(api_route)
+        else:
+            self.status_log["Other"][api_route] = str(status_code)
+
+        # successful calls can be sampled out of the log, failed statuses are always written
+        logging.info("url: %s, Method: %s, Status: %s, Time: %ss", outcome["url"], outcome["method"], status_code, response_time, extra={
+            **self._log_context(api_info, outcome.get("correlation_id")),
+            "status_code": status_code,
+            "response_time_sec": response_time,
+            "success": status_code < 400
+        })
+
+        return response_time
+
+    def _log_context(self, api_info, correlation_id):
+        return {
+            "correlation_id": correlation_id,
+            "microservice": self.microservice,
+            "env": self.env,
+            "method": api_info.get("method", "GET").upper(),
+            "route": api_info["route"]
+        }
+
+    def _write_result(self, api_route, result):
+        if self.result_writer is not None:
+            self.result_writer.write({"type": "call", "route": api_route, **result})
+        else:
+            self.results[api_route] = result
+
+    def _run_summary(self, total_response_time):
+        return {
+            "microservice": self.microservice,
+            "env": self.env,
+            "calls": self.result_writer.records_written,
+            "status": {
+                "200": len(self.status_log["200"]),
+                "500": len(self.status_log["500"]),
+                "Other": len(self.status_log["Other"])
+            },
+            "wall_time_sec": round(self.wall_time, 3),
+            "summed_response_time_sec": round(total_response_time, 3),
+            "latency": self._overall_latency_histogram().summary(),
+            "connections": self._connections_summary(),
+            "rate_limit": self._rate_limit_summary()
+        }
+
+    def _connections_summary(self):
+        with self.connection_stats_lock:
+            return {**self.connection_stats, "pool_size": self.pool_size, "pool_block": self.pool_block}
+
+    def _overall_latency_histogram(self):
+        overall = LatencyHistogram()
+        for histogram in self.latency_histograms.values():
+            overall.merge(histogram)
+        return overall
+
+    def _latency_histograms_to_dict(self):
+        return {
+            "microservice": self.microservice,
+            "env": self.env,
+            "summary": {route: histogram.summary() for route, histogram in self.latency_histograms.items()},
+            "routes": {route: histogram.to_dict() for route, histogram in self.latency_histograms.items()}
+        }
+
+    def _print_latency_summary(self):
+        summary = self._overall_latency_histogram().summary()
+        print(f"<{self.microservice}> <{self.env}> Latency over {summary['count']} calls: p50 {summary['p50_sec']}s, p90 {summary['p90_sec']}s, p99 {summary['p99_sec']}s, max {summary['max_sec']}s")
+
+    def _record_transfer(self, api_route, transfer):
+        add_transfer(self.transfer_stats, api_route, 1, transfer["wire_bytes"], transfer["decoded_bytes"], [transfer["content_encoding"]])
+
+    def _transfer_summary(self, heaviest_count=10):
+        return {
+            "microservice": self.microservice,
+            "env": self.env,
+            "accept_encoding": self.session.headers["Accept-Encoding"],
+            **summarize_transfer(self.transfer_stats, heaviest_count)
+        }
+
+    def _print_transfer_summary(self, heaviest_count=5):
+        summary = self._transfer_summary(heaviest_count)
+        print(f"<{self.microservice}> <{self.env}> Transfer: {summary['wire_bytes']} bytes over the wire, {summary['decoded_bytes']} bytes decoded (Accept-Encoding: {summary['accept_encoding']})")
+
+        for api_route in summary["heaviest_routes"]:
+            route = summary["routes"][api_route]
+            print(f"    {api_route}: {route['avg_wire_bytes']} bytes per call, {', '.join(route['content_encodings'])}, ratio {route['compression_ratio']}")
+
+    def _rate_limit_summary(self):
+        with self.rate_limit_stats_lock:
+            return {"delayed_calls": self.rate_limit_stats["delayed_calls"], "wait_sec": round(self.rate_limit_stats["wait_sec"], 3)}
+
+    def _print_rate_limit_summary(self):
+        if self.rate_limiter is None:
+            return
+
+        rate_limit = self._rate_limit_summary()
+        print(f"<{self.microservice}> <{self.env}> Rate limiter ({self.rate_limiter.rate} rps per host, burst {self.rate_limiter.burst}): {rate_limit['delayed_calls']} calls delayed, {rate_limit['wait_sec']}s waited, not counted in response times")
+
+    def _print_connections_summary(self):
+        connections = self._connections_summary()
+        print(f"<{self.microservice}> <{self.env}> Connections: {connections['new']} new, {connections['reused']} reused (pool size: {connections['pool_size']}, block: {connections['pool_block']})")
+
+    def _print_baseline_summary(self):
+        report = self.baseline.report()
+        print(f"<{self.microservice}> <{self.env}> Baseline comparison: {len(report['status_changes'])} status changes, {len(report['latency_regressions'])} p95 latency regressions, {len(report['body_differences'])} routes with body differences")
+
+        for api_route, change in report["status_changes"].items():
+            print(f"    status changed {api_route}: {change['baseline']} -> {change['current']}")
+        for api_route, regression in report["latency_regressions"].items():
+            print(f"    p95 regressed {api_route}: {regression['baseline_p95_sec']}s -> {regression['current_p95_sec']}s")
 
     def _save_results_into_file(self, filename, data, directory="api_results"):
         os.makedirs(directory, exist_ok=True)
@@ -183,4 +626,12 @@ class APITester:
         
         with open(file_path, "w") as file:
             json.dump(data, file, indent=4)
-    
\ No newline at end of file
+    
+
+def validate_api_policies(api_info):
+    try:
+        if "body_policy" in api_info:
+            parse_body_policy(api_info["body_policy"])
+        RetryPolicy().override(api_info.get("retry_policy"))
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"API {api_info.get('method', 'GET').upper()} {api_info.get('route')}: {e}") from e
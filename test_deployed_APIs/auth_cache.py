@@ -0,0 +1,94 @@
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from time import time
+
+DEFAULT_AUTH_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "api_tester", "auth_cache.json")
+
+# entries expiring within this margin are treated as already expired
+EXPIRY_MARGIN_SEC = 30
+
+def auth_cache_key(microservice, env, config):
+    credentials = json.dumps([
+        microservice,
+        env,
+        config.auth_url,
+        config.auth_payload,
+        config.auth_basic_auth_header,
+        config.session_manager_url
+    ], sort_keys=True)
+    return hashlib.sha256(credentials.encode()).hexdigest()
+
+def token_expiry(token_response, token):
+    expires_in = token_response.get("expires_in")
+    if expires_in:
+        return time() + float(expires_in)
+
+    # fall back to the exp claim of the JWT
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+class AuthCache:
+    def __init__(self, file_path=DEFAULT_AUTH_CACHE_FILE, session_ttl_sec=900):
+        self.file_path = file_path
+        self.session_ttl_sec = session_ttl_sec
+        self.lock = threading.Lock()
+
+    def get_token(self, key):
+        entry = self._read().get(key, {})
+        return entry.get("access_token") if self._is_valid(entry.get("token_expires_at")) else None
+
+    def get_session_id(self, key):
+        entry = self._read().get(key, {})
+        return entry.get("session_id") if self._is_valid(entry.get("session_expires_at")) else None
+
+    def put_token(self, key, token, expires_at):
+        # tokens without a known expiry are not cached
+        if expires_at is not None:
+            self._update(key, {"access_token": token, "token_expires_at": expires_at})
+
+    def put_session_id(self, key, session_id):
+        self._update(key, {"session_id": session_id, "session_expires_at": time() + self.session_ttl_sec})
+
+    @staticmethod
+    def _is_valid(expires_at):
+        return expires_at is not None and expires_at - EXPIRY_MARGIN_SEC > time()
+
+    def _read(self):
+        with self.lock:
+            return self._read_unlocked()
+
+    def _read_unlocked(self):
+        try:
+            with open(self.file_path, "r") as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _update(self, key, fields):
+        with self.lock:
+            entries = self._read_unlocked()
+            entries = {cached_key: entry for cached_key, entry in entries.items() if self._is_valid(max(entry.get("token_expires_at") or 0, entry.get("session_expires_at") or 0))}
+            entries.setdefault(key, {}).update(fields)
+
+            directory = os.path.dirname(self.file_path) or "."
+            os.makedirs(directory, exist_ok=True)
+
+            # other processes (e.g. parallel shards) share the cache: the file is written aside and swapped in
+            # atomically, so a reader never sees it half written. mkstemp makes it readable by the owner only,
+            # as the cache holds credentials
+            file_descriptor, temp_path = tempfile.mkstemp(prefix=".auth_cache.", suffix=".tmp", dir=directory)
+            try:
+                with os.fdopen(file_descriptor, "w") as file:
+                    json.dump(entries, file)
+                os.replace(temp_path, self.file_path)
+            except BaseException:
+                os.remove(temp_path)
+                raise
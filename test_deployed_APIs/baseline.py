@@ -0,0 +1,104 @@
+import json
+import os
+from latency_histogram import LatencyHistogram
+from structural_diff import diff_structures
+
+def resolve_baseline_path(baseline, microservice, env, stream_results=False, directory="api_results"):
+    extension = "jsonl" if stream_results else "json"
+    filename = f"api_responses_{microservice}_{env}.{extension}"
+
+    if baseline == "last":
+        return os.path.join(directory, filename)
+
+    if os.path.isdir(baseline):
+        return os.path.join(baseline, filename)
+
+    return baseline
+
+def load_baseline_results(file_path):
+    with open(file_path, "r") as file:
+        if not file_path.endswith(".jsonl"):
+            results = json.load(file)
+            return {route: result for route, result in results.items() if isinstance(result, dict)}
+
+        results = {}
+        for line in file:
+            record = json.loads(line)
+            if record.get("type") == "call":
+                results[record["route"]] = record
+        return results
+
+def load_baseline_latency(file_path):
+    # the per-route percentiles of a run are in the latency file written next to its responses file
+    directory, filename = os.path.split(file_path)
+    latency_path = os.path.join(directory, f"{os.path.splitext(filename)[0].replace('api_responses_', 'api_latency_', 1)}.json")
+    if latency_path == file_path or not os.path.exists(latency_path):
+        return None
+
+    with open(latency_path, "r") as file:
+        latency = json.load(file)
+    return {route: LatencyHistogram.from_dict(histogram_data).summary() for route, histogram_data in latency["routes"].items()}
+
+class BaselineComparator:
+    def __init__(self, baseline_results, p95_threshold=0.2, p95_min_delta_sec=0.01, baseline_latency=None):
+        self.baseline_results = baseline_results
+        self.p95_threshold = p95_threshold
+        self.p95_min_delta_sec = p95_min_delta_sec
+        self.status_changes = {}
+        self.latency_regressions = {}
+        self.body_differences = {}
+        # latency is tracked per route template; results of older runs carried the summary of their template
+        if baseline_latency is None:
+            baseline_latency = {result.get("route_template", api_route): result.get("latency", {}) for api_route, result in baseline_results.items()}
+        self.baseline_latency = baseline_latency
+
+    @classmethod
+    def from_file(cls, file_path, p95_threshold=0.2, p95_min_delta_sec=0.01):
+        return cls(load_baseline_results(file_path), p95_threshold, p95_min_delta_sec, load_baseline_latency(file_path))
+
+    @property
+    def has_regressions(self):
+        return bool(self.status_changes or self.latency_regressions)
+
+    def compare_call(self, api_route, result):
+        baseline = self.baseline_results.get(api_route)
+        if baseline is None:
+            return
+
+        baseline_status = baseline.get("status_code", "error")
+        current_status = result.get("status_code", "error")
+        if baseline_status != current_status:
+            self.status_changes[api_route] = {"baseline": baseline_status, "current": current_status}
+
+        differences = self._body_differences(baseline, result)
+        if differences:
+            self.body_differences[api_route] = differences
+
+    def compare_latency(self, latency_histograms):
+        for api_route, histogram in latency_histograms.items():
+            baseline_p95 = self.baseline_latency.get(api_route, {}).get("p95_sec")
+            if baseline_p95 is None:
+                continue
+
+            current_p95 = histogram.summary()["p95_sec"]
+            if current_p95 > baseline_p95 * (1 + self.p95_threshold) and current_p95 - baseline_p95 >= self.p95_min_delta_sec:
+                self.latency_regressions[api_route] = {"baseline_p95_sec": baseline_p95, "current_p95_sec": current_p95}
+
+    def report(self):
+        return {
+            "has_regressions": self.has_regressions,
+            "p95_threshold": self.p95_threshold,
+            "status_changes": self.status_changes,
+            "latency_regressions": self.latency_regressions,
+            "body_differences": self.body_differences
+        }
+
+    @staticmethod
+    def _body_differences(baseline, result):
+        if "response" in baseline and "response" in result:
+            return diff_structures(baseline["response"], result["response"])
+
+        if "response_sha256" in baseline and "response_sha256" in result and baseline["response_sha256"] != result["response_sha256"]:
+            return [{"path": "$", "change": "changed", "baseline": baseline["response_sha256"], "current": result["response_sha256"]}]
+
+        return []
@@ -0,0 +1,174 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tracemalloc
+from datetime import datetime, timezone
+from time import perf_counter
+from api_tester import APITester
+from api_tester_config import APITesterConfig
+from latency_histogram import LatencyHistogram
+from load_tester import LoadTester, parse_duration
+from log_pipeline import LogPipeline
+from stub_server import StubServer
+
+MODES = ("sequential", "concurrent", "load")
+
+def benchmark_config(base_url):
+    return APITesterConfig(base_url, "", "", {}, {}, {}, {}, "")
+
+def benchmark_apis(requests_count):
+    # one route per call, like a real suite, so the results kept in memory grow with the run
+    return [{"method": "GET", "route": f"/benchmark/resource{index}"} for index in range(requests_count)]
+
+def benchmark_suite(base_url, requests_count, concurrency=1):
+    api_tester = APITester(benchmark_config(base_url), ".", "benchmark", "local", concurrency=concurrency)
+
+    start_time = perf_counter()
+    total_response_time = api_tester._call_all_apis(benchmark_apis(requests_count))
+    wall_time = perf_counter() - start_time
+
+    # time every worker spent outside the HTTP exchange: storing results, histograms, logging, scheduling
+    overhead = wall_time * api_tester.concurrency - total_response_time
+
+    return {
+        "requests": requests_count,
+        "concurrency": api_tester.concurrency,
+        "wall_time_sec": round(wall_time, 4),
+        "throughput_rps": round(requests_count / wall_time, 2),
+        "mean_response_time_ms": round(total_response_time / requests_count * 1000, 4),
+        "overhead_per_request_ms": round(max(overhead, 0.0) / requests_count * 1000, 4)
+    }
+
+def benchmark_load(base_url, rps, duration_sec, max_in_flight=256):
+    api_tester = APITester(benchmark_config(base_url), ".", "benchmark", "local")
+    load_tester = LoadTester(api_tester, rps, duration_sec, max_in_flight)
+
+    sent, wall_time = load_tester._run(benchmark_apis(100))
+    summary = load_tester._build_summary(sent, wall_time)
+
+    overall = LatencyHistogram()
+    for stats in load_tester.route_stats.values():
+        overall.merge(stats["latency"])
+
+    return {
+        "target_rps": rps,
+        "sent": sent,
+        "wall_time_sec": summary["wall_time_sec"],
+        "achieved_rps": summary["achieved_rps"],
+        "errors": sum(stats["errors"] for stats in load_tester.route_stats.values()),
+        "latency": overall.summary()
+    }
+
+def benchmark_memory(base_url, requests_count):
+    api_tester = APITester(benchmark_config(base_url), ".", "benchmark", "local")
+    apis = benchmark_apis(requests_count)
+
+    # measured in a separate pass, tracemalloc slows every allocation down and would skew the throughput
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        api_tester._call_all_apis(apis)
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "requests": requests_count,
+        "retained_bytes_per_call": round((after - before) / requests_count, 1),
+        "peak_bytes": peak - before
+    }
+
+def run_benchmark(modes=MODES, latency_sec=0.0, payload_size=1024, requests_count=1000, concurrency=8, rps=500, duration_sec=5.0):
+    results = {}
+
+    with StubServer(latency_sec, payload_size) as stub:
+        if "sequential" in modes:
+            results["sequential"] = benchmark_suite(stub.url, requests_count)
+        if "concurrent" in modes:
+            results["concurrent"] = benchmark_suite(stub.url, requests_count, concurrency)
+        if "load" in modes:
+            results["load"] = benchmark_load(stub.url, rps, duration_sec)
+        results["memory"] = benchmark_memory(stub.url, min(requests_count, 500))
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "version": tool_version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            "latency_sec": latency_sec,
+            "payload_size": payload_size,
+            "requests": requests_count,
+            "concurrency": concurrency,
+            "rps": rps,
+            "duration_sec": duration_sec
+        },
+        "modes": results
+    }
+
+def tool_version():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare_benchmarks(previous, current):
+    # relative changes of the figures that matter between two versions of the tool, positive means bigger
+    comparison = {}
+    for mode, metric in (("sequential", "throughput_rps"), ("sequential", "overhead_per_request_ms"), ("concurrent", "throughput_rps"), ("concurrent", "overhead_per_request_ms"), ("load", "achieved_rps"), ("memory", "retained_bytes_per_call")):
+        previous_value = previous["modes"].get(mode, {}).get(metric)
+        current_value = current["modes"].get(mode, {}).get(metric)
+        if previous_value and current_value is not None:
+            comparison[f"{mode}.{metric}"] = {
+                "previous": previous_value,
+                "current": current_value,
+                "change": round((current_value - previous_value) / previous_value, 4)
+            }
+    return comparison
+
+def print_benchmark(results):
+    modes = results["modes"]
+    for mode in ("sequential", "concurrent"):
+        if mode in modes:
+            print(f"<{mode}> {modes[mode]['throughput_rps']} rps over {modes[mode]['requests']} requests (concurrency: {modes[mode]['concurrency']}), overhead {modes[mode]['overhead_per_request_ms']}ms per request")
+    if "load" in modes:
+        print(f"<load> {modes['load']['achieved_rps']} rps achieved, target {modes['load']['target_rps']} rps, {modes['load']['errors']} errors")
+    print(f"<memory> {modes['memory']['retained_bytes_per_call']} bytes retained per call, peak {modes['memory']['peak_bytes']} bytes")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the API tester itself against a local stub server.")
+    parser.add_argument("--modes", default=",".join(MODES), help=f"Comma-separated modes to run among {', '.join(MODES)} (default: all)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latency added by the stub server to every response, in seconds (default: 0)")
+    parser.add_argument("--payload-size", type=int, default=1024, help="Size of the payload returned by the stub server, in bytes (default: 1024)")
+    parser.add_argument("--requests", type=int, default=1000, help="Number of calls of the sequential and concurrent modes (default: 1000)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrency of the concurrent mode (default: 8)")
+    parser.add_argument("--rps", type=float, default=500, help="Target rate of the load mode (default: 500)")
+    parser.add_argument("--duration", default="5s", help="Duration of the load mode, e.g. 5s, 1m (default: 5s)")
+    parser.add_argument("--output", default="benchmark_results.json", help="File the results are saved into (default: benchmark_results.json)")
+    parser.add_argument("--compare", help="Results of a previous benchmark to compare with")
+    args = parser.parse_args()
+
+    modes = args.modes.split(",")
+    unknown_modes = set(modes) - set(MODES)
+    if unknown_modes:
+        parser.error(f"Unknown modes: {', '.join(sorted(unknown_modes))}")
+
+    # the tester logs every call through the same pipeline as a real run, so the logging cost is part of the overhead
+    log_pipeline = LogPipeline(os.devnull).start()
+    try:
+        results = run_benchmark(modes, args.latency, args.payload_size, args.requests, args.concurrency, args.rps, parse_duration(args.duration))
+    finally:
+        log_pipeline.stop()
+    print_benchmark(results)
+
+    if args.compare:
+        with open(args.compare, "r") as file:
+            results["comparison"] = compare_benchmarks(json.load(file), results)
+        for metric, change in results["comparison"].items():
+            print(f"    {metric}: {change['previous']} -> {change['current']} ({change['change']:+.1%})")
+
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=4)
+    print(f"Benchmark results saved into {args.output}")
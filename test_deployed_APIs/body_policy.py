@@ -0,0 +1,115 @@
+import hashlib
+from urllib3.util import make_headers
+
+CHUNK_SIZE = 64 * 1024
+# gzip and deflate, plus br and zstd when the brotli and zstandard packages are installed
+ACCEPT_ENCODING = make_headers(accept_encoding=True)["accept-encoding"]
+
+def parse_body_policy(policy):
+    if not isinstance(policy, str):
+        raise ValueError(f"Invalid body policy {policy!r}. Allowed values: full, hash, truncate:<bytes>, none")
+
+    kind, _, limit = policy.partition(":")
+
+    if kind == "truncate" and limit.isdigit():
+        return kind, int(limit)
+
+    if kind in ("full", "hash", "none") and not limit:
+        return kind, None
+
+    raise ValueError(f"Invalid body policy '{policy}'. Allowed values: full, hash, truncate:<bytes>, none")
+
+def read_body(response, policy):
+    kind, limit = parse_body_policy(policy)
+
+    try:
+        if kind == "full":
+            return _read_full(response)
+        if kind == "hash":
+            return _read_hash(response)
+        if kind == "truncate":
+            return _read_truncated(response, limit)
+        return {"response_size": _drain(response.iter_content(CHUNK_SIZE))}
+    finally:
+        # the body is always read to the end, so closing gives the connection back to the pool
+        response.close()
+
+def transfer_sizes(response, body):
+    # raw.tell() counts the bytes read from the socket before decoding, replayed responses have no raw stream
+    tell = getattr(response.raw, "tell", None)
+    wire_bytes = tell() if tell is not None else None
+    decoded_bytes = body["response_size"] if "response_size" in body else len(response.content or b"")
+
+    return {
+        "content_encoding": response.headers.get("Content-Encoding", "identity"),
+        "wire_bytes": wire_bytes,
+        "decoded_bytes": decoded_bytes,
+        "compression_ratio": round(decoded_bytes / wire_bytes, 3) if wire_bytes else None
+    }
+
+def add_transfer(transfer_stats, route, calls, wire_bytes, decoded_bytes, content_encodings):
+    stats = transfer_stats.setdefault(route, {"calls": 0, "wire_bytes": 0, "decoded_bytes": 0, "content_encodings": []})
+    stats["calls"] += calls
+    stats["wire_bytes"] += wire_bytes or 0
+    stats["decoded_bytes"] += decoded_bytes
+    for content_encoding in content_encodings:
+        if content_encoding not in stats["content_encodings"]:
+            stats["content_encodings"].append(content_encoding)
+
+def summarize_transfer(transfer_stats, heaviest_count=10):
+    routes = {}
+    for route, stats in transfer_stats.items():
+        routes[route] = {
+            "calls": stats["calls"],
+            "wire_bytes": stats["wire_bytes"],
+            "decoded_bytes": stats["decoded_bytes"],
+            "content_encodings": stats["content_encodings"],
+            "avg_wire_bytes": round(stats["wire_bytes"] / stats["calls"]),
+            "compression_ratio": round(stats["decoded_bytes"] / stats["wire_bytes"], 3) if stats["wire_bytes"] else None
+        }
+
+    return {
+        "wire_bytes": sum(stats["wire_bytes"] for stats in routes.values()),
+        "decoded_bytes": sum(stats["decoded_bytes"] for stats in routes.values()),
+        "heaviest_routes": sorted(routes, key=lambda route: routes[route]["avg_wire_bytes"], reverse=True)[:heaviest_count],
+        "routes": routes
+    }
+
+def _read_full(response):
+    try:
+        body = response.json()
+    except ValueError:
+        body = response.text
+
+    return {"response": body}
+
+def _read_hash(response):
+    digest = hashlib.sha256()
+    size = 0
+
+    for chunk in response.iter_content(CHUNK_SIZE):
+        digest.update(chunk)
+        size += len(chunk)
+
+    return {"response_sha256": digest.hexdigest(), "response_size": size}
+
+def _read_truncated(response, limit):
+    chunks = response.iter_content(CHUNK_SIZE)
+    head = bytearray()
+
+    for chunk in chunks:
+        head += chunk
+        if len(head) >= limit:
+            break
+
+    size = len(head) + _drain(chunks)
+    encoding = response.encoding or "utf-8"
+
+    return {
+        "response": bytes(head[:limit]).decode(encoding, errors="replace"),
+        "response_size": size,
+        "truncated": size > limit
+    }
+
+def _drain(chunks):
+    return sum(len(chunk) for chunk in chunks)
@@ -0,0 +1,134 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from latency_histogram import LatencyHistogram
+from load_tester import iter_cases_forever
+
+class CapacityFinder:
+    def __init__(self, api_tester, slo_p99_sec, slo_error_rate=0.01, step_duration_sec=10.0, max_concurrency=256, additive_step=2, decrease_factor=0.5, max_breaches=3, max_steps=50, slow_start=True):
+        self.api_tester = api_tester
+        self.slo_p99_sec = slo_p99_sec
+        self.slo_error_rate = slo_error_rate
+        self.step_duration_sec = step_duration_sec
+        self.max_concurrency = max_concurrency
+        self.additive_step = additive_step
+        self.decrease_factor = decrease_factor
+        self.max_breaches = max_breaches
+        self.max_steps = max_steps
+        self.slow_start = slow_start
+        self.steps = []
+
+    def run_and_save_results(self):
+        microservice = self.api_tester.microservice
+        env = self.api_tester.env
+
+        logging.info(f"--------------------------------------------begin capacity run -----------------------------------------------")
+        logging.info(f"microservice: {microservice}, env: {env}, slo p99: {self.slo_p99_sec}s, slo error rate: {self.slo_error_rate}")
+
+        try:
+            report = self.run(self.api_tester._load_apis_to_test())
+            self.api_tester._save_results_into_file(self.api_tester._results_filename("api_capacity"), report)
+        finally:
+            logging.info(f"--------------------------------------------end capacity run -------------------------------------------------")
+
+        knee = report["knee"]
+        if knee is None:
+            print(f"<{microservice}> <{env}> Capacity search completed: the SLO is breached even at concurrency 1. Check api_results/ directory for more infos.")
+        else:
+            print(f"<{microservice}> <{env}> Capacity search completed: knee at concurrency {knee['concurrency']}, {knee['throughput_rps']} rps with p99 {knee['p99_sec']}s and error rate {knee['error_rate']} ({report['stopped_because']}). Check api_results/ directory for more infos.")
+        return report
+
+    def run(self, apis_to_test):
+        cases = iter_cases_forever(self.api_tester, apis_to_test)
+        cases_lock = threading.Lock()
+
+        concurrency = 1
+        breaches = 0
+        slow_start = self.slow_start
+        stopped_because = "max steps reached"
+
+        # slow start doubles the concurrency until the first breach, so that a high --max-in-flight is reached
+        # in a few steps; then AIMD grows it additively while the SLO holds and cuts it multiplicatively when it breaks
+        while len(self.steps) < self.max_steps:
+            step = self._run_step(concurrency, cases, cases_lock)
+            self.steps.append(step)
+            logging.info(f"capacity step {len(self.steps)}: concurrency {concurrency}, {step['throughput_rps']} rps, p99 {step['p99_sec']}s, error rate {step['error_rate']}, within slo: {step['within_slo']}")
+
+            if step["completed"] == 0 and step["errors"] == 0:
+                stopped_because = "no APIs to test"
+                break
+
+            if step["within_slo"]:
+                if concurrency >= self.max_concurrency:
+                    stopped_because = "max concurrency reached"
+                    break
+                concurrency = min(concurrency * 2 if slow_start else concurrency + self.additive_step, self.max_concurrency)
+            else:
+                slow_start = False
+                breaches += 1
+                if breaches >= self.max_breaches:
+                    stopped_because = "slo breached"
+                    break
+                concurrency = max(int(concurrency * self.decrease_factor), 1)
+
+        within_slo = [step for step in self.steps if step["within_slo"]]
+        knee = max(within_slo, key=lambda step: step["throughput_rps"]) if within_slo else None
+
+        return {
+            "microservice": self.api_tester.microservice,
+            "env": self.api_tester.env,
+            "slo": {"p99_sec": self.slo_p99_sec, "error_rate": self.slo_error_rate},
+            "step_duration_sec": self.step_duration_sec,
+            "knee": knee,
+            "stopped_because": stopped_because,
+            "steps": self.steps
+        }
+
+    def _run_step(self, concurrency, cases, cases_lock):
+        latency = LatencyHistogram()
+        counters = {"completed": 0, "errors": 0}
+        lock = threading.Lock()
+
+        start_time = perf_counter()
+        deadline = start_time + self.step_duration_sec
+
+        # closed loop: every worker sends its next call as soon as the previous one completes
+        def worker():
+            while perf_counter() < deadline:
+                with cases_lock:
+                    api_info = next(cases, None)
+                if api_info is None:
+                    return
+
+                outcome = self.api_tester._call_single_api(api_info)
+                failed = "error" in outcome or outcome["status_code"] >= 500
+
+                with lock:
+                    counters["completed"] += 1
+                    if failed:
+                        counters["errors"] += 1
+                    else:
+                        latency.record(outcome["response_time"])
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            workers = [executor.submit(worker) for _ in range(concurrency)]
+
+        # a worker that crashed would silently lower the concurrency of the step
+        for future in workers:
+            future.result()
+
+        wall_time = perf_counter() - start_time
+        completed = counters["completed"]
+        error_rate = round(counters["errors"] / completed, 4) if completed else 0.0
+        p99_sec = latency.summary()["p99_sec"] if latency.total_count else None
+
+        return {
+            "concurrency": concurrency,
+            "completed": completed,
+            "errors": counters["errors"],
+            "throughput_rps": round(completed / wall_time, 2) if wall_time else 0.0,
+            "p99_sec": p99_sec,
+            "error_rate": error_rate,
+            "within_slo": completed > 0 and error_rate <= self.slo_error_rate and p99_sec is not None and p99_sec <= self.slo_p99_sec
+        }
@@ -0,0 +1,45 @@
+import csv
+import itertools
+import json
+import os
+from templating import render_template
+
+TEMPLATE_KEYS = ("parameters", "data_file")
+
+def expand_api_cases(apis_to_test, data_dir="."):
+    # every case is built only when the engine asks for it, so a big matrix or data file never sits in memory
+    for api_info in apis_to_test:
+        if not any(key in api_info for key in TEMPLATE_KEYS):
+            yield api_info
+            continue
+
+        template = {key: value for key, value in api_info.items() if key not in TEMPLATE_KEYS}
+        for variables in _iter_variables(api_info, data_dir):
+            api_case = render_template(template, variables)
+            # per-route stats are kept per template, one entry per expanded case would grow with the data file
+            if api_case["route"] != template["route"]:
+                api_case["route_template"] = template["route"]
+            yield api_case
+
+def route_template(api_info):
+    return api_info.get("route_template", api_info["route"])
+
+def _iter_variables(api_info, data_dir):
+    parameters = api_info.get("parameters", {})
+    names = list(parameters)
+
+    rows = _iter_data_file(os.path.join(data_dir, api_info["data_file"])) if "data_file" in api_info else [{}]
+    for row in rows:
+        for values in itertools.product(*(parameters[name] for name in names)):
+            yield {**row, **dict(zip(names, values))}
+
+def _iter_data_file(file_path):
+    with open(file_path, "r", newline="") as file:
+        if file_path.endswith(".csv"):
+            yield from csv.DictReader(file)
+        elif file_path.endswith(".jsonl"):
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            raise ValueError(f"Unsupported data file '{file_path}': use a .csv or .jsonl file")
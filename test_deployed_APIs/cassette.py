@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import timedelta
+from requests import ConnectionError, Response
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from request_timing import TimedHTTPAdapter
+
+INDEX_FILE = "index.jsonl"
+OBJECTS_DIR = "objects"
+# bodies are stored decoded, so the headers describing the wire encoding no longer apply
+DROPPED_HEADERS = ("Content-Encoding", "Content-Length", "Transfer-Encoding")
+
+def request_key(method, url, body):
+    body = body.encode() if isinstance(body, str) else body or b""
+    return hashlib.sha256(method.encode() + b" " + url.encode() + b"\n" + body).hexdigest()
+
+class Cassette:
+    def __init__(self, directory, mode):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Invalid cassette mode '{mode}': use record or replay")
+
+        self.directory = directory
+        self.mode = mode
+        self.lock = threading.Lock()
+        self.objects_dir = os.path.join(directory, OBJECTS_DIR)
+        self.index_path = os.path.join(directory, INDEX_FILE)
+
+        if mode == "record":
+            os.makedirs(self.objects_dir, exist_ok=True)
+            # objects are content-addressed and kept across recordings, the index describes the last one only
+            open(self.index_path, "w").close()
+        else:
+            self.by_request = {}
+            self.by_route = {}
+            self.served = {}
+            self.bodies = {}
+            self._load_index()
+
+    def adapter(self, **pool_kwargs):
+        # pool settings only matter when recording, replayed responses never open a connection
+        return RecordingAdapter(self, **pool_kwargs) if self.mode == "record" else ReplayAdapter(self)
+
+    def record(self, request, response):
+        body = response.content or b""
+        body_sha256 = hashlib.sha256(body).hexdigest()
+        object_path = os.path.join(self.objects_dir, body_sha256)
+
+        entry = {
+            "key": request_key(request.method, request.url, request.body),
+            "method": request.method,
+            "url": request.url,
+            "status_code": response.status_code,
+            "reason": response.reason,
+            "headers": {name: value for name, value in response.headers.items() if name not in DROPPED_HEADERS},
+            "body_sha256": body_sha256,
+            "elapsed_sec": round(response.elapsed.total_seconds(), 4)
+        }
+
+        with self.lock:
+            if not os.path.exists(object_path):
+                temporary_path = f"{object_path}.tmp"
+                with open(temporary_path, "wb") as file:
+                    file.write(body)
+                os.replace(temporary_path, object_path)
+
+            with open(self.index_path, "a") as file:
+                file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def find(self, request):
+        key = request_key(request.method, request.url, request.body)
+        route = (request.method, request.url)
+
+        with self.lock:
+            # requests with generated bodies (e.g. a random session id) fall back to method and url
+            if key in self.by_request:
+                entry = self._next_entry(key, self.by_request[key])
+            elif route in self.by_route:
+                entry = self._next_entry(route, self.by_route[route])
+            else:
+                return None, None
+
+            body = self.bodies.get(entry["body_sha256"])
+            if body is None:
+                with open(os.path.join(self.objects_dir, entry["body_sha256"]), "rb") as file:
+                    body = file.read()
+                self.bodies[entry["body_sha256"]] = body
+
+        return entry, body
+
+    def _next_entry(self, key, entries):
+        # identical requests get the recorded responses in order, the last one is repeated once they run out
+        index = self.served.get(key, 0)
+        self.served[key] = index + 1
+        return entries[min(index, len(entries) - 1)]
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            raise FileNotFoundError(f"No recording found in {self.directory}")
+
+        with open(self.index_path, "r") as file:
+            for line in file:
+                if line.strip():
+                    entry = json.loads(line)
+                    self.by_request.setdefault(entry["key"], []).append(entry)
+                    self.by_route.setdefault((entry["method"], entry["url"]), []).append(entry)
+
+class RecordingAdapter(TimedHTTPAdapter):
+    def __init__(self, cassette, **pool_kwargs):
+        super().__init__(**pool_kwargs)
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        self.cassette.record(request, response)
+        return response
+
+class ReplayAdapter(BaseAdapter):
+    def __init__(self, cassette):
+        super().__init__()
+        self.cassette = cassette
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        entry, body = self.cassette.find(request)
+        if entry is None:
+            raise ConnectionError(f"No recorded response for {request.method} {request.url}", request=request)
+
+        response = Response()
+        response.status_code = entry["status_code"]
+        response.reason = entry["reason"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.elapsed = timedelta(seconds=entry["elapsed_sec"])
+        # an already consumed body makes iter_content() slice it instead of reading from a connection
+        response._content = body
+        response._content_consumed = True
+        return response
+
+    def close(self):
+        pass
@@ -1,16 +1,29 @@
+import argparse
+import base64
+import itertools
 import json
 import shlex
 import os
-from urllib.parse import urlparse, parse_qs
+import re
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlparse, parse_qs, parse_qsl
+
+DATA_OPTIONS = ("-d", "--data", "--data-raw", "--data-binary", "--data-ascii")
+# headers set by the browser or the HTTP client itself, not by the API under test
+IGNORED_HAR_HEADERS = ("host", "content-length", "connection", "accept-encoding", "keep-alive", "te", "trailer", "transfer-encoding", "upgrade")
+# credentials of the browser session: the tester sends its own token and session, and they must not end up in apis_to_test.json
+CREDENTIAL_HAR_HEADERS = ("authorization", "cookie", "x-bear-session-token")
+IGNORED_HAR_HEADER_PREFIXES = (":", "proxy-")
+HAR_ENTRY_SEPARATOR = re.compile(r"[\s,]*")
 
 def parse_curl_file(file_path):
     with open(file_path, "r") as f:
         curl_command = f.read().strip()
 
-    return parse_curl_command(curl_command)
+    return parse_curl_command(curl_command, os.path.dirname(file_path))
 
 
-def parse_curl_command(curl_command: str) -> dict:
+def parse_curl_command(curl_command: str, base_dir=".") -> dict:
     tokens = shlex.split(curl_command)
 
     result = {
@@ -21,6 +34,9 @@ def parse_curl_command(curl_command: str) -> dict:
         "body": {}
     }
 
+    method = None
+    data_parts = []
+    get_data = False
     url_found = False
     i = 0
 
@@ -29,41 +45,222 @@ def parse_curl_command(curl_command: str) -> dict:
         if token == "curl":
             i += 1
         elif token in ("-X", "--request"):
-            result["method"] = tokens[i + 1].upper()
+            method = tokens[i + 1].upper()
             i += 2
+        elif token.startswith("-X") and len(token) > 2:
+            method = token[2:].upper()
+            i += 1
         elif token in ("-H", "--header"):
             header = tokens[i + 1]
             key, value = header.split(":", 1)
             result["headers"][key.strip()] = value.strip()
             i += 2
-        elif token in ("-d", "--data", "--data-raw"):
-            data_str = tokens[i + 1]
-            try:
-                result["body"] = json.loads(data_str)
-            except json.JSONDecodeError:
-                body_items = data_str.split("&")
-                result["body"] = {k: v for k, v in (item.split("=") for item in body_items)}
+        elif token in DATA_OPTIONS:
+            data_parts.append(_read_data(tokens[i + 1], token, base_dir))
             i += 2
+        elif token in ("-G", "--get"):
+            get_data = True
+            i += 1
+        elif token in ("-u", "--user"):
+            credentials = base64.b64encode(tokens[i + 1].encode()).decode()
+            result["headers"]["Authorization"] = f"Basic {credentials}"
+            i += 2
+        elif token == "--compressed":
+            result["headers"].setdefault("Accept-Encoding", "deflate, gzip")
+            i += 1
         elif token == "--url":
             url = tokens[i + 1]
             url_found = True
-            parsed_url = urlparse(url)
-            result["route"] = parsed_url.path
-            result["query_params"] = {k: v[0] for k, v in parse_qs(parsed_url.query).items()}
+            result["route"], result["query_params"] = _parse_url(url)
             i += 2
         elif token.startswith("http"):
             if not url_found:
-                parsed_url = urlparse(token)
-                result["route"] = parsed_url.path
-                result["query_params"] = {k: v[0] for k, v in parse_qs(parsed_url.query).items()}
+                result["route"], result["query_params"] = _parse_url(token)
                 url_found = True
             i += 1
         else:
             i += 1
 
+    # like curl: -G sends the data in the query string, otherwise data makes the request a POST
+    if data_parts and get_data:
+        result["query_params"].update(dict(parse_qsl("&".join(data_parts), keep_blank_values=True)))
+        result["method"] = method or "GET"
+    elif data_parts:
+        result["body"] = _parse_body("&".join(data_parts))
+        result["method"] = method or "POST"
+    else:
+        result["method"] = method or "GET"
+
     return result
 
 
+def _parse_url(url):
+    parsed_url = urlparse(url)
+    return parsed_url.path, {k: v[0] for k, v in parse_qs(parsed_url.query).items()}
+
+
+def _read_data(data_str, option, base_dir):
+    # @file reads the body from a file, except for --data-raw which sends it as is
+    if not data_str.startswith("@") or option == "--data-raw":
+        return data_str
+
+    with open(os.path.join(base_dir, data_str[1:]), "r") as f:
+        data = f.read()
+
+    # only --data-binary keeps the newlines of the file
+    return data if option == "--data-binary" else data.replace("\r", "").replace("\n", "")
+
+
+def _parse_body(data_str):
+    try:
+        return json.loads(data_str)
+    except json.JSONDecodeError:
+        return dict(parse_qsl(data_str, keep_blank_values=True))
+
+
+def split_curl_commands(text):
+    # a file can hold several commands, each one starting on a line beginning with 'curl'
+    command = []
+    for line in text.splitlines():
+        if line.lstrip().startswith("curl ") and command:
+            yield "\n".join(command)
+            command = []
+        if line.strip() or command:
+            command.append(line)
+
+    if command:
+        yield "\n".join(command)
+
+
+def iter_curl_commands(directory):
+    for file_name in sorted(os.listdir(directory)):
+        file_path = os.path.join(directory, file_name)
+        if not os.path.isfile(file_path):
+            continue
+
+        with open(file_path, "r") as f:
+            for curl_command in split_curl_commands(f.read()):
+                yield curl_command, directory
+
+
+def iter_har_entries(file_path, chunk_size=1 << 20):
+    # entries are decoded one by one from a sliding buffer, a HAR export of thousands of requests never sits in memory
+    decoder = json.JSONDecoder()
+
+    with open(file_path, "r", encoding="utf-8") as f:
+        buffer = ""
+        while True:
+            position = buffer.find('"entries"')
+            if position != -1:
+                array_start = buffer.find("[", position)
+                if array_start != -1:
+                    buffer = buffer[array_start + 1:]
+                    break
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            buffer = buffer[-len('"entries"'):] + chunk if position == -1 else buffer + chunk
+
+        # the decoder moves along the buffer by index, the decoded part is dropped only when a new chunk is read
+        position = 0
+        while True:
+            position = HAR_ENTRY_SEPARATOR.match(buffer, position).end()
+            if buffer.startswith("]", position):
+                return
+
+            try:
+                if position == len(buffer):
+                    raise json.JSONDecodeError("Expecting value", buffer, position)
+                entry, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    raise ValueError(f"Truncated HAR file '{file_path}'")
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+
+            yield entry
+
+
+def parse_har_entry(entry):
+    request = entry["request"]
+    route, query_params = _parse_url(request["url"])
+
+    headers = {
+        header["name"]: header["value"] for header in request.get("headers", [])
+        if not _is_ignored_har_header(header["name"].lower())
+    }
+
+    body = {}
+    post_data = request.get("postData")
+    if post_data:
+        if post_data.get("text"):
+            body = _parse_body(post_data["text"])
+        elif post_data.get("params"):
+            body = {param["name"]: param.get("value", "") for param in post_data["params"]}
+
+    return {
+        "method": request["method"].upper(),
+        "route": route,
+        "headers": headers,
+        "query_params": query_params,
+        "body": body
+    }
+
+
+def _is_ignored_har_header(name):
+    return name.startswith(IGNORED_HAR_HEADER_PREFIXES) or name in IGNORED_HAR_HEADERS or name in CREDENTIAL_HAR_HEADERS
+
+
+def _parse_curl_item(item):
+    return parse_curl_command(*item)
+
+
+def parse_in_parallel(function, items, workers=None, batch_size=1000):
+    # items are submitted in bounded batches, Executor.map alone would consume the whole input upfront
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            batch = list(itertools.islice(items, batch_size))
+            if not batch:
+                return
+            yield from executor.map(function, batch, chunksize=max(1, len(batch) // ((workers or os.cpu_count() or 1) * 4)))
+
+
+def api_config_key(api_config):
+    return api_config.get("method", "GET").upper(), api_config["route"], json.dumps(api_config.get("query_params", {}), sort_keys=True)
+
+
+def merge_into_apis_to_test(api_configs, apis_to_test_file):
+    apis_to_test = []
+    if os.path.exists(apis_to_test_file):
+        with open(apis_to_test_file, "r") as f:
+            apis_to_test = json.load(f)
+
+    known_keys = {api_config_key(api_config) for api_config in apis_to_test}
+    added = 0
+    duplicates = 0
+
+    for api_config in api_configs:
+        key = api_config_key(api_config)
+        if key in known_keys:
+            duplicates += 1
+            continue
+
+        known_keys.add(key)
+        apis_to_test.append(api_config)
+        added += 1
+
+    directory = os.path.dirname(apis_to_test_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(apis_to_test_file, "w") as f:
+        json.dump(apis_to_test, f, indent=4)
+
+    return added, duplicates
+
+
 def save_to_json(data, filename="output.json", directory="curl_to_json_output"):
     os.makedirs(directory, exist_ok=True)
 
@@ -75,13 +272,30 @@ def save_to_json(data, filename="output.json", directory="curl_to_json_output"):
 
 if __name__ == "__main__":
 
-    script_dir = os.path.dirname(os.path.abspath(__file__)) 
+    parser = argparse.ArgumentParser(description="Convert curl commands or a HAR export into API test configs.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--dir", help="Directory of files containing curl commands, one or more per file")
+    source.add_argument("--har", help="HAR file exported from the browser")
+    parser.add_argument("--output", default=os.path.join("curl_to_json_output", "apis_to_test.json"), help="apis_to_test.json file the configs are merged into, deduplicated by method, route and query params (default: curl_to_json_output/apis_to_test.json)")
+    parser.add_argument("--workers", type=int, help="Number of processes parsing the curl commands of --dir in parallel (default: number of cores)")
+    args = parser.parse_args()
+
+    if args.dir or args.har:
+        if args.dir:
+            api_configs = parse_in_parallel(_parse_curl_item, iter_curl_commands(args.dir), args.workers)
+        else:
+            # reshaping a decoded entry costs less than sending it to another process
+            api_configs = map(parse_har_entry, iter_har_entries(args.har))
 
-    curl_command_file_path = os.path.join(script_dir, "curl_to_parse.txt")
+        added, duplicates = merge_into_apis_to_test(api_configs, args.output)
+        print(f"{added} API configs added to '{args.output}', {duplicates} duplicates skipped")
+    else:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
 
-    config = parse_curl_file(curl_command_file_path)
+        curl_command_file_path = os.path.join(script_dir, "curl_to_parse.txt")
 
-    save_to_json(config)
+        config = parse_curl_file(curl_command_file_path)
 
-    print(f"curl_command.txt parsed and saved json config to 'curl_to_json_output' dir")
+        save_to_json(config)
 
+        print(f"curl_command.txt parsed and saved json config to 'curl_to_json_output' dir")
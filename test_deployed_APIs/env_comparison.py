@@ -0,0 +1,109 @@
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from structural_diff import diff_structures
+
+class EnvComparison:
+    def __init__(self, tester_a, tester_b, ignored_paths=None, concurrency=1, max_differences=100):
+        self.tester_a = tester_a
+        self.tester_b = tester_b
+        self.ignored_paths = ignored_paths or []
+        self.concurrency = max(1, concurrency)
+        self.max_differences = max_differences
+
+    def run_and_save_results(self):
+        microservice = self.tester_a.microservice
+        env_a = self.tester_a.env
+        env_b = self.tester_b.env
+
+        logging.info(f"--------------------------------------------begin comparison run ---------------------------------------------")
+        logging.info(f"microservice: {microservice}, environments: {env_a} vs {env_b}")
+
+        try:
+            report = self.run(self.tester_a._expand_apis_to_test(self.tester_a._load_apis_to_test()))
+            self.tester_a._save_results_into_file(f"api_compare_{microservice}_{env_a}_vs_{env_b}.json", report)
+        finally:
+            logging.info(f"--------------------------------------------end comparison run -----------------------------------------------")
+
+        summary = report["summary"]
+        print(f"<{microservice}> <{env_a} vs {env_b}> Comparison completed: {summary['routes']} routes, {summary['status_differences']} status differences, {summary['body_differences']} body differences, median latency delta {summary['latency_delta_p50_sec']}s. Check api_results/ directory for more infos.")
+        for api_route, route_report in report["routes"].items():
+            if route_report["status_differs"]:
+                print(f"    status differs {api_route}: {route_report[env_a].get('status_code')} -> {route_report[env_b].get('status_code')}")
+        return report
+
+    def run(self, api_cases):
+        start_time = perf_counter()
+        routes = {}
+
+        # both calls of a pair are submitted back to back, so the environments see the same request at the same moment
+        with ThreadPoolExecutor(max_workers=2 * self.concurrency) as executor:
+            pending = deque()
+            for api_info in api_cases:
+                pending.append((api_info, executor.submit(self.tester_a._call_single_api, api_info), executor.submit(self.tester_b._call_single_api, api_info)))
+
+                if len(pending) >= self.concurrency:
+                    self._add_pair(routes, *pending.popleft())
+
+            for pair in pending:
+                self._add_pair(routes, *pair)
+
+        deltas = sorted(route_report["latency_delta_sec"] for route_report in routes.values() if route_report["latency_delta_sec"] is not None)
+
+        return {
+            "microservice": self.tester_a.microservice,
+            "environments": [self.tester_a.env, self.tester_b.env],
+            "ignored_paths": self.ignored_paths,
+            "summary": {
+                "routes": len(routes),
+                "status_differences": sum(route_report["status_differs"] for route_report in routes.values()),
+                "body_differences": sum(bool(route_report["body_differences"]) for route_report in routes.values()),
+                "latency_delta_p50_sec": _percentile(deltas, 0.5),
+                "latency_delta_p95_sec": _percentile(deltas, 0.95),
+                "wall_time_sec": round(perf_counter() - start_time, 4)
+            },
+            "routes": routes
+        }
+
+    def _add_pair(self, routes, api_info, future_a, future_b):
+        env_a = self.tester_a.env
+        env_b = self.tester_b.env
+        outcome_a = future_a.result()
+        outcome_b = future_b.result()
+
+        route_report = {
+            "method": api_info.get("method", "GET").upper(),
+            env_a: _side(outcome_a),
+            env_b: _side(outcome_b),
+            "status_differs": outcome_a.get("status_code") != outcome_b.get("status_code"),
+            # positive when the second environment is slower
+            "latency_delta_sec": round(outcome_b["response_time"] - outcome_a["response_time"], 4) if "error" not in outcome_a and "error" not in outcome_b else None,
+            "body_differences": []
+        }
+
+        if "error" not in outcome_a and "error" not in outcome_b:
+            differences = diff_structures(_body(outcome_a), _body(outcome_b), self.max_differences, self.ignored_paths)
+            route_report["body_differences"] = [
+                {"path": difference["path"], "change": difference["change"], env_a: difference["baseline"], env_b: difference["current"]}
+                for difference in differences
+            ]
+
+        if route_report["status_differs"]:
+            logging.warning("API: %s status differs: %s %s, %s %s", api_info["route"], env_a, route_report[env_a].get("status_code"), env_b, route_report[env_b].get("status_code"))
+
+        routes[api_info["route"]] = route_report
+
+def _side(outcome):
+    if "error" in outcome:
+        return {"error": outcome["error"]}
+    return {"status_code": outcome["status_code"], "response_time_sec": round(outcome["response_time"], 4)}
+
+def _body(outcome):
+    # with the hash or none body policy the digests and sizes are compared instead
+    return outcome["body"].get("response", outcome["body"])
+
+def _percentile(sorted_values, quantile):
+    if not sorted_values:
+        return None
+    return sorted_values[min(int(len(sorted_values) * quantile), len(sorted_values) - 1)]
@@ -0,0 +1,106 @@
+import math
+
+# HDR-style log-linear histogram: values are stored in microseconds, every power of two is split into
+# SUB_BUCKET_HALF linear buckets, so memory is fixed and the relative error stays below 1%.
+SUB_BUCKET_BITS = 8
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+SUB_BUCKET_HALF = SUB_BUCKET_COUNT // 2
+
+SUMMARY_PERCENTILES = (50, 90, 95, 99)
+
+class LatencyHistogram:
+    def __init__(self, max_value_sec=3600):
+        self.max_value_sec = max_value_sec
+        self.highest_trackable_value = int(max_value_sec * 1_000_000)
+        self.counts = [0] * (self._bucket_index(self.highest_trackable_value) + 1)
+        self.total_count = 0
+        self.min_value = None
+        self.max_value = 0
+
+    def record(self, value_sec):
+        value = min(max(int(value_sec * 1_000_000), 0), self.highest_trackable_value)
+
+        self.counts[self._bucket_index(value)] += 1
+        self.total_count += 1
+        self.max_value = max(self.max_value, value)
+        self.min_value = value if self.min_value is None else min(self.min_value, value)
+
+    def merge(self, other):
+        if other.highest_trackable_value != self.highest_trackable_value:
+            raise ValueError("Cannot merge histograms with a different max_value_sec")
+
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+
+        self.total_count += other.total_count
+        self.max_value = max(self.max_value, other.max_value)
+        if other.min_value is not None:
+            self.min_value = other.min_value if self.min_value is None else min(self.min_value, other.min_value)
+
+    def percentile(self, percentile):
+        return self.percentiles((percentile,))[0]
+
+    def percentiles(self, percentiles):
+        # every percentile is found in a single cumulative pass over the buckets, in ascending order
+        if self.total_count == 0:
+            return [0.0] * len(percentiles)
+
+        targets = sorted((max(1, math.ceil(percentile / 100 * self.total_count)), position) for position, percentile in enumerate(percentiles))
+        values = [self.max_value / 1_000_000] * len(percentiles)
+        next_target = 0
+        cumulative_count = 0
+
+        for index, count in enumerate(self.counts):
+            if not count:
+                continue
+            cumulative_count += count
+            while next_target < len(targets) and cumulative_count >= targets[next_target][0]:
+                values[targets[next_target][1]] = min(self._highest_equivalent_value(index), self.max_value) / 1_000_000
+                next_target += 1
+            if next_target == len(targets):
+                break
+
+        return values
+
+    def summary(self):
+        summary = {"count": self.total_count}
+        for percentile, value in zip(SUMMARY_PERCENTILES, self.percentiles(SUMMARY_PERCENTILES)):
+            summary[f"p{percentile}_sec"] = round(value, 4)
+        summary["max_sec"] = round(self.max_value / 1_000_000, 4)
+        return summary
+
+    def to_dict(self):
+        return {
+            "max_value_sec": self.max_value_sec,
+            "total_count": self.total_count,
+            "min_value_us": self.min_value,
+            "max_value_us": self.max_value,
+            "counts": {str(index): count for index, count in enumerate(self.counts) if count}
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data["max_value_sec"])
+        for index, count in data["counts"].items():
+            histogram.counts[int(index)] = count
+        histogram.total_count = data["total_count"]
+        histogram.min_value = data["min_value_us"]
+        histogram.max_value = data["max_value_us"]
+        return histogram
+
+    @staticmethod
+    def _bucket_index(value):
+        if value < SUB_BUCKET_COUNT:
+            return value
+
+        shift = value.bit_length() - SUB_BUCKET_BITS
+        return SUB_BUCKET_COUNT + (shift - 1) * SUB_BUCKET_HALF + (value >> shift) - SUB_BUCKET_HALF
+
+    @staticmethod
+    def _highest_equivalent_value(index):
+        if index < SUB_BUCKET_COUNT:
+            return index
+
+        shift = (index - SUB_BUCKET_COUNT) // SUB_BUCKET_HALF + 1
+        sub_bucket = (index - SUB_BUCKET_COUNT) % SUB_BUCKET_HALF + SUB_BUCKET_HALF
+        return ((sub_bucket + 1) << shift) - 1
@@ -0,0 +1,146 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter, sleep
+from case_expansion import route_template
+from latency_histogram import LatencyHistogram
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600}
+
+def parse_duration(duration):
+    duration = str(duration).strip().lower()
+    unit = duration[-1]
+
+    if unit in DURATION_UNITS:
+        return float(duration[:-1]) * DURATION_UNITS[unit]
+
+    return float(duration)
+
+def iter_cases_forever(api_tester, apis_to_test):
+    # cases are expanded again on every pass instead of being kept in memory like itertools.cycle would do
+    while True:
+        has_cases = False
+        for api_info in api_tester._expand_apis_to_test(apis_to_test):
+            has_cases = True
+            yield api_info
+        if not has_cases:
+            return
+
+class LoadTester:
+    def __init__(self, api_tester, rps, duration_sec, max_in_flight=256):
+        self.api_tester = api_tester
+        self.rps = rps
+        self.duration_sec = duration_sec
+        self.max_in_flight = max_in_flight
+        self.route_stats = {}
+        self.lock = threading.Lock()
+        self.history_recorder = None
+
+    def run_and_save_results(self):
+        microservice = self.api_tester.microservice
+        env = self.api_tester.env
+
+        logging.info(f"--------------------------------------------begin load run ---------------------------------------------------")
+        logging.info(f"microservice: {microservice}, env: {env}, rps: {self.rps}, duration: {self.duration_sec}s")
+
+        try:
+            apis_to_test = self.api_tester._load_apis_to_test()
+            history = self.api_tester.history
+            self.history_recorder = history.start_run(microservice, env, "load") if history is not None else None
+            sent, wall_time = self._run(apis_to_test)
+
+            if self.history_recorder is not None:
+                self.history_recorder.finish(wall_time, {route: stats["latency"] for route, stats in self.route_stats.items()})
+
+            summary = self._build_summary(sent, wall_time)
+            self.api_tester._save_results_into_file(self.api_tester._results_filename("api_load"), summary)
+
+        finally:
+            logging.info(f"--------------------------------------------end load run -----------------------------------------------------")
+
+        overall = LatencyHistogram()
+        for stats in self.route_stats.values():
+            overall.merge(stats["latency"])
+        latency = overall.summary()
+
+        print(f"<{microservice}> <{env}> Latency over {latency['count']} requests: p50 {latency['p50_sec']}s, p90 {latency['p90_sec']}s, p99 {latency['p99_sec']}s, max {latency['max_sec']}s")
+        self.api_tester._print_connections_summary()
+        self.api_tester._print_rate_limit_summary()
+        print(f"<{microservice}> <{env}> Load test completed. Sent {sent} requests in {round(wall_time, 2)}s ({summary['achieved_rps']} rps, target {self.rps} rps). Check api_results/ directory for more infos.")
+        return summary
+
+    def _run(self, apis_to_test):
+        total_requests = int(self.rps * self.duration_sec)
+        interval = 1.0 / self.rps
+        sent = 0
+
+        start_time = perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            for index, api_info in zip(range(total_requests), iter_cases_forever(self.api_tester, apis_to_test)):
+                # open-loop schedule: the send time of every request is fixed upfront and never waits for responses
+                scheduled_time = start_time + index * interval
+                delay = scheduled_time - perf_counter()
+                if delay > 0:
+                    sleep(delay)
+
+                executor.submit(self._call_and_record, api_info, scheduled_time)
+                sent += 1
+
+        return sent, perf_counter() - start_time
+
+    def _call_and_record(self, api_info, scheduled_time):
+        outcome = self.api_tester._call_single_api(api_info)
+
+        # measured from the scheduled send time, so time spent queued behind a slow backend is not hidden,
+        # but the wait on the rate limiter is a choice of the run and is reported on its own
+        rate_limit_wait_sec = outcome.get("rate_limit_wait_sec", 0.0)
+        latency = perf_counter() - scheduled_time - rate_limit_wait_sec
+
+        if self.history_recorder is not None:
+            method = api_info.get("method", "GET").upper()
+            self.history_recorder.add_call(route_template(api_info), method, outcome.get("status_code"), latency, outcome.get("error"))
+
+        with self.lock:
+            stats = self.route_stats.setdefault(route_template(api_info), {
+                "count": 0,
+                "errors": 0,
+                "status_codes": {},
+                "rate_limit_wait_sec": 0.0,
+                "latency": LatencyHistogram()
+            })
+
+            stats["count"] += 1
+            stats["rate_limit_wait_sec"] += rate_limit_wait_sec
+            stats["latency"].record(latency)
+
+            if "error" in outcome:
+                stats["errors"] += 1
+                logging.error("API: %s failed with error: %s", api_info["route"], outcome["error"], extra=self.api_tester._log_context(api_info, outcome.get("correlation_id")))
+            else:
+                status_code = str(outcome["status_code"])
+                stats["status_codes"][status_code] = stats["status_codes"].get(status_code, 0) + 1
+
+    def _build_summary(self, sent, wall_time):
+        routes = {}
+        for route, stats in self.route_stats.items():
+            routes[route] = {
+                "count": stats["count"],
+                "errors": stats["errors"],
+                "status_codes": stats["status_codes"],
+                "rate_limit_wait_sec": round(stats["rate_limit_wait_sec"], 4),
+                "latency": stats["latency"].summary(),
+                "latency_histogram": stats["latency"].to_dict()
+            }
+
+        return {
+            "microservice": self.api_tester.microservice,
+            "env": self.api_tester.env,
+            "target_rps": self.rps,
+            "duration_sec": self.duration_sec,
+            "sent": sent,
+            "wall_time_sec": round(wall_time, 3),
+            "achieved_rps": round(sent / wall_time, 2) if wall_time else 0.0,
+            "connections": self.api_tester._connections_summary(),
+            "rate_limit": self.api_tester._rate_limit_summary(),
+            "routes": routes
+        }
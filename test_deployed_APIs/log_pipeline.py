@@ -0,0 +1,84 @@
+import json
+import logging
+import queue
+import random
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+DEFAULT_LOG_FILE = "api_test.log"
+# attributes passed with extra={...} that are written as fields of the JSON line
+STRUCTURED_FIELDS = ("correlation_id", "microservice", "env", "method", "route", "status_code", "response_time_sec")
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        line = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "message": record.getMessage()
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                line[field] = value
+        if record.exc_info:
+            line["exception"] = self.formatException(record.exc_info)
+
+        return json.dumps(line, separators=(",", ":"), default=str)
+
+class SuccessSampler(logging.Filter):
+    def __init__(self, sample_rate):
+        super().__init__()
+        if not 0 <= sample_rate <= 1:
+            raise ValueError(f"Invalid log sample rate {sample_rate}: use a value between 0 and 1")
+        self.sample_rate = sample_rate
+
+    def filter(self, record):
+        # only the records flagged as a successful call are sampled, errors and everything else always go through
+        if not getattr(record, "success", False) or self.sample_rate >= 1:
+            return True
+        return random.random() < self.sample_rate
+
+class DeferredQueueHandler(QueueHandler):
+    def prepare(self, record):
+        # QueueHandler formats the message in the calling thread, the record is queued as is so that
+        # the %-formatting happens in the writer thread
+        return record
+
+class LogPipeline:
+    def __init__(self, path=DEFAULT_LOG_FILE, sample_rate=1.0, level=logging.INFO):
+        self.path = path
+        self.level = level
+        self.sampler = SuccessSampler(sample_rate)
+        self.queue = queue.SimpleQueue()
+        self.queue_handler = None
+        self.listener = None
+        self.file_handler = None
+        self.previous_level = None
+
+    def start(self):
+        self.file_handler = logging.FileHandler(self.path)
+        self.file_handler.setFormatter(JsonFormatter())
+
+        # workers only append the record to an unbounded queue, the file is written by the listener thread
+        self.queue_handler = DeferredQueueHandler(self.queue)
+        self.queue_handler.addFilter(self.sampler)
+        self.listener = QueueListener(self.queue, self.file_handler)
+        self.listener.start()
+
+        root_logger = logging.getLogger()
+        root_logger.addHandler(self.queue_handler)
+        self.previous_level = root_logger.level
+        root_logger.setLevel(self.level)
+        return self
+
+    def stop(self):
+        if self.listener is None:
+            return
+
+        root_logger = logging.getLogger()
+        root_logger.removeHandler(self.queue_handler)
+        root_logger.setLevel(self.previous_level)
+        # the listener writes what is left in the queue before returning
+        self.listener.stop()
+        self.file_handler.close()
+        self.listener = None
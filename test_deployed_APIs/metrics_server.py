@@ -0,0 +1,123 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY_BUCKETS_SEC = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+def status_class(status_code):
+    return f"{status_code // 100}xx" if status_code is not None else "error"
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(**labels):
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+class RunMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = {}
+        self.responses = {}
+        self.in_flight = {}
+        self.latency_buckets = {}
+        self.latency_sum = {}
+
+    def request_started(self, microservice, env):
+        with self.lock:
+            self.in_flight[(microservice, env)] = self.in_flight.get((microservice, env), 0) + 1
+
+    def request_finished(self, microservice, env, method, route, status_code, latency_sec):
+        route_key = (microservice, env, method, route)
+        status_key = (microservice, env, route, status_class(status_code))
+
+        with self.lock:
+            self.in_flight[(microservice, env)] -= 1
+            self.requests[route_key] = self.requests.get(route_key, 0) + 1
+            self.responses[status_key] = self.responses.get(status_key, 0) + 1
+
+            buckets = self.latency_buckets.setdefault(route_key, [0] * (len(LATENCY_BUCKETS_SEC) + 1))
+            for index, upper_bound in enumerate(LATENCY_BUCKETS_SEC):
+                if latency_sec <= upper_bound:
+                    buckets[index] += 1
+                    break
+            else:
+                buckets[-1] += 1
+            self.latency_sum[route_key] = self.latency_sum.get(route_key, 0.0) + latency_sec
+
+    def render(self):
+        with self.lock:
+            lines = [
+                "# TYPE api_tester_requests counter",
+                "# HELP api_tester_requests Completed API calls.",
+            ]
+            for (microservice, env, method, route), count in self.requests.items():
+                lines.append(f"api_tester_requests_total{_labels(microservice=microservice, env=env, method=method, route=route)} {count}")
+
+            lines += [
+                "# TYPE api_tester_responses counter",
+                "# HELP api_tester_responses Completed API calls by status class, 'error' when no response was received.",
+            ]
+            for (microservice, env, route, response_class), count in self.responses.items():
+                lines.append(f"api_tester_responses_total{_labels(microservice=microservice, env=env, route=route, status_class=response_class)} {count}")
+
+            lines += [
+                "# TYPE api_tester_in_flight_requests gauge",
+                "# HELP api_tester_in_flight_requests API calls currently waiting for a response.",
+            ]
+            for (microservice, env), count in self.in_flight.items():
+                lines.append(f"api_tester_in_flight_requests{_labels(microservice=microservice, env=env)} {count}")
+
+            lines += [
+                "# TYPE api_tester_request_duration_seconds histogram",
+                "# HELP api_tester_request_duration_seconds Duration of the API calls.",
+            ]
+            for (microservice, env, method, route), buckets in self.latency_buckets.items():
+                cumulative_count = 0
+                for upper_bound, count in zip(LATENCY_BUCKETS_SEC + ("+Inf",), buckets):
+                    cumulative_count += count
+                    lines.append(f"api_tester_request_duration_seconds_bucket{_labels(microservice=microservice, env=env, method=method, route=route, le=upper_bound)} {cumulative_count}")
+                labels = _labels(microservice=microservice, env=env, method=method, route=route)
+                lines.append(f"api_tester_request_duration_seconds_sum{labels} {self.latency_sum[(microservice, env, method, route)]}")
+                lines.append(f"api_tester_request_duration_seconds_count{labels} {cumulative_count}")
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+class MetricsServer:
+    def __init__(self, metrics, port, host="127.0.0.1"):
+        self.metrics = metrics
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler_class(self):
+        metrics = self.metrics
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return MetricsHandler
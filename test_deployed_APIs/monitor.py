@@ -0,0 +1,145 @@
+import json
+import logging
+import os
+import random
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from time import perf_counter
+
+class RouteWindow:
+    def __init__(self, size, failure_threshold=1):
+        # fixed-size ring buffers: memory stays the same after weeks of cycles
+        self.successes = deque(maxlen=size)
+        self.latencies = deque(maxlen=size)
+        self.failure_threshold = failure_threshold
+        self.consecutive_failures = 0
+        self.state = "unknown"
+
+    def record(self, success, latency_sec):
+        self.successes.append(success)
+        if latency_sec is not None:
+            self.latencies.append(latency_sec)
+
+        self.consecutive_failures = 0 if success else self.consecutive_failures + 1
+
+        previous_state = self.state
+        if success:
+            self.state = "healthy"
+        elif self.consecutive_failures >= self.failure_threshold:
+            self.state = "failing"
+        return previous_state
+
+    @property
+    def error_rate(self):
+        return round(self.successes.count(False) / len(self.successes), 4) if self.successes else 0.0
+
+    @property
+    def p95_sec(self):
+        if not self.latencies:
+            return None
+        latencies = sorted(self.latencies)
+        return round(latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)], 4)
+
+class Monitor:
+    def __init__(self, api_tester, interval_sec, jitter_sec=0.0, window_size=100, failure_threshold=1, stop_event=None):
+        self.api_tester = api_tester
+        self.interval_sec = interval_sec
+        self.jitter_sec = jitter_sec
+        self.window_size = window_size
+        self.failure_threshold = failure_threshold
+        self.stop_event = stop_event or threading.Event()
+        self.windows = {}
+        self.apis_to_test = []
+        self.apis_mtime = None
+        self.cycles = 0
+        self.events_path = os.path.join("api_results", api_tester._results_filename("api_monitor", "jsonl"))
+
+    def run(self, max_cycles=None):
+        microservice = self.api_tester.microservice
+        env = self.api_tester.env
+        print(f"<{microservice}> <{env}> Watching every {self.interval_sec}s (jitter up to {self.jitter_sec}s), state changes are appended to {self.events_path}")
+
+        while not self.stop_event.is_set() and (max_cycles is None or self.cycles < max_cycles):
+            cycle_start = perf_counter()
+            self._reload_if_changed()
+            self.run_cycle()
+
+            # jitter spreads the cycles of many watchers instead of hitting the deployment all at once
+            next_start = cycle_start + self.interval_sec + random.uniform(0, self.jitter_sec)
+            if max_cycles is None or self.cycles < max_cycles:
+                self.stop_event.wait(max(next_start - perf_counter(), 0))
+
+        return self.cycles
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run_cycle(self):
+        api_cases = self.api_tester._expand_apis_to_test(self.apis_to_test)
+
+        # the session, token and pooled connections of the tester are reused cycle after cycle
+        if self.api_tester.concurrency > 1:
+            outcomes = self.api_tester._call_apis_concurrently(api_cases)
+        else:
+            outcomes = ((api_info, self.api_tester._call_single_api(api_info)) for api_info in api_cases)
+
+        seen = set()
+        failures = 0
+        for api_info, outcome in outcomes:
+            key = (api_info.get("method", "GET").upper(), api_info["route"])
+            seen.add(key)
+
+            success = "error" not in outcome and outcome["status_code"] < 400
+            failures += not success
+            window = self.windows.setdefault(key, RouteWindow(self.window_size, self.failure_threshold))
+            previous_state = window.record(success, outcome.get("response_time"))
+
+            # a route first seen healthy is not news, every other change of state is
+            if window.state != previous_state and not (previous_state == "unknown" and window.state == "healthy"):
+                self._emit_transition(key, previous_state, window, outcome)
+
+        # routes removed from the suite stop taking memory
+        for key in self.windows.keys() - seen:
+            del self.windows[key]
+
+        self.cycles += 1
+        logging.info(f"microservice: {self.api_tester.microservice}, env: {self.api_tester.env}, watch cycle {self.cycles}: {len(seen)} routes, {failures} failing calls")
+
+    def _reload_if_changed(self):
+        try:
+            mtime = os.stat(self.api_tester.apis_to_test_file).st_mtime_ns
+            if mtime == self.apis_mtime:
+                return
+            self.apis_to_test = self.api_tester._load_apis_to_test()
+            self.apis_mtime = mtime
+        except (OSError, ValueError) as e:
+            # a file caught halfway through an edit is picked up on a later cycle, the last valid suite keeps running
+            logging.error(f"Cannot reload {self.api_tester.apis_to_test_file}: {e}")
+            return
+
+        logging.info(f"Loaded {len(self.apis_to_test)} APIs from {self.api_tester.apis_to_test_file}")
+
+    def _emit_transition(self, key, previous_state, window, outcome):
+        method, api_route = key
+        event = {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "microservice": self.api_tester.microservice,
+            "env": self.api_tester.env,
+            "method": method,
+            "route": api_route,
+            "from": previous_state,
+            "to": window.state,
+            "status_code": outcome.get("status_code"),
+            "error_rate": window.error_rate,
+            "p95_sec": window.p95_sec
+        }
+        if "error" in outcome:
+            event["error"] = outcome["error"]
+
+        os.makedirs(os.path.dirname(self.events_path), exist_ok=True)
+        with open(self.events_path, "a") as file:
+            file.write(json.dumps(event, separators=(",", ":")) + "\n")
+
+        logging.warning(f"API: {method} {api_route} went from {previous_state} to {window.state} (status: {event['status_code']}, error rate: {event['error_rate']})")
+        print(f"<{self.api_tester.microservice}> <{self.api_tester.env}> {method} {api_route}: {previous_state} -> {window.state}")
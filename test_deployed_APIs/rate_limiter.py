@@ -0,0 +1,46 @@
+import threading
+from time import perf_counter, sleep
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        if rate <= 0 or burst < 1:
+            raise ValueError(f"Invalid token bucket: rate must be positive and burst at least 1, got rate {rate} and burst {burst}")
+
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = perf_counter()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            now = perf_counter()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+
+            # the token is taken right away, possibly going negative: waiters queue up in arrival order
+            # and sleep outside the lock instead of polling it
+            self.tokens -= 1
+            wait_time = -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+        if wait_time:
+            sleep(wait_time)
+        return wait_time
+
+class HostRateLimiter:
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1, round(rate))
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+        # fail fast on invalid settings rather than on the first request
+        TokenBucket(self.rate, self.burst)
+
+    def acquire(self, host):
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = self.buckets[host] = TokenBucket(self.rate, self.burst)
+
+        return bucket.acquire()
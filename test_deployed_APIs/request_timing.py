@@ -0,0 +1,143 @@
+import socket
+import threading
+from time import perf_counter
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+
+# requests runs a whole request/response cycle on the calling thread, so the timer of the request
+# in progress is kept thread-local and filled in by the connection hooks below
+_local = threading.local()
+
+def current_timer():
+    return getattr(_local, "timer", None)
+
+class RequestTimer:
+    def __init__(self):
+        self.dns_sec = 0.0
+        self.connect_sec = 0.0
+        self.tls_sec = 0.0
+        self.new_connection = False
+        self.connected_at = None
+        self.request_sent_at = None
+        self.headers_received_at = None
+        self.rate_limit_wait_sec = 0.0
+
+    def __enter__(self):
+        _local.timer = self
+        return self
+
+    def __exit__(self, *exc_info):
+        _local.timer = None
+
+    @property
+    def observed(self):
+        return self.request_sent_at is not None and self.headers_received_at is not None
+
+    def phases(self, end_time):
+        if not self.observed:
+            return None
+
+        # for plain http the connection is opened while sending the request, so waiting starts once connected
+        waiting_since = max(self.request_sent_at, self.connected_at or 0.0)
+
+        return {
+            "dns_sec": round(self.dns_sec, 4),
+            "connect_sec": round(self.connect_sec, 4),
+            "tls_sec": round(self.tls_sec, 4),
+            "ttfb_sec": round(self.headers_received_at - waiting_since, 4),
+            "body_sec": round(end_time - self.headers_received_at, 4),
+            "connection_reused": not self.new_connection
+        }
+
+class _TimedConnectionMixin:
+    def _new_conn(self):
+        timer = current_timer()
+        if timer is None:
+            return super()._new_conn()
+
+        start_time = perf_counter()
+        try:
+            addresses = list(dict.fromkeys(info[4][0] for info in socket.getaddrinfo(self._dns_host, self.port, allowed_gai_family(), socket.SOCK_STREAM)))
+        except OSError:
+            # let urllib3 resolve again and raise its usual NameResolutionError
+            return super()._new_conn()
+        resolved_at = perf_counter()
+
+        # like urllib3's create_connection, every resolved address is tried in turn (e.g. IPv6 then IPv4),
+        # the connect phase is the one of the attempt that succeeded
+        dns_host = self._dns_host
+        try:
+            for index, address in enumerate(addresses):
+                self._dns_host = address
+                attempt_start = perf_counter()
+                try:
+                    sock = super()._new_conn()
+                    break
+                except (NewConnectionError, ConnectTimeoutError):
+                    if index == len(addresses) - 1:
+                        raise
+        finally:
+            self._dns_host = dns_host
+
+        timer.dns_sec = resolved_at - start_time
+        timer.connect_sec = perf_counter() - attempt_start
+        timer.connected_at = perf_counter()
+        timer.new_connection = True
+        return sock
+
+    def request(self, *args, **kwargs):
+        timer = current_timer()
+        if timer is not None:
+            timer.request_sent_at = perf_counter()
+        return super().request(*args, **kwargs)
+
+    def getresponse(self, *args, **kwargs):
+        response = super().getresponse(*args, **kwargs)
+        timer = current_timer()
+        if timer is not None:
+            timer.headers_received_at = perf_counter()
+        return response
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    def connect(self):
+        start_time = perf_counter()
+        super().connect()
+
+        timer = current_timer()
+        if timer is not None and timer.new_connection:
+            timer.tls_sec = perf_counter() - start_time - timer.dns_sec - timer.connect_sec
+            timer.connected_at = perf_counter()
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+class TimedHTTPAdapter(HTTPAdapter):
+    def __init__(self, rate_limiter=None, **kwargs):
+        self.rate_limiter = rate_limiter
+        super().__init__(**kwargs)
+
+    def send(self, request, *args, **kwargs):
+        # every request of the session waits here, auth and session-manager calls included
+        if self.rate_limiter is not None:
+            wait_time = self.rate_limiter.acquire(urlparse(request.url).netloc)
+            timer = current_timer()
+            if timer is not None:
+                timer.rate_limit_wait_sec += wait_time
+        return super().send(request, *args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool
+        }
@@ -0,0 +1,33 @@
+import json
+import os
+from time import perf_counter
+
+class JsonlResultWriter:
+    def __init__(self, filename, directory="api_results", flush_every=100, flush_interval_sec=5.0):
+        os.makedirs(directory, exist_ok=True)
+
+        self.file_path = os.path.join(directory, filename)
+        self.file = open(self.file_path, "w")
+        self.flush_every = flush_every
+        self.flush_interval_sec = flush_interval_sec
+        self.records_written = 0
+        self.pending_records = 0
+        self.last_flush = perf_counter()
+
+    def write(self, record):
+        self.file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.records_written += 1
+        self.pending_records += 1
+
+        if self.pending_records >= self.flush_every or perf_counter() - self.last_flush >= self.flush_interval_sec:
+            self.flush()
+
+    def flush(self):
+        self.file.flush()
+        self.pending_records = 0
+        self.last_flush = perf_counter()
+
+    def close(self, summary=None):
+        if summary is not None:
+            self.write({"type": "summary", **summary})
+        self.file.close()
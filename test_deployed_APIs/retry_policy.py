@@ -0,0 +1,96 @@
+import random
+from dataclasses import dataclass, fields, replace
+from email.utils import parsedate_to_datetime
+from time import time
+import requests
+
+NUMBER_FIELDS = ("connect_timeout_sec", "read_timeout_sec", "backoff_base_sec", "backoff_max_sec")
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    connect_timeout_sec: float = 10.0
+    read_timeout_sec: float = 60.0
+    max_attempts: int = 1
+    retry_statuses: tuple = (502, 503, 504)
+    retry_exceptions: tuple = ("ConnectionError", "Timeout")
+    backoff_base_sec: float = 0.5
+    backoff_max_sec: float = 30.0
+    respect_retry_after: bool = True
+
+    @property
+    def timeout(self):
+        return (self.connect_timeout_sec, self.read_timeout_sec)
+
+    def override(self, overrides):
+        if not overrides:
+            return self
+
+        if not isinstance(overrides, dict):
+            raise ValueError(f"Invalid retry policy {overrides!r}: use an object of fields to override")
+
+        allowed = {field.name for field in fields(self)}
+        unknown = set(overrides) - allowed
+        if unknown:
+            raise ValueError(f"Unknown retry policy fields: {', '.join(sorted(unknown))}")
+
+        return replace(self, **{key: _validate_field(key, value) for key, value in overrides.items()})
+
+    def should_retry_status(self, status_code):
+        return status_code in self.retry_statuses
+
+    def should_retry_exception(self, exception):
+        return any(isinstance(exception, getattr(requests.exceptions, name)) for name in self.retry_exceptions)
+
+    def backoff(self, attempt, retry_after=None):
+        if self.respect_retry_after and retry_after:
+            retry_after_sec = parse_retry_after(retry_after)
+            if retry_after_sec is not None:
+                return min(retry_after_sec, self.backoff_max_sec)
+
+        # exponential backoff with full jitter
+        return random.uniform(0, min(self.backoff_max_sec, self.backoff_base_sec * 2 ** (attempt - 1)))
+
+def _validate_field(key, value):
+    # a wrong value fails when the suite is loaded instead of in the middle of the run
+    if key in NUMBER_FIELDS:
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+            raise ValueError(f"Invalid retry policy {key} {value!r}: use a number >= 0")
+        return value
+
+    if key == "max_attempts":
+        if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+            raise ValueError(f"Invalid retry policy max_attempts {value!r}: use an integer >= 1")
+        return value
+
+    if key == "respect_retry_after":
+        if not isinstance(value, bool):
+            raise ValueError(f"Invalid retry policy respect_retry_after {value!r}: use true or false")
+        return value
+
+    if not isinstance(value, (list, tuple)):
+        raise ValueError(f"Invalid retry policy {key} {value!r}: use a list")
+
+    if key == "retry_statuses" and not all(isinstance(status, int) and not isinstance(status, bool) for status in value):
+        raise ValueError(f"Invalid retry policy retry_statuses {value!r}: use a list of status codes")
+
+    if key == "retry_exceptions":
+        unknown = [name for name in value if not _is_requests_exception(name)]
+        if unknown:
+            raise ValueError(f"Invalid retry policy retry_exceptions {', '.join(map(str, unknown))}: use names of requests.exceptions, e.g. ConnectionError, Timeout")
+
+    return tuple(value)
+
+def _is_requests_exception(name):
+    exception = getattr(requests.exceptions, name, None) if isinstance(name, str) else None
+    return isinstance(exception, type) and issubclass(exception, BaseException)
+
+def parse_retry_after(retry_after):
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,183 @@
+import math
+import os
+import sqlite3
+import threading
+from time import time
+
+DEFAULT_HISTORY_FILE = os.path.join("api_results", "run_history.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    microservice TEXT NOT NULL,
+    env TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    wall_time_sec REAL,
+    calls INTEGER,
+    errors INTEGER
+);
+CREATE TABLE IF NOT EXISTS routes (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    microservice TEXT NOT NULL,
+    env TEXT NOT NULL,
+    route TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    count INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    p50_sec REAL,
+    p90_sec REAL,
+    p95_sec REAL,
+    p99_sec REAL,
+    max_sec REAL
+);
+CREATE TABLE IF NOT EXISTS calls (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    microservice TEXT NOT NULL,
+    env TEXT NOT NULL,
+    route TEXT NOT NULL,
+    method TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    status_code INTEGER,
+    response_time_sec REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_microservice_env_started_at ON runs (microservice, env, started_at);
+CREATE INDEX IF NOT EXISTS idx_routes_microservice_env_route_timestamp ON routes (microservice, env, route, timestamp);
+CREATE INDEX IF NOT EXISTS idx_calls_microservice_env_route_timestamp ON calls (microservice, env, route, timestamp);
+"""
+
+class RunHistory:
+    def __init__(self, db_path=DEFAULT_HISTORY_FILE, batch_size=500):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # one connection shared by the pairs tested in parallel, every access goes through the lock
+        self.connection = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def start_run(self, microservice, env, mode):
+        started_at = time()
+        with self.lock, self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (microservice, env, mode, started_at) VALUES (?, ?, ?, ?)",
+                (microservice, env, mode, started_at)
+            )
+        return RunRecorder(self, cursor.lastrowid, microservice, env, started_at)
+
+    def recent_runs(self, microservice, env, last_runs=30):
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT id, mode, started_at, wall_time_sec, calls, errors FROM runs "
+                "WHERE microservice = ? AND env = ? ORDER BY started_at DESC LIMIT ?",
+                (microservice, env, last_runs)
+            ).fetchall()
+
+        return [dict(zip(("run_id", "mode", "started_at", "wall_time_sec", "calls", "errors"), row)) for row in rows]
+
+    def route_trend(self, microservice, env, route, last_runs=30):
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT run_id, timestamp, count, errors, p50_sec, p90_sec, p95_sec, p99_sec, max_sec FROM routes "
+                "WHERE microservice = ? AND env = ? AND route = ? ORDER BY timestamp DESC LIMIT ?",
+                (microservice, env, route, last_runs)
+            ).fetchall()
+
+        return [dict(zip(("run_id", "timestamp", "count", "errors", "p50_sec", "p90_sec", "p95_sec", "p99_sec", "max_sec"), row)) for row in rows]
+
+    def route_percentile(self, microservice, env, route, percentile, last_runs=30):
+        # exact percentile over every successful call of the route in its last runs, read through the indexes
+        recent_runs = (
+            "SELECT run_id FROM routes WHERE microservice = ? AND env = ? AND route = ? "
+            "ORDER BY timestamp DESC LIMIT ?"
+        )
+        calls_filter = f"microservice = ? AND env = ? AND route = ? AND error IS NULL AND run_id IN ({recent_runs})"
+        params = (microservice, env, route, microservice, env, route, last_runs)
+
+        with self.lock:
+            count = self.connection.execute(f"SELECT COUNT(*) FROM calls WHERE {calls_filter}", params).fetchone()[0]
+            if not count:
+                return None
+
+            rank = max(math.ceil(percentile * count), 1) - 1
+            return self.connection.execute(
+                f"SELECT response_time_sec FROM calls WHERE {calls_filter} ORDER BY response_time_sec LIMIT 1 OFFSET ?",
+                params + (rank,)
+            ).fetchone()[0]
+
+    def _insert_calls(self, rows):
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT INTO calls (run_id, microservice, env, route, method, timestamp, status_code, response_time_sec, error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def _finish_run(self, run_id, wall_time_sec, calls, errors, route_rows):
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT INTO routes (run_id, microservice, env, route, timestamp, count, errors, p50_sec, p90_sec, p95_sec, p99_sec, max_sec) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                route_rows
+            )
+            self.connection.execute(
+                "UPDATE runs SET wall_time_sec = ?, calls = ?, errors = ? WHERE id = ?",
+                (wall_time_sec, calls, errors, run_id)
+            )
+
+class RunRecorder:
+    def __init__(self, history, run_id, microservice, env, started_at):
+        self.history = history
+        self.run_id = run_id
+        self.microservice = microservice
+        self.env = env
+        self.started_at = started_at
+        self.lock = threading.Lock()
+        self.pending = []
+        self.route_counts = {}
+
+    def add_call(self, route, method, status_code=None, response_time_sec=None, error=None):
+        row = (self.run_id, self.microservice, self.env, route, method, time(), status_code, response_time_sec, error)
+
+        with self.lock:
+            self.pending.append(row)
+            counts = self.route_counts.setdefault(route, [0, 0])
+            counts[0] += 1
+            counts[1] += error is not None
+
+            # calls are written in batches, one transaction each, instead of committing every call
+            if len(self.pending) < self.history.batch_size:
+                return
+            rows, self.pending = self.pending, []
+
+        self.history._insert_calls(rows)
+
+    def finish(self, wall_time_sec, latency_histograms):
+        with self.lock:
+            rows, self.pending = self.pending, []
+        if rows:
+            self.history._insert_calls(rows)
+
+        route_rows = []
+        for route, (count, errors) in self.route_counts.items():
+            histogram = latency_histograms.get(route)
+            summary = histogram.summary() if histogram is not None and histogram.total_count else {}
+            route_rows.append((
+                self.run_id, self.microservice, self.env, route, self.started_at, count, errors,
+                summary.get("p50_sec"), summary.get("p90_sec"), summary.get("p95_sec"), summary.get("p99_sec"), summary.get("max_sec")
+            ))
+
+        calls = sum(count for count, _ in self.route_counts.values())
+        errors = sum(errors for _, errors in self.route_counts.values())
+        self.history._finish_run(self.run_id, round(wall_time_sec, 3), calls, errors, route_rows)
@@ -0,0 +1,205 @@
+import json
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from time import perf_counter
+from api_tester import validate_api_policies
+from result_writer import JsonlResultWriter
+from templating import extract_path, find_placeholders, render_template
+
+STEP_REQUEST_KEYS = ("method", "route", "headers", "query_params", "body", "body_policy", "retry_policy")
+
+def load_scenarios(file_path):
+    with open(file_path, "r") as file:
+        scenarios = json.load(file)
+
+    for scenario in scenarios:
+        validate_scenario(scenario)
+
+    return scenarios
+
+def step_dependencies(scenario):
+    producers = {}
+    for step in scenario["steps"]:
+        for variable in step.get("extract", {}):
+            producers[variable] = step["id"]
+
+    dependencies = {}
+    for step in scenario["steps"]:
+        request = {key: step[key] for key in STEP_REQUEST_KEYS if key in step}
+        missing = find_placeholders(request) - producers.keys()
+        if missing:
+            raise ValueError(f"Scenario '{scenario['name']}', step '{step['id']}': no step extracts {', '.join(sorted(missing))}")
+
+        # a step waits for the steps it explicitly depends on and for the ones producing the variables it uses
+        implicit = {producers[variable] for variable in find_placeholders(request)}
+        dependencies[step["id"]] = (set(step.get("depends_on", [])) | implicit) - {step["id"]}
+
+    return dependencies
+
+def validate_scenario(scenario):
+    step_ids = [step["id"] for step in scenario["steps"]]
+    if len(step_ids) != len(set(step_ids)):
+        raise ValueError(f"Scenario '{scenario['name']}': step ids must be unique")
+
+    for step in scenario["steps"]:
+        try:
+            validate_api_policies(step)
+        except ValueError as e:
+            raise ValueError(f"Scenario '{scenario['name']}', step '{step['id']}': {e}") from e
+
+    dependencies = step_dependencies(scenario)
+    for step_id, depends_on in dependencies.items():
+        unknown = depends_on - set(step_ids)
+        if unknown:
+            raise ValueError(f"Scenario '{scenario['name']}', step '{step_id}': unknown dependencies {', '.join(sorted(unknown))}")
+
+    # Kahn's algorithm: every step must be reachable without cycles
+    remaining = {step_id: set(depends_on) for step_id, depends_on in dependencies.items()}
+    while remaining:
+        ready = [step_id for step_id, depends_on in remaining.items() if not depends_on]
+        if not ready:
+            raise ValueError(f"Scenario '{scenario['name']}': dependency cycle between steps {', '.join(sorted(remaining))}")
+        for step_id in ready:
+            del remaining[step_id]
+        for depends_on in remaining.values():
+            depends_on.difference_update(ready)
+
+class ScenarioRunner:
+    def __init__(self, api_tester, max_workers=8):
+        self.api_tester = api_tester
+        self.max_workers = max_workers
+        self.report = {}
+
+    def run_and_save_results(self, scenarios):
+        microservice = self.api_tester.microservice
+        env = self.api_tester.env
+
+        logging.info(f"--------------------------------------------begin scenarios run ----------------------------------------------")
+        logging.info(f"microservice: {microservice}, env: {env}, scenarios: {len(scenarios)}")
+
+        run_summary = None
+        if self.api_tester.stream_results:
+            self.api_tester.result_writer = JsonlResultWriter(self.api_tester._results_filename("api_responses", "jsonl"))
+
+        try:
+            history = self.api_tester.history
+            self.api_tester.history_recorder = history.start_run(microservice, env, "scenarios") if history is not None else None
+            start_time = perf_counter()
+            total_response_time = self.run(scenarios)
+            wall_time = self.api_tester.wall_time = perf_counter() - start_time
+
+            if self.api_tester.history_recorder is not None:
+                self.api_tester.history_recorder.finish(wall_time, self.api_tester.latency_histograms)
+
+            if self.api_tester.result_writer is None:
+                self.api_tester._save_results_into_file(self.api_tester._results_filename("api_responses"), self.api_tester.results)
+            else:
+                run_summary = self.api_tester._run_summary(total_response_time)
+
+            self.api_tester._save_results_into_file(self.api_tester._results_filename("api_status"), self.api_tester.status_log)
+            self.api_tester._save_results_into_file(self.api_tester._results_filename("api_scenarios"), self.report)
+
+            if self.api_tester.baseline is not None:
+                self.api_tester.baseline.compare_latency(self.api_tester.latency_histograms)
+                self.api_tester._save_results_into_file(self.api_tester._results_filename("api_baseline"), self.api_tester.baseline.report())
+
+        finally:
+            if self.api_tester.result_writer is not None:
+                self.api_tester.result_writer.close(run_summary)
+                self.api_tester.result_writer = None
+
+            logging.info(f"--------------------------------------------end scenarios run ------------------------------------------------")
+
+        if self.api_tester.baseline is not None:
+            self.api_tester._print_baseline_summary()
+        step_states = [step["state"] for steps in self.report.values() for step in steps.values()]
+        print(f"<{microservice}> <{env}> Scenarios completed: {step_states.count('passed')} steps passed, {step_states.count('failed')} failed, {step_states.count('skipped')} skipped. Wall-clock time: {round(wall_time, 2)}s, summed response time: {round(total_response_time, 2)}s.")
+        return self.report
+
+    def run(self, scenarios):
+        dependencies = {}
+        dependents = {}
+        steps = {}
+        variables = {}
+
+        for scenario in scenarios:
+            name = scenario["name"]
+            variables[name] = {}
+            self.report[name] = {}
+            for step_id, depends_on in step_dependencies(scenario).items():
+                dependencies[(name, step_id)] = {(name, dependency) for dependency in depends_on}
+                for dependency in depends_on:
+                    dependents.setdefault((name, dependency), []).append((name, step_id))
+            for step in scenario["steps"]:
+                steps[(name, step["id"])] = step
+
+        total_response_time = 0.0
+        ready = [step_key for step_key, depends_on in dependencies.items() if not depends_on]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = {}
+
+            while ready or running:
+                for step_key in ready:
+                    api_info = self._render_step(steps[step_key], variables[step_key[0]])
+                    running[executor.submit(self.api_tester._call_single_api, api_info)] = (step_key, api_info)
+                ready = []
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step_key, api_info = running.pop(future)
+                    outcome = future.result()
+
+                    # results are stored from this thread only, like in the concurrent suite run
+                    total_response_time += self.api_tester._store_response(api_info, outcome) or 0.0
+
+                    if self._complete_step(step_key, steps[step_key], api_info, outcome, variables[step_key[0]]):
+                        for dependent in dependents.get(step_key, []):
+                            dependencies[dependent].discard(step_key)
+                            if not dependencies[dependent]:
+                                ready.append(dependent)
+                    else:
+                        self._skip_dependents(step_key, dependents)
+
+        return total_response_time
+
+    def _render_step(self, step, variables):
+        api_info = render_template({key: step[key] for key in STEP_REQUEST_KEYS if key in step}, variables)
+
+        # values can only be extracted from parsed bodies
+        if step.get("extract"):
+            api_info["body_policy"] = "full"
+
+        return api_info
+
+    def _complete_step(self, step_key, step, api_info, outcome, variables):
+        name, step_id = step_key
+        report = {"route": api_info["route"]}
+        self.report[name][step_id] = report
+
+        if "error" in outcome:
+            report.update({"state": "failed", "error": outcome["error"]})
+            return False
+
+        report.update({"status_code": outcome["status_code"], "response_time_sec": round(outcome["response_time"], 3)})
+
+        if not 200 <= outcome["status_code"] < 400:
+            report["state"] = "failed"
+            return False
+
+        for variable, path in step.get("extract", {}).items():
+            try:
+                variables[variable] = extract_path(outcome["body"]["response"], path)
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                report.update({"state": "failed", "error": f"Cannot extract '{variable}' from {path}: {e!r}"})
+                return False
+
+        report["state"] = "passed"
+        return True
+
+    def _skip_dependents(self, step_key, dependents):
+        for dependent in dependents.get(step_key, []):
+            name, step_id = dependent
+            if step_id not in self.report[name]:
+                self.report[name][step_id] = {"state": "skipped", "reason": f"dependency '{step_key[1]}' failed"}
+                self._skip_dependents(dependent, dependents)
@@ -0,0 +1,155 @@
+import glob
+import json
+import os
+import zlib
+from body_policy import add_transfer, summarize_transfer
+from case_expansion import route_template
+from latency_histogram import LatencyHistogram
+
+def parse_shard(shard):
+    try:
+        index, count = (int(part) for part in shard.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{shard}': expected i/N, e.g. 1/4")
+
+    if not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{shard}': i must be between 1 and N")
+
+    return index, count
+
+def shard_suffix(shard):
+    return f"_shard{shard[0]}of{shard[1]}" if shard else ""
+
+def shard_of(api_info, count):
+    # crc32 of the route is stable across processes and machines, unlike hash(); the cases of a template
+    # share its shard, so the per-template stats of a shard cover every call of the template
+    return zlib.crc32(route_template(api_info).encode()) % count + 1
+
+def filter_shard(apis_to_test, shard):
+    index, count = shard
+    return (api_info for api_info in apis_to_test if shard_of(api_info, count) == index)
+
+def merge_shard_results(microservice, env, directory="api_results"):
+    shard_files = sorted(glob.glob(os.path.join(directory, f"api_status_{microservice}_{env}_shard*of*.json")))
+    if not shard_files:
+        raise FileNotFoundError(f"No shard results found for {microservice} {env} in {directory}")
+
+    suffixes = [os.path.basename(file_path)[len(f"api_status_{microservice}_{env}"):-len(".json")] for file_path in shard_files]
+    counts = sorted({int(suffix.split("of")[1]) for suffix in suffixes})
+    # leftovers of a run with another number of shards cannot be told apart from the current ones
+    if len(counts) > 1:
+        raise ValueError(f"Shard results of {microservice} {env} come from runs with different numbers of shards ({', '.join(map(str, counts))}), remove the stale ones")
+    count = counts[0]
+    expected = [shard_suffix((index, count)) for index in range(1, count + 1)]
+    missing = sorted(set(expected) - set(suffixes))
+    if missing:
+        raise FileNotFoundError(f"Missing shard results for {microservice} {env}: {', '.join(missing)}")
+
+    results = {"microservice": microservice, "env": env}
+    status_log = {"200": [], "500": [], "Other": {}, "microservice": microservice, "env": env}
+    latency_histograms = {}
+    transfer_stats = {}
+    accept_encodings = []
+    stream_results = _streamed_shards(directory, microservice, env, expected)
+    shard_summaries = []
+
+    for suffix in expected:
+        if not stream_results:
+            results.update(_read_json(directory, f"api_responses_{microservice}_{env}{suffix}.json"))
+
+        shard_status = _read_json(directory, f"api_status_{microservice}_{env}{suffix}.json")
+        status_log["200"] += shard_status.get("200", [])
+        status_log["500"] += shard_status.get("500", [])
+        status_log["Other"].update(shard_status.get("Other", {}))
+
+        shard_latency = _read_json(directory, f"api_latency_{microservice}_{env}{suffix}.json")
+        for route, histogram_data in shard_latency["routes"].items():
+            histogram = LatencyHistogram.from_dict(histogram_data)
+            if route in latency_histograms:
+                latency_histograms[route].merge(histogram)
+            else:
+                latency_histograms[route] = histogram
+
+        shard_transfer = _read_json(directory, f"api_transfer_{microservice}_{env}{suffix}.json")
+        if shard_transfer["accept_encoding"] not in accept_encodings:
+            accept_encodings.append(shard_transfer["accept_encoding"])
+        for route, stats in shard_transfer["routes"].items():
+            add_transfer(transfer_stats, route, stats["calls"], stats["wire_bytes"], stats["decoded_bytes"], stats["content_encodings"])
+
+    if stream_results:
+        # call lines are copied one shard at a time, the merged file never sits in memory
+        with open(os.path.join(directory, f"api_responses_{microservice}_{env}.jsonl"), "w") as merged_file:
+            for suffix in expected:
+                with open(os.path.join(directory, f"api_responses_{microservice}_{env}{suffix}.jsonl"), "r") as shard_file:
+                    for line in shard_file:
+                        record = json.loads(line)
+                        if record.get("type") == "summary":
+                            shard_summaries.append(record)
+                        else:
+                            merged_file.write(line)
+
+            merged_file.write(json.dumps({"type": "summary", **_merge_summaries(microservice, env, shard_summaries, status_log, latency_histograms)}, separators=(",", ":")) + "\n")
+
+    latency = {
+        "microservice": microservice,
+        "env": env,
+        "summary": {route: histogram.summary() for route, histogram in latency_histograms.items()},
+        "routes": {route: histogram.to_dict() for route, histogram in latency_histograms.items()}
+    }
+
+    if not stream_results:
+        _write_json(directory, f"api_responses_{microservice}_{env}.json", results)
+    _write_json(directory, f"api_status_{microservice}_{env}.json", status_log)
+    _write_json(directory, f"api_latency_{microservice}_{env}.json", latency)
+    _write_json(directory, f"api_transfer_{microservice}_{env}.json", {
+        "microservice": microservice,
+        "env": env,
+        "accept_encoding": ", ".join(accept_encodings),
+        **summarize_transfer(transfer_stats)
+    })
+
+    return count
+
+def _streamed_shards(directory, microservice, env, suffixes):
+    formats = set()
+    for suffix in suffixes:
+        prefix = os.path.join(directory, f"api_responses_{microservice}_{env}{suffix}")
+        shard_formats = [extension for extension in ("json", "jsonl") if os.path.exists(f"{prefix}.{extension}")]
+        if not shard_formats:
+            raise FileNotFoundError(f"Missing responses of shard {suffix} for {microservice} {env}: {prefix}.json or {prefix}.jsonl")
+        formats.update(shard_formats)
+
+    # a leftover file of an earlier run in the other format cannot tell which one is current
+    if len(formats) > 1:
+        raise ValueError(f"Shard results of {microservice} {env} mix .json and .jsonl responses, remove the stale ones or run every shard with the same --jsonl setting")
+    return formats == {"jsonl"}
+
+def _merge_summaries(microservice, env, shard_summaries, status_log, latency_histograms):
+    overall = LatencyHistogram()
+    for histogram in latency_histograms.values():
+        overall.merge(histogram)
+
+    # shards run side by side: the wall-clock time of the merged run is the one of the slowest shard
+    return {
+        "microservice": microservice,
+        "env": env,
+        "calls": sum(summary.get("calls", 0) for summary in shard_summaries),
+        "status": {"200": len(status_log["200"]), "500": len(status_log["500"]), "Other": len(status_log["Other"])},
+        "wall_time_sec": max((summary.get("wall_time_sec", 0.0) for summary in shard_summaries), default=0.0),
+        "summed_response_time_sec": round(sum(summary.get("summed_response_time_sec", 0.0) for summary in shard_summaries), 3),
+        "latency": overall.summary(),
+        "shards": len(shard_summaries)
+    }
+
+def _read_json(directory, filename):
+    # every shard writes the same files, a missing one means an incomplete shard and not an empty one
+    file_path = os.path.join(directory, filename)
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Missing shard result file {file_path}")
+
+    with open(file_path, "r") as file:
+        return json.load(file)
+
+def _write_json(directory, filename, data):
+    with open(os.path.join(directory, filename), "w") as file:
+        json.dump(data, file, indent=4)
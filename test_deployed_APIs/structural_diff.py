@@ -0,0 +1,87 @@
+import hashlib
+import json
+import re
+
+class _HashedNode:
+    __slots__ = ("digest", "value", "children")
+
+    def __init__(self, digest, value, children=None):
+        self.digest = digest
+        self.value = value
+        self.children = children
+
+def hash_tree(value):
+    if isinstance(value, dict):
+        children = {key: hash_tree(child) for key, child in value.items()}
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(b"{")
+        # key order does not matter for JSON objects
+        for key in sorted(children):
+            digest.update(key.encode())
+            digest.update(children[key].digest)
+        return _HashedNode(digest.digest(), value, children)
+
+    if isinstance(value, list):
+        children = [hash_tree(child) for child in value]
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(b"[")
+        for child in children:
+            digest.update(child.digest)
+        return _HashedNode(digest.digest(), value, children)
+
+    return _HashedNode(hashlib.blake2b(json.dumps(value).encode(), digest_size=16).digest(), value)
+
+def compile_ignored_paths(patterns):
+    if not patterns:
+        return None
+
+    # '*' matches one key or index, e.g. $.items[*].updated_at; an ignored path hides its whole subtree
+    alternatives = (re.escape(pattern).replace(r"\*", r"[^.\[\]]*") for pattern in patterns)
+    return re.compile(rf"(?:{'|'.join(alternatives)})(?=$|[.\[])")
+
+def diff_structures(baseline, current, max_differences=100, ignored_paths=None):
+    differences = []
+    ignored = compile_ignored_paths(ignored_paths)
+    _diff(hash_tree(baseline), hash_tree(current), "$", differences, max_differences, ignored)
+    return differences
+
+def _diff(baseline, current, path, differences, max_differences, ignored=None):
+    # equal subtrees are skipped without being walked
+    if baseline.digest == current.digest or len(differences) >= max_differences:
+        return
+
+    if ignored is not None and ignored.match(path):
+        return
+
+    if isinstance(baseline.children, dict) and isinstance(current.children, dict):
+        keys = list(baseline.children) + [key for key in current.children if key not in baseline.children]
+        for key in keys:
+            child_path = f"{path}.{key}"
+            if ignored is not None and ignored.match(child_path):
+                continue
+            if key not in current.children:
+                _add_difference(differences, child_path, "removed", baseline.children[key].value, None, max_differences)
+            elif key not in baseline.children:
+                _add_difference(differences, child_path, "added", None, current.children[key].value, max_differences)
+            else:
+                _diff(baseline.children[key], current.children[key], child_path, differences, max_differences, ignored)
+        return
+
+    if isinstance(baseline.children, list) and isinstance(current.children, list):
+        for index in range(max(len(baseline.children), len(current.children))):
+            child_path = f"{path}[{index}]"
+            if ignored is not None and ignored.match(child_path):
+                continue
+            if index >= len(current.children):
+                _add_difference(differences, child_path, "removed", baseline.children[index].value, None, max_differences)
+            elif index >= len(baseline.children):
+                _add_difference(differences, child_path, "added", None, current.children[index].value, max_differences)
+            else:
+                _diff(baseline.children[index], current.children[index], child_path, differences, max_differences, ignored)
+        return
+
+    _add_difference(differences, path, "changed", baseline.value, current.value, max_differences)
+
+def _add_difference(differences, path, change, baseline_value, current_value, max_differences):
+    if len(differences) < max_differences:
+        differences.append({"path": path, "change": change, "baseline": baseline_value, "current": current_value})
@@ -0,0 +1,83 @@
+import gzip
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import sleep
+
+STATUS_ROUTE = re.compile(r"/status/(\d{3})")
+
+class StubServer:
+    def __init__(self, latency_sec=0.0, payload_size=64, host="127.0.0.1", port=0, compress=False):
+        self.latency_sec = latency_sec
+        self.payload_size = payload_size
+        self.compress = compress
+        self.requests_count = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _handler_class(self):
+        stub = self
+
+        class StubHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # headers and body are written separately, Nagle plus delayed ACKs would add ~40ms to every keep-alive response
+            disable_nagle_algorithm = True
+
+            def _respond(self):
+                content_length = int(self.headers.get("Content-Length") or 0)
+                if content_length:
+                    self.rfile.read(content_length)
+
+                with stub.lock:
+                    stub.requests_count += 1
+
+                if stub.latency_sec:
+                    sleep(stub.latency_sec)
+
+                # /status/<code> answers with that status code, every other route with 200
+                path = self.path.split("?")[0]
+                status_match = STATUS_ROUTE.fullmatch(path)
+                status_code = int(status_match.group(1)) if status_match else 200
+
+                body = json.dumps({"route": path, "data": "x" * stub.payload_size}).encode()
+                compressed = stub.compress and "gzip" in self.headers.get("Accept-Encoding", "")
+                if compressed:
+                    body = gzip.compress(body)
+
+                self.send_response(status_code)
+                self.send_header("Content-Type", "application/json")
+                if compressed:
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _respond
+
+            def log_message(self, *args):
+                pass
+
+        return StubHandler
@@ -0,0 +1,45 @@
+import re
+
+PLACEHOLDER = re.compile(r"\{(\w+)\}")
+PATH_TOKEN = re.compile(r"\.([^.\[\]]+)|\[(\d+)\]")
+
+def find_placeholders(value):
+    if isinstance(value, str):
+        return set(PLACEHOLDER.findall(value))
+    if isinstance(value, dict):
+        return set().union(*(find_placeholders(child) for child in value.values())) if value else set()
+    if isinstance(value, list):
+        return set().union(*(find_placeholders(child) for child in value)) if value else set()
+    return set()
+
+def render_template(value, variables):
+    if isinstance(value, str):
+        # a value made of a single placeholder keeps the type of the variable (e.g. numeric ids in bodies)
+        whole_match = PLACEHOLDER.fullmatch(value)
+        if whole_match and whole_match.group(1) in variables:
+            return variables[whole_match.group(1)]
+        return PLACEHOLDER.sub(lambda match: str(variables[match.group(1)]) if match.group(1) in variables else match.group(0), value)
+    if isinstance(value, dict):
+        return {key: render_template(child, variables) for key, child in value.items()}
+    if isinstance(value, list):
+        return [render_template(child, variables) for child in value]
+    return value
+
+def extract_path(data, path):
+    if not path.startswith("$"):
+        raise ValueError(f"Invalid path '{path}': paths must start with '$'")
+
+    remaining = path[1:]
+    value = data
+    position = 0
+
+    while position < len(remaining):
+        match = PATH_TOKEN.match(remaining, position)
+        if not match:
+            raise ValueError(f"Invalid path '{path}'")
+
+        key, index = match.groups()
+        value = value[int(index)] if index is not None else value[key]
+        position = match.end()
+
+    return value
@@ -1,52 +1,58 @@
-import logging
 import urllib3
 import os
 import json
 import argparse
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from api_tester import APITester
+from load_tester import LoadTester, parse_duration
 from api_tester_config import APITesterConfig
-from dotenv import load_dotenv, dotenv_values
+from auth_cache import AuthCache, DEFAULT_AUTH_CACHE_FILE
+from baseline import BaselineComparator, resolve_baseline_path
+from body_policy import ACCEPT_ENCODING, parse_body_policy
+from capacity_finder import CapacityFinder
+from cassette import Cassette
+from log_pipeline import DEFAULT_LOG_FILE, LogPipeline
+from env_comparison import EnvComparison
+from metrics_server import MetricsServer, RunMetrics
+from monitor import Monitor
+from rate_limiter import HostRateLimiter
+from retry_policy import RetryPolicy
+from run_history import DEFAULT_HISTORY_FILE, RunHistory
+from scenario_runner import ScenarioRunner, load_scenarios
+from shard import merge_shard_results, parse_shard
+from dotenv import dotenv_values
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler("api_test.log")
-    ]
-)
-
 def get_dot_env_file_name(microservice, env_name):
     return f".env.{microservice}.{env_name}"
 
-def clear_env(microservice, env_name, script_dir):
-    dot_env_file_name = get_dot_env_file_name(microservice, env_name)
-    dot_env_file_path = os.path.join(script_dir, "api_configs", dot_env_file_name)
-
-    env_vars = dotenv_values(dot_env_file_path)
-    for key in env_vars.keys():
-        os.environ.pop(key, None)
-
 def load_configurations(microservice, env_name, script_dir):
     dot_env_file_name = get_dot_env_file_name(microservice, env_name)
     dot_env_file_path = os.path.join(script_dir, "api_configs", dot_env_file_name)
-    
+
     if not os.path.exists(dot_env_file_path):
         print(f"Error: Environment file '{dot_env_file_name}' not found!")
-        return False
-    
-    load_dotenv(dot_env_file_path, override=True)
+        return None
 
-    return True
+    # values are read into a dict so that several microservice/env pairs can be loaded at the same time
+    env_vars = dotenv_values(dot_env_file_path)
 
-def check_config_variables(microservice, env_name):
+    if not check_config_variables(microservice, env_name, env_vars):
+        return None
+
+    return retrieve_configs_from_env_file(env_vars)
+
+def check_config_variables(microservice, env_name, env_vars):
     required_env_vars = ["BASE_URL", "AUTH_URL", "SESSION_MANAGER_URL", "AUTH_PAYLOAD", "AUTH_BASIC_AUTH_HEADER"]
 
     # two different env vars are valued if microservice is golia or the other ones
     required_env_vars += ["GOLIA_SESSION_MANAGER_CREATE_PAYLOAD", "GOLIA_SESSION_MANAGER_UPDATE_PAYLOAD"] if microservice == "golia" else ["SESSION_MANAGER_PAYLOAD"]
 
-    missing_vars = [var for var in required_env_vars if not os.getenv(var)]
+    missing_vars = [var for var in required_env_vars if not env_vars.get(var)]
 
     if missing_vars:
         print(f"Error .env.{microservice}.{env_name} file: Missing required environment variables: {', '.join(missing_vars)}")
@@ -54,55 +60,298 @@ def check_config_variables(microservice, env_name):
 
     return True
 
-def retrieve_configs_from_env_file():
-    auth_payload_str = os.getenv("AUTH_PAYLOAD")
-    session_manager_payload_str = os.getenv("SESSION_MANAGER_PAYLOAD")
-    golia_session_manager_create_payload_str = os.getenv("GOLIA_SESSION_MANAGER_CREATE_PAYLOAD")
-    golia_session_manager_update_payload_str = os.getenv("GOLIA_SESSION_MANAGER_UPDATE_PAYLOAD")
+def retrieve_configs_from_env_file(env_vars):
+    auth_payload_str = env_vars.get("AUTH_PAYLOAD")
+    session_manager_payload_str = env_vars.get("SESSION_MANAGER_PAYLOAD")
+    golia_session_manager_create_payload_str = env_vars.get("GOLIA_SESSION_MANAGER_CREATE_PAYLOAD")
+    golia_session_manager_update_payload_str = env_vars.get("GOLIA_SESSION_MANAGER_UPDATE_PAYLOAD")
     auth_payload =  json.loads(auth_payload_str) if auth_payload_str else {}
     session_manager_payload =  json.loads(session_manager_payload_str) if session_manager_payload_str else {}
     golia_session_manager_create_payload =  json.loads(golia_session_manager_create_payload_str) if golia_session_manager_create_payload_str else {}
     golia_session_manager_update_payload =  json.loads(golia_session_manager_update_payload_str) if golia_session_manager_update_payload_str else {}
     return APITesterConfig(
-        os.getenv("BASE_URL"),
-        os.getenv("AUTH_URL"),
-        os.getenv("SESSION_MANAGER_URL"),
+        env_vars.get("BASE_URL"),
+        env_vars.get("AUTH_URL"),
+        env_vars.get("SESSION_MANAGER_URL"),
         auth_payload,
         session_manager_payload,
         golia_session_manager_create_payload,
         golia_session_manager_update_payload,
-        os.getenv("AUTH_BASIC_AUTH_HEADER")
+        env_vars.get("AUTH_BASIC_AUTH_HEADER")
     )
 
+def create_api_tester(configs, microservice, env, script_dir, args, auth_cache=None, retry_policy=None, metrics=None, cassette=None, history=None, rate_limiter=None):
+    # a load test or a capacity search keeps up to --max-in-flight calls open at the same time
+    pool_size = args.pool_size or (max(10, args.max_in_flight) if args.rps or args.find_capacity else None)
+    return APITester(configs, script_dir, microservice, env, concurrency=args.concurrency or 1, slow_request_threshold=args.slow_threshold, stream_results=args.jsonl, body_policy=args.body_policy, auth_cache=auth_cache, retry_policy=retry_policy, shard=args.shard, metrics=metrics, cassette=cassette, history=history, pool_size=pool_size, pool_block=args.pool_block, verify_tls=not args.no_verify_tls, accept_encoding=args.accept_encoding, rate_limiter=rate_limiter)
+
+def run_api_tests(microservice, env, script_dir, args, auth_cache=None, retry_policy=None, metrics=None, cassette=None, history=None, stop_event=None, rate_limiter=None):
+    configs = load_configurations(microservice, env, script_dir)
+    if configs is None:
+        return False
+
+    api_tester = create_api_tester(configs, microservice, env, script_dir, args, auth_cache, retry_policy, metrics, cassette, history, rate_limiter)
+
+    if args.baseline:
+        baseline_path = resolve_baseline_path(args.baseline, microservice, env, args.jsonl)
+        if not os.path.exists(baseline_path):
+            print(f"<{microservice}> <{env}> Error: baseline file '{baseline_path}' not found!")
+            return False
+        api_tester.baseline = BaselineComparator.from_file(baseline_path, args.p95_threshold)
+
+    print(f"<{microservice}> <{env}> started")
+
+    try:
+        # a malformed scenario file fails before any login
+        scenarios = load_scenarios(args.scenarios) if args.scenarios else None
+
+        api_tester.authenticate()
+        api_tester.create_session()
+
+        if args.watch:
+            Monitor(api_tester, parse_duration(args.watch), parse_duration(args.watch_jitter), args.watch_window, args.failure_threshold, stop_event).run()
+        elif args.find_capacity:
+            CapacityFinder(api_tester, args.slo_p99, args.slo_error_rate, parse_duration(args.step_duration), args.max_in_flight, additive_step=args.capacity_step, max_steps=args.capacity_max_steps).run_and_save_results()
+        elif args.rps:
+            LoadTester(api_tester, args.rps, parse_duration(args.duration), args.max_in_flight).run_and_save_results()
+        elif args.scenarios:
+            ScenarioRunner(api_tester, args.concurrency or 8).run_and_save_results(scenarios)
+        else:
+            api_tester.call_apis_and_save_results()
+    except Exception as e:
+        print(f"<{microservice}> <{env}> failed: {e}")
+        return False
+
+    print(f"<{microservice}> <{env}> completed")
+    return api_tester.baseline is None or not api_tester.baseline.has_regressions
+
+def run_comparison(microservice, env_a, env_b, script_dir, args, auth_cache=None, retry_policy=None, metrics=None, cassette=None, rate_limiter=None):
+    # every environment gets its own tester: its own token, session id and pooled connections
+    api_testers = []
+    for env in (env_a, env_b):
+        configs = load_configurations(microservice, env, script_dir)
+        if configs is None:
+            return False
+        api_testers.append(create_api_tester(configs, microservice, env, script_dir, args, auth_cache, retry_policy, metrics, cassette, None, rate_limiter))
+
+    print(f"<{microservice}> <{env_a} vs {env_b}> started")
+
+    try:
+        for api_tester in api_testers:
+            api_tester.authenticate()
+            api_tester.create_session()
+
+        ignored_paths = [path for path in args.ignore_paths.split(",") if path] if args.ignore_paths else []
+        report = EnvComparison(*api_testers, ignored_paths, args.concurrency or 1).run_and_save_results()
+    except Exception as e:
+        print(f"<{microservice}> <{env_a} vs {env_b}> failed: {e}")
+        return False
+
+    print(f"<{microservice}> <{env_a} vs {env_b}> completed")
+    return report["summary"]["status_differences"] == 0
+
+def parse_shard_argument(shard):
+    try:
+        return parse_shard(shard)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def merge_command(argv):
+    parser = argparse.ArgumentParser(prog="test_deployed_APIs.py merge", description="Merge the results of a suite run in shards with --shard i/N.")
+
+    parser.add_argument("--ms", required=True, help="Comma-separated list of microservices")
+    parser.add_argument("--env", required=True, help="Comma-separated list of environments")
+    parser.add_argument("--results-dir", default="api_results", help="Directory containing the shard results (default: api_results)")
+
+    args = parser.parse_args(argv)
+
+    merged = True
+    for microservice in args.ms.split(","):
+        for env in args.env.split(","):
+            try:
+                shards_count = merge_shard_results(microservice, env, args.results_dir)
+                print(f"<{microservice}> <{env}> merged results of {shards_count} shards into {args.results_dir}/")
+            except (FileNotFoundError, ValueError) as e:
+                print(f"<{microservice}> <{env}> Error: {e}")
+                merged = False
+
+    return merged
+
+def history_command(argv):
+    parser = argparse.ArgumentParser(prog="test_deployed_APIs.py history", description="Query the history of the previous runs.")
+
+    parser.add_argument("--ms", required=True, help="Microservice")
+    parser.add_argument("--env", required=True, help="Environment")
+    parser.add_argument("--route", help="Show the latency trend of this route instead of the list of runs")
+    parser.add_argument("--last", type=int, default=30, help="Number of runs to look at (default: 30)")
+    parser.add_argument("--percentile", type=float, default=95, help="Percentile computed over every call of --route in those runs (default: 95)")
+    parser.add_argument("--history-db", default=DEFAULT_HISTORY_FILE, help=f"Run history database (default: {DEFAULT_HISTORY_FILE})")
+
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.history_db):
+        print(f"Error: run history '{args.history_db}' not found!")
+        return False
+
+    history = RunHistory(args.history_db)
+    try:
+        if args.route is None:
+            runs = history.recent_runs(args.ms, args.env, args.last)
+            print(f"<{args.ms}> <{args.env}> last {len(runs)} runs")
+            for run in runs:
+                print(f"    {datetime.fromtimestamp(run['started_at']).isoformat(timespec='seconds')} {run['mode']}: {run['calls']} calls, {run['errors']} errors, wall-clock time {run['wall_time_sec']}s")
+            return True
+
+        trend = history.route_trend(args.ms, args.env, args.route, args.last)
+        value = history.route_percentile(args.ms, args.env, args.route, args.percentile / 100, args.last)
+        print(f"<{args.ms}> <{args.env}> {args.route}: p{args.percentile:g} {value}s over the calls of the last {len(trend)} runs")
+        for run in trend:
+            print(f"    {datetime.fromtimestamp(run['timestamp']).isoformat(timespec='seconds')}: {run['count']} calls, {run['errors']} errors, p50 {run['p50_sec']}s, p95 {run['p95_sec']}s, p99 {run['p99_sec']}s")
+        return True
+    finally:
+        history.close()
+
 if __name__ == "__main__":
     
     script_dir = os.path.dirname(os.path.abspath(__file__)) 
 
+    if sys.argv[1:2] == ["history"]:
+        sys.exit(0 if history_command(sys.argv[2:]) else 1)
+
+    if sys.argv[1:2] == ["merge"]:
+        sys.exit(0 if merge_command(sys.argv[2:]) else 1)
+
     parser = argparse.ArgumentParser(description="API Tester for different microservices and environments.")
     
     parser.add_argument("--ms", required=True, help="Comma-separated list of microservices")
-    parser.add_argument("--env", required=True, help="Comma-separated list of environments")
+    parser.add_argument("--env", help="Comma-separated list of environments")
+    parser.add_argument("--compare", metavar="ENV_A,ENV_B", help="Send every route to both environments at the same moment and report status, body and latency differences instead of running the suite. Exits non-zero on status differences")
+    parser.add_argument("--ignore-paths", help="Comma-separated body paths left out of the --compare body diff, '*' matching one key or index, e.g. $.timestamp,$.items[*].id")
+    parser.add_argument("--jobs", type=int, default=0, help="Number of microservice/env pairs tested in parallel (default: all of them)")
+    parser.add_argument("--concurrency", type=int, help="Number of API calls executed in parallel for each microservice/env (default: 1, 8 with --scenarios)")
+    parser.add_argument("--slow-threshold", type=float, help="Log requests slower than this many seconds, with their phase timings, into api_slow_requests_<ms>_<env>.json")
+    parser.add_argument("--jsonl", action="store_true", help="Stream one JSON line per call into api_responses_<ms>_<env>.jsonl instead of keeping every response in memory")
+    parser.add_argument("--body-policy", default="full", help="How response bodies are handled: full, hash, truncate:<bytes> or none (default: full). Can be overridden per route with 'body_policy' in apis_to_test.json")
+    parser.add_argument("--baseline", help="Compare the run with a previous one: 'last' (the results currently in api_results/), a results directory or a responses file. Exits non-zero on regressions")
+    parser.add_argument("--p95-threshold", type=float, default=0.2, help="Relative p95 latency increase flagged as a regression by --baseline (default: 0.2)")
+    parser.add_argument("--auth-cache", action="store_true", help="Reuse JWT tokens and session ids cached on disk until they expire")
+    parser.add_argument("--auth-cache-file", default=DEFAULT_AUTH_CACHE_FILE, help=f"Auth cache location (default: {DEFAULT_AUTH_CACHE_FILE})")
+    parser.add_argument("--connect-timeout", type=float, default=10.0, help="Connect timeout in seconds for every request (default: 10)")
+    parser.add_argument("--read-timeout", type=float, default=60.0, help="Read timeout in seconds for every request (default: 60)")
+    parser.add_argument("--max-attempts", type=int, default=1, help="Maximum attempts per API call, retries included (default: 1, no retries)")
+    parser.add_argument("--retry-statuses", default="502,503,504", help="Comma-separated status codes that are retried (default: 502,503,504)")
+    parser.add_argument("--backoff-base", type=float, default=0.5, help="Base of the exponential backoff between retries, in seconds (default: 0.5)")
+    parser.add_argument("--backoff-max", type=float, default=30.0, help="Maximum wait between retries, also caps Retry-After, in seconds (default: 30)")
+    parser.add_argument("--shard", type=parse_shard_argument, help="Only run the routes of shard i out of N (stable by route hash), e.g. 2/4. Combine the shards with the 'merge' subcommand")
+    parser.add_argument("--scenarios", help="Run the dependency-aware scenarios of this file instead of apis_to_test.json")
+    parser.add_argument("--rps", type=float, help="Run a load test replaying apis_to_test.json at this target rate (requests per second)")
+    parser.add_argument("--duration", default="1m", help="Duration of the load test, e.g. 30s, 10m, 1h (default: 1m)")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="Maximum number of concurrent requests during a load test or a capacity search (default: 256)")
+    parser.add_argument("--pool-size", type=int, help="Maximum number of kept-alive connections per host (default: max(10, concurrency), max(10, max-in-flight) with --rps)")
+    parser.add_argument("--pool-block", action="store_true", help="Wait for a free pooled connection instead of opening a throwaway one when the pool is exhausted")
+    parser.add_argument("--no-verify-tls", action="store_true", help="Do not verify TLS certificates, e.g. for environments with self-signed certificates. Applies to every call, auth and session calls included")
+    parser.add_argument("--rate-limit", type=float, help="Maximum requests per second sent to each host, shared by every pair and worker, auth and session calls included")
+    parser.add_argument("--rate-burst", type=int, help="Requests that can be sent at once before --rate-limit applies (default: the rate, at least 1)")
+    parser.add_argument("--accept-encoding", help=f"Accept-Encoding sent with every call, e.g. identity to measure uncompressed sizes (default: {ACCEPT_ENCODING})")
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument("--record", metavar="DIR", help="Record every request/response of the run, auth and session calls included, into a content-addressed store in DIR")
+    cassette_group.add_argument("--replay", metavar="DIR", help="Serve the responses recorded with --record from DIR instead of calling the network")
+    parser.add_argument("--find-capacity", action="store_true", help="Search the highest throughput sustainable within the SLO, raising the concurrency step by step up to --max-in-flight")
+    parser.add_argument("--slo-p99", type=float, default=1.0, help="p99 latency in seconds that --find-capacity must not exceed (default: 1.0)")
+    parser.add_argument("--slo-error-rate", type=float, default=0.01, help="Rate of errors and 5xx responses that --find-capacity must not exceed (default: 0.01)")
+    parser.add_argument("--step-duration", default="10s", help="Duration of every concurrency step of --find-capacity, e.g. 10s, 1m (default: 10s)")
+    parser.add_argument("--capacity-step", type=int, default=2, help="Concurrency added at every step of --find-capacity once the SLO has been breached a first time (default: 2)")
+    parser.add_argument("--capacity-max-steps", type=int, default=50, help="Maximum number of steps of --find-capacity (default: 50)")
+    parser.add_argument("--watch", help="Keep running the suite at this interval, e.g. 30s, 5m, reusing the session and reloading apis_to_test.json when it changes. Only state changes of the routes are reported")
+    parser.add_argument("--watch-jitter", default="0s", help="Random delay added to every --watch interval, e.g. 5s (default: 0s)")
+    parser.add_argument("--watch-window", type=int, default=100, help="Number of recent calls kept per route by --watch for error rate and p95 (default: 100)")
+    parser.add_argument("--failure-threshold", type=int, default=1, help="Consecutive failed calls before --watch reports a route as failing (default: 1)")
+    parser.add_argument("--history-db", default=DEFAULT_HISTORY_FILE, help=f"SQLite database every run is appended to, queried with the 'history' subcommand (default: {DEFAULT_HISTORY_FILE})")
+    parser.add_argument("--no-history", action="store_true", help="Do not append the run to the history database")
+    parser.add_argument("--log-file", default=DEFAULT_LOG_FILE, help=f"File the JSON log lines are written to by a background thread (default: {DEFAULT_LOG_FILE})")
+    parser.add_argument("--log-sample-rate", type=float, default=1.0, help="Fraction of the successful calls written to the log, errors and failed statuses are always written (default: 1.0)")
+    parser.add_argument("--metrics-port", type=int, help="Serve live OpenMetrics of the run on http://127.0.0.1:<port>/metrics while it is in progress")
 
     args = parser.parse_args()
+
+    try:
+        parse_body_policy(args.body_policy)
+    except ValueError as e:
+        parser.error(str(e))
     
+    if args.compare:
+        compared_environments = args.compare.split(",")
+        if len(compared_environments) != 2 or not all(compared_environments):
+            parser.error("--compare takes exactly two environments, e.g. --compare staging,prod")
+        if args.watch or args.find_capacity or args.rps or args.scenarios:
+            parser.error("--compare cannot be combined with --watch, --find-capacity, --rps or --scenarios")
+    elif not args.env:
+        parser.error("the following arguments are required: --env")
+
+    # scenarios chain their steps, they cannot be split by route across shards
+    if args.scenarios and args.shard:
+        parser.error("--shard cannot be combined with --scenarios")
+
     microservices = args.ms.split(",")
-    environments = args.env.split(",")
+    environments = args.env.split(",") if args.env else []
 
-    for microservice in microservices:
-        for env in environments:
-            if not load_configurations(microservice, env, script_dir) or not check_config_variables(microservice, env):
-                continue
+    pairs = [(microservice, env) for microservice in microservices for env in environments]
+    jobs = args.jobs or len(microservices if args.compare else pairs)
+    auth_cache = AuthCache(args.auth_cache_file) if args.auth_cache else None
+    try:
+        retry_policy = RetryPolicy().override({
+            "connect_timeout_sec": args.connect_timeout,
+            "read_timeout_sec": args.read_timeout,
+            "max_attempts": args.max_attempts,
+            "retry_statuses": [int(status) for status in args.retry_statuses.split(",") if status],
+            "backoff_base_sec": args.backoff_base,
+            "backoff_max_sec": args.backoff_max
+        })
+    except ValueError as e:
+        parser.error(str(e))
 
-            configs = retrieve_configs_from_env_file()
+    try:
+        cassette = Cassette(args.record, "record") if args.record else Cassette(args.replay, "replay") if args.replay else None
+    except FileNotFoundError as e:
+        parser.error(str(e))
 
-            api_tester = APITester(configs, script_dir, microservice, env)
+    history = RunHistory(args.history_db) if not args.no_history else None
 
-            print(f"<{microservice}> <{env}>")
+    stop_event = threading.Event()
+    try:
+        rate_limiter = HostRateLimiter(args.rate_limit, args.rate_burst) if args.rate_limit is not None else None
+    except ValueError as e:
+        parser.error(str(e))
 
-            api_tester.authenticate()
-            api_tester.create_session()
-            api_tester.call_apis_and_save_results()
+    try:
+        log_pipeline = LogPipeline(args.log_file, args.log_sample_rate)
+    except ValueError as e:
+        parser.error(str(e))
+    log_pipeline.start()
+
+    metrics = RunMetrics() if args.metrics_port is not None else None
+    metrics_server = MetricsServer(metrics, args.metrics_port).start() if metrics is not None else None
+    if metrics_server is not None:
+        print(f"Serving live metrics on http://127.0.0.1:{metrics_server.port}/metrics")
 
-            print()
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            if args.compare:
+                futures = [executor.submit(run_comparison, microservice, *compared_environments, script_dir, args, auth_cache, retry_policy, metrics, cassette, rate_limiter) for microservice in microservices]
+            else:
+                futures = [executor.submit(run_api_tests, microservice, env, script_dir, args, auth_cache, retry_policy, metrics, cassette, history, stop_event, rate_limiter) for microservice, env in pairs]
+            try:
+                outcomes = [future.result() for future in futures]
+            except KeyboardInterrupt:
+                # watchers finish their current cycle and return
+                stop_event.set()
+                outcomes = [future.result() for future in futures]
+    finally:
+        if metrics_server is not None:
+            metrics_server.stop()
+        if history is not None:
+            history.close()
+        log_pipeline.stop()
 
-            clear_env(microservice, env, script_dir)
+    if not all(outcomes):
+        sys.exit(1)
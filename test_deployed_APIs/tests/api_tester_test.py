@@ -2,10 +2,17 @@ import pytest
 import requests
 import requests_mock
 import os
+import json
+import re
+import threading
 from unittest.mock import patch, call, mock_open
 
 from api_tester import APITester
 from api_tester_config import APITesterConfig
+from auth_cache import AuthCache
+from body_policy import ACCEPT_ENCODING
+from retry_policy import RetryPolicy
+from stub_server import StubServer
 
 
 @pytest.mark.usefixtures("requests_mock")
@@ -167,10 +174,12 @@ class TestAPITester:
 
             assert mock_call_single_api.call_count == len(mock_apis)
 
-            assert mock_save_results.call_count == 2
+            assert mock_save_results.call_count == 4
             expected_calls = [
                 call(f"api_responses_ms_dev.json", self.sut.results),
-                call(f"api_status_ms_dev.json", self.sut.status_log)
+                call(f"api_status_ms_dev.json", self.sut.status_log),
+                call(f"api_latency_ms_dev.json", {"microservice": "ms", "env": "dev", "summary": {}, "routes": {}}),
+                call(f"api_transfer_ms_dev.json", {"microservice": "ms", "env": "dev", "accept_encoding": ACCEPT_ENCODING, "wire_bytes": 0, "decoded_bytes": 0, "heaviest_routes": [], "routes": {}})
             ]
             mock_save_results.assert_has_calls(expected_calls, any_order=False)
             
@@ -187,6 +196,22 @@ class TestAPITester:
             # then
             assert res == [{"endpoint": "/api1", "method": "GET"}, {"endpoint": "/api2", "method": "GET"}]
 
+    @pytest.mark.parametrize("policies, error", [
+        ({"body_policy": "truncate:many"}, "Invalid body policy 'truncate:many'"),
+        ({"retry_policy": {"max_retries": 3}}, "Unknown retry policy fields: max_retries"),
+        ({"retry_policy": {"retry_exceptions": ["Timout"]}}, "Invalid retry policy retry_exceptions Timout"),
+        ({"body_policy": 100}, "Invalid body policy 100")
+    ])
+    def test_load_apis_to_test_invalid_policy(self, policies, error, requests_mock):
+        # given
+        mock_file = json.dumps([{"method": "GET", "route": "/api1"}, {"method": "GET", "route": "/api2", **policies}])
+
+        with patch("builtins.open", mock_open(read_data=mock_file)):
+            # when & then
+            with pytest.raises(ValueError, match=f"API GET /api2: {error}"):
+                self.sut._load_apis_to_test()
+        assert not requests_mock.called
+
     def test_call_single_api_and_store_response_success(self, requests_mock):
         # given
         mock_api_info = {
@@ -215,10 +240,13 @@ class TestAPITester:
                 "request_body": {},
                 "status_code": mock_status_code,
                 "response_time_sec": res,
-                "response": mock_response
+                "response": mock_response,
+                "transfer": {"content_encoding": "identity", "wire_bytes": len(json.dumps(mock_response)), "decoded_bytes": len(json.dumps(mock_response)), "compression_ratio": 1.0}
             }
         }
 
+        assert self.sut.latency_histograms["/api"].total_count == 1
+
         assert self.sut.status_log == {
             "microservice": "ms",
             "env": "dev",
@@ -255,7 +283,8 @@ class TestAPITester:
                 "request_body": mock_api_info["body"],
                 "status_code": mock_status_code,
                 "response_time_sec": res,
-                "response": mock_response
+                "response": mock_response,
+                "transfer": {"content_encoding": "identity", "wire_bytes": len(json.dumps(mock_response)), "decoded_bytes": len(json.dumps(mock_response)), "compression_ratio": 1.0}
             }
         }
 
@@ -295,7 +324,8 @@ class TestAPITester:
                 "request_body": mock_api_info["body"],
                 "status_code": mock_status_code,
                 "response_time_sec": res,
-                "response": mock_response
+                "response": mock_response,
+                "transfer": {"content_encoding": "identity", "wire_bytes": len(json.dumps(mock_response)), "decoded_bytes": len(json.dumps(mock_response)), "compression_ratio": 1.0}
             }
         }
 
@@ -352,3 +382,259 @@ class TestAPITester:
             mock_json_dump.assert_called_once_with(mock_data, mock_file(), indent=4)
 
 
+
+    def test_call_all_apis_concurrently_keeps_order(self, requests_mock):
+        # given
+        self.sut = APITester(self.config, "fake_dir.json", "ms", "dev", concurrency=4)
+        mock_apis = [{"method": "GET", "route": f"/api{i}"} for i in range(10)]
+
+        for api_info in mock_apis:
+            requests_mock.get(
+                f"{self.config.base_url}{api_info['route']}",
+                status_code = 200 if api_info["route"] != "/api3" else 500,
+                json={"route": api_info["route"]}
+            )
+
+        # when
+        res = self.sut._call_all_apis(mock_apis)
+
+        # then
+        assert list(self.sut.results.keys()) == ["microservice", "env"] + [api_info["route"] for api_info in mock_apis]
+        assert self.sut.status_log["200"] == [api_info["route"] for api_info in mock_apis if api_info["route"] != "/api3"]
+        assert self.sut.status_log["500"] == ["/api3"]
+        assert res == sum(self.sut.results[api_info["route"]]["response_time_sec"] for api_info in mock_apis)
+
+    def test_call_apis_concurrently_does_not_wait_for_a_slow_call(self):
+        # given
+        self.sut = APITester(self.config, "fake_dir.json", "ms", "dev", concurrency=2)
+        mock_apis = [{"route": "/slow"}] + [{"route": f"/api{i}"} for i in range(20)]
+        last_fast_call_done = threading.Event()
+
+        def call_single_api(api_info):
+            # the slow call ends only once every fast call behind it has been made
+            if api_info["route"] == "/slow":
+                return {"released": last_fast_call_done.wait(5)}
+            if api_info["route"] == "/api19":
+                last_fast_call_done.set()
+            return {"released": True}
+
+        with patch.object(self.sut, "_call_single_api", side_effect=call_single_api):
+            # when
+            res = list(self.sut._call_apis_concurrently(mock_apis))
+
+        # then
+        assert [api_info["route"] for api_info, _ in res] == [api_info["route"] for api_info in mock_apis]
+        assert all(outcome["released"] for _, outcome in res)
+
+    def test_call_same_route_twice_accumulates_latency(self, requests_mock):
+        # given
+        mock_api_info = {"method": "GET", "route": "/api"}
+        requests_mock.get(f"{self.config.base_url}/api", json={})
+
+        # when
+        self.sut._call_single_api_and_store_response(mock_api_info)
+        self.sut._call_single_api_and_store_response(mock_api_info)
+
+        # then
+        assert self.sut.latency_histograms["/api"].total_count == 2
+        assert "latency" not in self.sut.results["/api"]
+
+    def test_call_all_apis_ignores_failed_calls_in_total(self):
+        # given
+        mock_apis = [{"route": "/api1"}, {"route": "/api2"}]
+
+        with patch.object(self.sut, "_call_single_api_and_store_response", side_effect=[1.5, None]):
+            # when
+            res = self.sut._call_all_apis(mock_apis)
+
+            # then
+            assert res == 1.5
+
+    def test_call_apis_and_save_results_streaming(self, requests_mock, tmp_path, monkeypatch):
+        # given
+        monkeypatch.chdir(tmp_path)
+        self.sut = APITester(self.config, "fake_dir.json", "ms", "dev", stream_results=True)
+        mock_apis = [{"method": "GET", "route": "/api1"}, {"method": "GET", "route": "/api2"}]
+        requests_mock.get(f"{self.config.base_url}/api1", json={"field1": "value1"})
+        requests_mock.get(f"{self.config.base_url}/api2", status_code=500, json={})
+
+        with patch.object(self.sut, "_load_apis_to_test", return_value=mock_apis):
+            # when
+            self.sut.call_apis_and_save_results()
+
+        # then
+        lines = [json.loads(line) for line in (tmp_path / "api_results" / "api_responses_ms_dev.jsonl").read_text().splitlines()]
+        assert [line["type"] for line in lines] == ["call", "call", "summary"]
+        assert lines[0]["route"] == "/api1"
+        assert lines[0]["response"] == {"field1": "value1"}
+        assert lines[2]["calls"] == 2
+        assert lines[2]["status"] == {"200": 1, "500": 1, "Other": 0}
+        assert self.sut.results == {}
+        assert not (tmp_path / "api_results" / "api_responses_ms_dev.json").exists()
+
+    def test_call_single_api_with_route_body_policy(self, requests_mock):
+        # given
+        self.sut = APITester(self.config, "fake_dir.json", "ms", "dev", body_policy="none")
+        requests_mock.get(f"{self.config.base_url}/api1", text="not json")
+        requests_mock.get(f"{self.config.base_url}/api2", text="not json")
+
+        # when
+        self.sut._call_single_api_and_store_response({"route": "/api1"})
+        self.sut._call_single_api_and_store_response({"route": "/api2", "body_policy": "full"})
+
+        # then
+        assert self.sut.results["/api1"]["response_size"] == 8
+        assert "response" not in self.sut.results["/api1"]
+        assert self.sut.results["/api2"]["response"] == "not json"
+
+    def test_authenticate_and_create_session_reuse_cache(self, requests_mock, tmp_path):
+        # given
+        auth_cache = AuthCache(str(tmp_path / "auth_cache.json"))
+        auth_mock = requests_mock.post(self.config.auth_url, json={"access_token": "mocked-token", "expires_in": 300})
+        session_mock = requests_mock.post(self.config.session_manager_url, json={"sessionId": "mocked-sessionId"})
+
+        first_run = APITester(self.config, "fake_dir.json", "ms", "dev", auth_cache=auth_cache)
+        first_run.authenticate()
+        first_run.create_session()
+
+        # when
+        self.sut = APITester(self.config, "fake_dir.json", "ms", "dev", auth_cache=auth_cache)
+        self.sut.authenticate()
+        self.sut.create_session()
+
+        # then
+        assert auth_mock.call_count == 1
+        assert session_mock.call_count == 1
+        assert self.sut.session.headers["Authorization"] == "Bearer mocked-token"
+        assert self.sut.session.headers["X-BEAR-SESSION-TOKEN"] == "mocked-sessionId"
+
+    def test_call_single_api_refreshes_token_on_401(self, requests_mock):
+        # given
+        requests_mock.post(self.config.auth_url, [{"json": {"access_token": "old-token"}}, {"json": {"access_token": "new-token"}}])
+        requests_mock.get(
+            f"{self.config.base_url}/api",
+            [{"status_code": 401, "json": {}}, {"status_code": 200, "json": {"field1": "value1"}}]
+        )
+        self.sut.authenticate()
+
+        # when
+        self.sut._call_single_api_and_store_response({"route": "/api"})
+
+        # then
+        assert self.sut.token == "new-token"
+        assert self.sut.results["/api"]["status_code"] == 200
+        assert requests_mock.request_history[-1].headers["Authorization"] == "Bearer new-token"
+
+    def test_call_single_api_creates_new_session_on_second_401(self, requests_mock):
+        # given
+        requests_mock.post(self.config.auth_url, [{"json": {"access_token": "old-token"}}, {"json": {"access_token": "new-token"}}])
+        session_mock = requests_mock.post(self.config.session_manager_url, [{"json": {"sessionId": "old-session"}}, {"json": {"sessionId": "new-session"}}])
+        api_mock = requests_mock.get(
+            f"{self.config.base_url}/api",
+            [{"status_code": 401, "json": {}}, {"status_code": 401, "json": {}}, {"status_code": 200, "json": {"field1": "value1"}}]
+        )
+        self.sut.authenticate()
+        self.sut.create_session()
+
+        # when
+        self.sut._call_single_api_and_store_response({"route": "/api"})
+
+        # then
+        assert session_mock.call_count == 2
+        assert api_mock.call_count == 3
+        assert self.sut.session_id == "new-session"
+        assert self.sut.results["/api"]["status_code"] == 200
+        assert requests_mock.request_history[-1].headers["X-BEAR-SESSION-TOKEN"] == "new-session"
+
+    def test_call_single_api_does_not_retry_401_without_token(self, requests_mock):
+        # given
+        api_mock = requests_mock.get(f"{self.config.base_url}/api", status_code=401, json={})
+
+        # when
+        self.sut._call_single_api_and_store_response({"route": "/api"})
+
+        # then
+        assert api_mock.call_count == 1
+        assert self.sut.status_log["Other"] == {"/api": "401"}
+
+    def test_call_single_api_retries_with_backoff(self, requests_mock):
+        # given
+        self.sut = APITester(self.config, "fake_dir.json", "ms", "dev", retry_policy=RetryPolicy(max_attempts=3, backoff_base_sec=0))
+        requests_mock.get(
+            f"{self.config.base_url}/api",
+            [
+                {"status_code": 503, "json": {}, "headers": {"Retry-After": "0"}},
+                {"exc": requests.exceptions.ConnectTimeout("timed out")},
+                {"status_code": 200, "json": {"field1": "value1"}}
+            ]
+        )
+
+        # when
+        self.sut._call_single_api_and_store_response({"route": "/api"})
+
+        # then
+        result = self.sut.results["/api"]
+        assert result["status_code"] == 200
+        assert [attempt.get("status_code", attempt.get("error")) for attempt in result["attempts"]] == [503, "timed out", 200]
+        assert result["attempts"][0]["wait_sec"] == 0
+
+    def test_call_single_api_route_retry_policy_gives_up(self, requests_mock):
+        # given
+        api_mock = requests_mock.get(f"{self.config.base_url}/api", status_code=502, json={})
+
+        # when
+        self.sut._call_single_api_and_store_response({"route": "/api", "retry_policy": {"max_attempts": 2, "backoff_base_sec": 0}})
+
+        # then
+        assert api_mock.call_count == 2
+        assert self.sut.status_log["Other"] == {"/api": "502"}
+        assert len(self.sut.results["/api"]["attempts"]) == 2
+
+    def test_call_single_api_passes_timeout(self, requests_mock):
+        # given
+        self.sut = APITester(self.config, "fake_dir.json", "ms", "dev", retry_policy=RetryPolicy(connect_timeout_sec=1, read_timeout_sec=2))
+        requests_mock.get(f"{self.config.base_url}/api", json={})
+
+        # when
+        self.sut._call_single_api_and_store_response({"route": "/api"})
+
+        # then
+        assert requests_mock.request_history[0].timeout == (1, 2)
+
+
+def test_transfer_recorded_per_route(make_tester):
+    # given
+    with StubServer(payload_size=2000, compress=True) as stub:
+        api_tester = make_tester(stub.url)
+
+        # when
+        api_tester._call_all_apis([{"method": "GET", "route": "/big"}, {"method": "GET", "route": "/big"}, {"method": "GET", "route": "/small", "headers": {"Accept-Encoding": "identity"}}])
+
+    # then
+    summary = api_tester._transfer_summary()
+    assert summary["heaviest_routes"] == ["/small", "/big"]
+    assert summary["routes"]["/big"]["calls"] == 2
+    assert summary["routes"]["/big"]["content_encodings"] == ["gzip"]
+    assert summary["routes"]["/big"]["compression_ratio"] > 10
+    assert summary["routes"]["/small"]["content_encodings"] == ["identity"]
+    assert api_tester.results["/big"]["transfer"]["content_encoding"] == "gzip"
+
+def test_stats_kept_per_route_template(requests_mock, make_tester):
+    # given
+    api_tester = make_tester()
+    requests_mock.get(re.compile(r"https://example.com/customers/\d+"), json={})
+    requests_mock.get("https://example.com/customers/3", status_code=404, json={})
+    requests_mock.get("https://example.com/customers/4", status_code=403, json={})
+    apis_to_test = [{"method": "GET", "route": "/customers/{customer_id}", "parameters": {"customer_id": list(range(50))}}]
+
+    # when
+    api_tester._call_all_apis(api_tester._expand_apis_to_test(apis_to_test))
+
+    # then
+    assert list(api_tester.latency_histograms) == ["/customers/{customer_id}"]
+    assert list(api_tester.transfer_stats) == ["/customers/{customer_id}"]
+    assert api_tester.latency_histograms["/customers/{customer_id}"].total_count == 50
+    assert "/customers/49" in api_tester.results
+    assert api_tester.results["/customers/7"]["route_template"] == "/customers/{customer_id}"
+    assert api_tester.status_log["Other"] == {"/customers/3": "404", "/customers/4": "403"}
+    assert len(api_tester.status_log["200"]) == 48 and "/customers/49" in api_tester.status_log["200"]
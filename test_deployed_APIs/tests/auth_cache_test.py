@@ -0,0 +1,96 @@
+import base64
+import json
+import os
+import stat
+import pytest
+from time import time
+
+from api_tester_config import APITesterConfig
+from auth_cache import AuthCache, auth_cache_key, token_expiry
+
+
+def make_jwt(claims):
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).decode().rstrip("=")
+    return f"header.{payload}.signature"
+
+def make_config(auth_payload):
+    return APITesterConfig("https://example.com", "https://example.com/auth", "https://sessionmanager.com", auth_payload, {}, {}, {}, "Basic dXNlcjpwYXNz")
+
+def test_auth_cache_key_depends_on_credentials():
+    # when & then
+    assert auth_cache_key("ms", "dev", make_config({"username": "a"})) == auth_cache_key("ms", "dev", make_config({"username": "a"}))
+    assert auth_cache_key("ms", "dev", make_config({"username": "a"})) != auth_cache_key("ms", "dev", make_config({"username": "b"}))
+    assert auth_cache_key("ms", "dev", make_config({})) != auth_cache_key("ms", "test", make_config({}))
+
+def test_token_expiry_from_expires_in():
+    # when
+    res = token_expiry({"expires_in": 300}, "opaque-token")
+
+    # then
+    assert abs(res - (time() + 300)) < 5
+
+def test_token_expiry_from_jwt_exp_claim():
+    # when
+    res = token_expiry({}, make_jwt({"exp": 2000000000}))
+
+    # then
+    assert res == 2000000000
+
+def test_token_expiry_unknown():
+    # when
+    res = token_expiry({}, "opaque-token")
+
+    # then
+    assert res is None
+
+def test_put_and_get(tmp_path):
+    # given
+    file_path = str(tmp_path / "cache" / "auth_cache.json")
+    sut = AuthCache(file_path, session_ttl_sec=600)
+
+    # when
+    sut.put_token("key", "token", time() + 600)
+    sut.put_session_id("key", "session")
+
+    # then
+    assert sut.get_token("key") == "token"
+    assert sut.get_session_id("key") == "session"
+    assert sut.get_token("other-key") is None
+    assert stat.S_IMODE(os.stat(file_path).st_mode) == 0o600
+
+def test_expired_entries_are_not_returned(tmp_path):
+    # given
+    sut = AuthCache(str(tmp_path / "auth_cache.json"), session_ttl_sec=0)
+
+    # when
+    sut.put_token("key", "token", time() + 10)
+    sut.put_session_id("key", "session")
+
+    # then
+    assert sut.get_token("key") is None
+    assert sut.get_session_id("key") is None
+
+def test_token_without_expiry_is_not_cached(tmp_path):
+    # given
+    sut = AuthCache(str(tmp_path / "auth_cache.json"))
+
+    # when
+    sut.put_token("key", "token", None)
+
+    # then
+    assert sut.get_token("key") is None
+
+def test_update_replaces_the_file_atomically(tmp_path, mocker):
+    # given
+    file_path = str(tmp_path / "auth_cache.json")
+    sut = AuthCache(file_path)
+    sut.put_token("key", "token", time() + 600)
+    mocker.patch("auth_cache.json.dump", side_effect=OSError("disk full"))
+
+    # when
+    with pytest.raises(OSError):
+        sut.put_token("other-key", "other-token", time() + 600)
+
+    # then
+    assert sut.get_token("key") == "token"
+    assert os.listdir(tmp_path) == ["auth_cache.json"]
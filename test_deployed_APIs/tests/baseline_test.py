@@ -0,0 +1,132 @@
+import json
+import os
+
+from baseline import BaselineComparator, load_baseline_results, resolve_baseline_path
+from latency_histogram import LatencyHistogram
+
+
+def test_resolve_baseline_path_last():
+    # when
+    res = resolve_baseline_path("last", "ms", "dev")
+
+    # then
+    assert res == os.path.join("api_results", "api_responses_ms_dev.json")
+
+def test_resolve_baseline_path_directory(tmp_path):
+    # when
+    res = resolve_baseline_path(str(tmp_path), "ms", "dev", stream_results=True)
+
+    # then
+    assert res == os.path.join(str(tmp_path), "api_responses_ms_dev.jsonl")
+
+def test_load_baseline_results_json(tmp_path):
+    # given
+    file_path = tmp_path / "api_responses_ms_dev.json"
+    file_path.write_text(json.dumps({"microservice": "ms", "env": "dev", "/api": {"status_code": 200}}))
+
+    # when
+    res = load_baseline_results(str(file_path))
+
+    # then
+    assert res == {"/api": {"status_code": 200}}
+
+def test_load_baseline_results_jsonl(tmp_path):
+    # given
+    file_path = tmp_path / "api_responses_ms_dev.jsonl"
+    file_path.write_text(
+        '{"type":"call","route":"/api","status_code":200}\n'
+        '{"type":"summary","calls":1}\n'
+    )
+
+    # when
+    res = load_baseline_results(str(file_path))
+
+    # then
+    assert res == {"/api": {"type": "call", "route": "/api", "status_code": 200}}
+
+def test_compare_call_status_change_and_body_difference():
+    # given
+    sut = BaselineComparator({"/api": {"status_code": 200, "response": {"id": 1}}})
+
+    # when
+    sut.compare_call("/api", {"status_code": 500, "response": {"id": 2}})
+
+    # then
+    assert sut.has_regressions
+    assert sut.status_changes == {"/api": {"baseline": 200, "current": 500}}
+    assert sut.body_differences == {"/api": [{"path": "$.id", "change": "changed", "baseline": 1, "current": 2}]}
+
+def test_compare_call_error_against_baseline():
+    # given
+    sut = BaselineComparator({"/api": {"status_code": 200}})
+
+    # when
+    sut.compare_call("/api", {"error": "Connection failed"})
+
+    # then
+    assert sut.status_changes == {"/api": {"baseline": 200, "current": "error"}}
+
+def test_compare_call_body_difference_is_not_a_regression():
+    # given
+    sut = BaselineComparator({"/api": {"status_code": 200, "response_sha256": "aaa"}})
+
+    # when
+    sut.compare_call("/api", {"status_code": 200, "response_sha256": "bbb"})
+
+    # then
+    assert not sut.has_regressions
+    assert "/api" in sut.body_differences
+
+def test_compare_latency():
+    # given
+    sut = BaselineComparator({
+        "/slow": {"latency": {"p95_sec": 0.1}},
+        "/fast": {"latency": {"p95_sec": 0.1}},
+        "/tiny": {"latency": {"p95_sec": 0.001}}
+    }, p95_threshold=0.2)
+
+    histograms = {"/slow": LatencyHistogram(), "/fast": LatencyHistogram(), "/tiny": LatencyHistogram(), "/new": LatencyHistogram()}
+    histograms["/slow"].record(0.2)
+    histograms["/fast"].record(0.11)
+    histograms["/tiny"].record(0.002)
+    histograms["/new"].record(1.0)
+
+    # when
+    sut.compare_latency(histograms)
+
+    # then
+    assert list(sut.latency_regressions.keys()) == ["/slow"]
+    assert sut.latency_regressions["/slow"]["baseline_p95_sec"] == 0.1
+
+def test_compare_latency_per_route_template():
+    # given
+    sut = BaselineComparator({
+        "/customers/1": {"route_template": "/customers/{id}", "latency": {"p95_sec": 0.5}},
+        "/customers/2": {"route_template": "/customers/{id}", "latency": {"p95_sec": 0.1}}
+    }, p95_threshold=0.2)
+    histogram = LatencyHistogram()
+    histogram.record(0.2)
+
+    # when
+    sut.compare_latency({"/customers/{id}": histogram})
+
+    # then
+    assert sut.latency_regressions["/customers/{id}"]["baseline_p95_sec"] == 0.1
+
+def test_from_file_reads_latency_file(tmp_path):
+    # given
+    histogram = LatencyHistogram()
+    for _ in range(20):
+        histogram.record(0.1)
+    (tmp_path / "api_responses_ms_dev.json").write_text(json.dumps({"microservice": "ms", "env": "dev", "/customers/1": {"status_code": 200, "route_template": "/customers/{id}"}}))
+    (tmp_path / "api_latency_ms_dev.json").write_text(json.dumps({"microservice": "ms", "env": "dev", "routes": {"/customers/{id}": histogram.to_dict()}}))
+    current = LatencyHistogram()
+    current.record(0.2)
+
+    # when
+    sut = BaselineComparator.from_file(str(tmp_path / "api_responses_ms_dev.json"))
+    sut.compare_latency({"/customers/{id}": current})
+
+    # then
+    assert sut.baseline_latency["/customers/{id}"] == histogram.summary()
+    assert sut.latency_regressions["/customers/{id}"]["baseline_p95_sec"] == histogram.summary()["p95_sec"]
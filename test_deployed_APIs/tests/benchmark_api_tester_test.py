@@ -0,0 +1,38 @@
+from benchmark_api_tester import compare_benchmarks, run_benchmark
+
+
+def test_run_benchmark_reports_every_mode():
+    # when
+    res = run_benchmark(requests_count=20, concurrency=4, rps=50, duration_sec=0.2)
+
+    # then
+    assert set(res["modes"]) == {"sequential", "concurrent", "load", "memory"}
+    assert res["modes"]["sequential"]["requests"] == 20
+    assert res["modes"]["sequential"]["throughput_rps"] > 0
+    assert res["modes"]["concurrent"]["concurrency"] == 4
+    assert res["modes"]["load"]["sent"] == 10
+    assert res["modes"]["load"]["errors"] == 0
+    assert res["modes"]["memory"]["retained_bytes_per_call"] > 0
+    assert res["settings"]["payload_size"] == 1024
+
+def test_run_benchmark_selected_modes():
+    # when
+    res = run_benchmark(modes=["sequential"], requests_count=5)
+
+    # then
+    assert set(res["modes"]) == {"sequential", "memory"}
+
+def test_compare_benchmarks():
+    # given
+    previous = {"modes": {"sequential": {"throughput_rps": 100.0, "overhead_per_request_ms": 0.2}, "memory": {"retained_bytes_per_call": 1000.0}}}
+    current = {"modes": {"sequential": {"throughput_rps": 80.0, "overhead_per_request_ms": 0.3}, "load": {"achieved_rps": 50.0}, "memory": {"retained_bytes_per_call": 1000.0}}}
+
+    # when
+    res = compare_benchmarks(previous, current)
+
+    # then
+    assert res == {
+        "sequential.throughput_rps": {"previous": 100.0, "current": 80.0, "change": -0.2},
+        "sequential.overhead_per_request_ms": {"previous": 0.2, "current": 0.3, "change": 0.5},
+        "memory.retained_bytes_per_call": {"previous": 1000.0, "current": 1000.0, "change": 0.0}
+    }
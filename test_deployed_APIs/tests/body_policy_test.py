@@ -0,0 +1,111 @@
+import hashlib
+import pytest
+import requests
+
+from body_policy import ACCEPT_ENCODING, parse_body_policy, read_body, transfer_sizes
+from stub_server import StubServer
+
+URL = "https://example.com/api"
+
+
+def get_streamed(requests_mock, **kwargs):
+    requests_mock.get(URL, **kwargs)
+    return requests.get(URL, stream=True)
+
+@pytest.mark.parametrize("policy, expected", [
+    ("full", ("full", None)),
+    ("hash", ("hash", None)),
+    ("none", ("none", None)),
+    ("truncate:100", ("truncate", 100))
+])
+def test_parse_body_policy(policy, expected):
+    # when
+    res = parse_body_policy(policy)
+
+    # then
+    assert res == expected
+
+@pytest.mark.parametrize("policy", ["truncate", "truncate:abc", "full:10", "everything", 100, None])
+def test_parse_body_policy_invalid_raises(policy):
+    # when & then
+    with pytest.raises(ValueError, match="Invalid body policy"):
+        parse_body_policy(policy)
+
+def test_read_body_full_json(requests_mock):
+    # given
+    response = get_streamed(requests_mock, json={"field1": "value1"})
+
+    # when
+    res = read_body(response, "full")
+
+    # then
+    assert res == {"response": {"field1": "value1"}}
+
+def test_read_body_full_not_json(requests_mock):
+    # given
+    response = get_streamed(requests_mock, text="<html>not json</html>")
+
+    # when
+    res = read_body(response, "full")
+
+    # then
+    assert res == {"response": "<html>not json</html>"}
+
+def test_read_body_hash(requests_mock):
+    # given
+    content = b"x" * 200_000
+    response = get_streamed(requests_mock, content=content)
+
+    # when
+    res = read_body(response, "hash")
+
+    # then
+    assert res == {"response_sha256": hashlib.sha256(content).hexdigest(), "response_size": 200_000}
+
+def test_read_body_truncate(requests_mock):
+    # given
+    response = get_streamed(requests_mock, text="abcdefghij")
+
+    # when
+    res = read_body(response, "truncate:4")
+
+    # then
+    assert res == {"response": "abcd", "response_size": 10, "truncated": True}
+
+def test_read_body_none(requests_mock):
+    # given
+    response = get_streamed(requests_mock, text="abcdefghij")
+
+    # when
+    res = read_body(response, "none")
+
+    # then
+    assert res == {"response_size": 10}
+
+@pytest.mark.parametrize("policy", ["full", "hash", "truncate:10", "none"])
+def test_transfer_sizes_of_compressed_response(policy):
+    # given
+    with StubServer(payload_size=5000, compress=True) as stub:
+        response = requests.get(f"{stub.url}/api", headers={"Accept-Encoding": ACCEPT_ENCODING}, stream=True)
+        body = read_body(response, policy)
+
+        # when
+        res = transfer_sizes(response, body)
+
+    # then
+    assert res["content_encoding"] == "gzip"
+    assert res["decoded_bytes"] == len('{"route": "/api", "data": ""}') + 5000
+    assert res["wire_bytes"] < 200
+    assert res["compression_ratio"] == round(res["decoded_bytes"] / res["wire_bytes"], 3)
+
+def test_transfer_sizes_of_uncompressed_response():
+    # given
+    with StubServer(payload_size=100, compress=True) as stub:
+        response = requests.get(f"{stub.url}/api", headers={"Accept-Encoding": "identity"}, stream=True)
+        body = read_body(response, "full")
+
+        # when
+        res = transfer_sizes(response, body)
+
+    # then
+    assert res == {"content_encoding": "identity", "wire_bytes": 129, "decoded_bytes": 129, "compression_ratio": 1.0}
@@ -0,0 +1,122 @@
+import pytest
+from unittest.mock import patch
+
+from capacity_finder import CapacityFinder
+from stub_server import StubServer
+
+
+def fake_step(knee_concurrency):
+    # throughput grows with the concurrency until the knee, then the SLO breaks
+    def run_step(concurrency, cases, cases_lock):
+        within_slo = concurrency <= knee_concurrency
+        return {
+            "concurrency": concurrency,
+            "completed": 100,
+            "errors": 0 if within_slo else 10,
+            "throughput_rps": 10.0 * min(concurrency, knee_concurrency),
+            "p99_sec": 0.1 if within_slo else 2.0,
+            "error_rate": 0.0 if within_slo else 0.1,
+            "within_slo": within_slo
+        }
+    return run_step
+
+def test_aimd_finds_the_knee(make_tester):
+    # given
+    sut = CapacityFinder(make_tester(pool_size=16), slo_p99_sec=1.0, additive_step=2, max_breaches=2, slow_start=False)
+
+    # when
+    with patch.object(sut, "_run_step", side_effect=fake_step(5)):
+        res = sut.run([{"route": "/api"}])
+
+    # then
+    assert [step["concurrency"] for step in res["steps"]] == [1, 3, 5, 7, 3, 5, 7]
+    assert res["knee"]["concurrency"] == 5
+    assert res["knee"]["throughput_rps"] == 50.0
+    assert res["stopped_because"] == "slo breached"
+
+def test_stops_at_max_concurrency(make_tester):
+    # given
+    sut = CapacityFinder(make_tester(pool_size=16), slo_p99_sec=1.0, max_concurrency=4, additive_step=2, slow_start=False)
+
+    # when
+    with patch.object(sut, "_run_step", side_effect=fake_step(100)):
+        res = sut.run([{"route": "/api"}])
+
+    # then
+    assert [step["concurrency"] for step in res["steps"]] == [1, 3, 4]
+    assert res["knee"]["concurrency"] == 4
+    assert res["stopped_because"] == "max concurrency reached"
+
+def test_slow_start_then_additive_increase(make_tester):
+    # given
+    sut = CapacityFinder(make_tester(pool_size=16), slo_p99_sec=1.0, additive_step=2, max_breaches=2)
+
+    # when
+    with patch.object(sut, "_run_step", side_effect=fake_step(12)):
+        res = sut.run([{"route": "/api"}])
+
+    # then
+    assert [step["concurrency"] for step in res["steps"]] == [1, 2, 4, 8, 16, 8, 10, 12, 14]
+    assert res["knee"]["concurrency"] == 12
+    assert res["stopped_because"] == "slo breached"
+
+def test_default_settings_reach_max_concurrency(make_tester):
+    # given
+    sut = CapacityFinder(make_tester(pool_size=16), slo_p99_sec=1.0, max_concurrency=256)
+
+    # when
+    with patch.object(sut, "_run_step", side_effect=fake_step(1000)):
+        res = sut.run([{"route": "/api"}])
+
+    # then
+    assert [step["concurrency"] for step in res["steps"]] == [1, 2, 4, 8, 16, 32, 64, 128, 256]
+    assert res["stopped_because"] == "max concurrency reached"
+
+def test_no_knee_when_slo_breached_at_concurrency_one(make_tester):
+    # given
+    sut = CapacityFinder(make_tester(pool_size=16), slo_p99_sec=1.0, max_breaches=2)
+
+    # when
+    with patch.object(sut, "_run_step", side_effect=fake_step(0)):
+        res = sut.run([{"route": "/api"}])
+
+    # then
+    assert [step["concurrency"] for step in res["steps"]] == [1, 1]
+    assert res["knee"] is None
+
+def test_run_step_against_stub_server(make_tester):
+    # given
+    with StubServer(latency_sec=0.01) as stub:
+        sut = CapacityFinder(make_tester(stub.url, pool_size=16), slo_p99_sec=1.0, step_duration_sec=0.2, max_concurrency=4, additive_step=3)
+
+        # when
+        res = sut.run([{"method": "GET", "route": "/api"}, {"method": "GET", "route": "/status/500"}])
+
+    # then
+    assert [step["concurrency"] for step in res["steps"]] == [1, 1, 1]
+    assert 0.4 <= res["steps"][0]["error_rate"] <= 0.6
+    assert res["steps"][0]["completed"] > 5
+    assert res["knee"] is None
+
+def test_run_step_within_slo_against_stub_server(make_tester):
+    # given
+    with StubServer(latency_sec=0.01) as stub:
+        sut = CapacityFinder(make_tester(stub.url, pool_size=16), slo_p99_sec=1.0, step_duration_sec=0.2, max_concurrency=4, additive_step=3)
+
+        # when
+        res = sut.run([{"method": "GET", "route": "/api"}])
+
+    # then
+    assert [step["concurrency"] for step in res["steps"]] == [1, 2, 4]
+    assert res["steps"][2]["throughput_rps"] > res["steps"][0]["throughput_rps"]
+    assert res["knee"]["concurrency"] == 4
+
+def test_worker_exception_is_raised(make_tester):
+    # given
+    api_tester = make_tester(pool_size=16)
+    sut = CapacityFinder(api_tester, slo_p99_sec=1.0, step_duration_sec=1.0)
+
+    # when & then
+    with patch.object(api_tester, "_call_single_api", side_effect=RuntimeError("boom")):
+        with pytest.raises(RuntimeError, match="boom"):
+            sut.run([{"method": "GET", "route": "/api"}])
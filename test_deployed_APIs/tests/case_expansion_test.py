@@ -0,0 +1,84 @@
+import pytest
+
+from case_expansion import expand_api_cases
+
+
+def test_plain_entries_are_not_changed():
+    # given
+    apis_to_test = [{"method": "GET", "route": "/api1"}]
+
+    # when
+    res = list(expand_api_cases(apis_to_test))
+
+    # then
+    assert res == apis_to_test
+
+def test_parameters_matrix():
+    # given
+    apis_to_test = [{
+        "route": "/customers/{customer_id}",
+        "query_params": {"lang": "{lang}"},
+        "parameters": {"customer_id": [1, 2], "lang": ["it", "en"]}
+    }]
+
+    # when
+    res = list(expand_api_cases(apis_to_test))
+
+    # then
+    assert res == [
+        {"route": "/customers/1", "query_params": {"lang": "it"}, "route_template": "/customers/{customer_id}"},
+        {"route": "/customers/1", "query_params": {"lang": "en"}, "route_template": "/customers/{customer_id}"},
+        {"route": "/customers/2", "query_params": {"lang": "it"}, "route_template": "/customers/{customer_id}"},
+        {"route": "/customers/2", "query_params": {"lang": "en"}, "route_template": "/customers/{customer_id}"}
+    ]
+
+def test_csv_data_file_with_parameters(tmp_path):
+    # given
+    (tmp_path / "customers.csv").write_text("customer_id,segment\n10,gold\n20,silver\n")
+    apis_to_test = [{
+        "route": "/customers/{customer_id}",
+        "body": {"segment": "{segment}", "channel": "{channel}"},
+        "data_file": "customers.csv",
+        "parameters": {"channel": ["web", "app"]}
+    }]
+
+    # when
+    res = list(expand_api_cases(apis_to_test, str(tmp_path)))
+
+    # then
+    assert [(case["route"], case["body"]["segment"], case["body"]["channel"]) for case in res] == [
+        ("/customers/10", "gold", "web"),
+        ("/customers/10", "gold", "app"),
+        ("/customers/20", "silver", "web"),
+        ("/customers/20", "silver", "app")
+    ]
+
+def test_jsonl_data_file_keeps_types(tmp_path):
+    # given
+    (tmp_path / "orders.jsonl").write_text('{"order_id": 1}\n\n{"order_id": 2}\n')
+    apis_to_test = [{"route": "/orders", "body": {"id": "{order_id}"}, "data_file": "orders.jsonl"}]
+
+    # when
+    res = list(expand_api_cases(apis_to_test, str(tmp_path)))
+
+    # then
+    assert res == [{"route": "/orders", "body": {"id": 1}}, {"route": "/orders", "body": {"id": 2}}]
+
+def test_expansion_is_lazy():
+    # given
+    apis_to_test = [{"route": "/items/{item_id}/{variant}", "parameters": {"item_id": list(range(10_000)), "variant": list(range(10_000))}}]
+
+    # when
+    res = expand_api_cases(apis_to_test)
+
+    # then
+    assert next(res)["route"] == "/items/0/0"
+    assert next(res)["route"] == "/items/0/1"
+
+def test_unsupported_data_file_raises(tmp_path):
+    # given
+    (tmp_path / "data.txt").write_text("")
+
+    # when & then
+    with pytest.raises(ValueError, match="Unsupported data file"):
+        list(expand_api_cases([{"route": "/api", "data_file": "data.txt"}], str(tmp_path)))
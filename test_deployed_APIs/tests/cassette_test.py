@@ -0,0 +1,69 @@
+import os
+import pytest
+
+from cassette import Cassette, request_key
+from stub_server import StubServer
+
+
+def test_request_key_depends_on_method_url_and_body():
+    # when & then
+    assert request_key("GET", "http://a/x", None) == request_key("GET", "http://a/x", b"")
+    assert request_key("POST", "http://a/x", '{"a": 1}') == request_key("POST", "http://a/x", b'{"a": 1}')
+    assert request_key("POST", "http://a/x", b"1") != request_key("POST", "http://a/x", b"2")
+    assert request_key("GET", "http://a/x", None) != request_key("DELETE", "http://a/x", None)
+
+def test_invalid_mode_raises(tmp_path):
+    # when & then
+    with pytest.raises(ValueError, match="Invalid cassette mode"):
+        Cassette(str(tmp_path), "rewind")
+
+def test_replay_without_recording_raises(tmp_path):
+    # when & then
+    with pytest.raises(FileNotFoundError, match="No recording found"):
+        Cassette(str(tmp_path / "missing"), "replay")
+
+def test_record_then_replay_without_network(tmp_path, make_tester):
+    # given
+    apis = [
+        {"method": "GET", "route": "/api/v1/resource", "query_params": {"page": "1"}},
+        {"method": "POST", "route": "/api/v1/orders", "body": {"item": "shoes"}},
+        {"method": "GET", "route": "/status/503"},
+        {"method": "GET", "route": "/status/503"}
+    ]
+
+    with StubServer(payload_size=16) as stub:
+        recorder = make_tester(stub.url, cassette=Cassette(str(tmp_path), "record"))
+        recorded = [recorder._call_single_api(api_info) for api_info in apis]
+        base_url = stub.url
+
+    # when
+    replayer = make_tester(base_url, cassette=Cassette(str(tmp_path), "replay"))
+    replayed = [replayer._call_single_api(api_info) for api_info in apis]
+
+    # then
+    for recorded_outcome, replayed_outcome in zip(recorded, replayed):
+        assert replayed_outcome["status_code"] == recorded_outcome["status_code"]
+        assert replayed_outcome["body"] == recorded_outcome["body"]
+        assert replayed_outcome["url"] == recorded_outcome["url"]
+    assert replayed[1]["body"]["response"]["route"] == "/api/v1/orders"
+
+    # identical bodies are stored once
+    assert len(os.listdir(tmp_path / "objects")) == 3
+    with open(tmp_path / "index.jsonl") as file:
+        assert len(file.readlines()) == 4
+
+def test_replay_falls_back_to_method_and_url(tmp_path, make_tester):
+    # given
+    with StubServer() as stub:
+        make_tester(stub.url, cassette=Cassette(str(tmp_path), "record"))._call_single_api({"method": "POST", "route": "/api/session", "body": {"sessionId": "first"}})
+        base_url = stub.url
+
+    replayer = make_tester(base_url, cassette=Cassette(str(tmp_path), "replay"))
+
+    # when
+    res = replayer._call_single_api({"method": "POST", "route": "/api/session", "body": {"sessionId": "second"}})
+    missing = replayer._call_single_api({"method": "GET", "route": "/api/session"})
+
+    # then
+    assert res["status_code"] == 200
+    assert "No recorded response for GET" in missing["error"]
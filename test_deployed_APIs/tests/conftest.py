@@ -0,0 +1,14 @@
+import pytest
+
+from api_tester import APITester
+from api_tester_config import APITesterConfig
+
+
+@pytest.fixture
+def make_tester():
+    # testers without auth or session manager, only the base URL and the options of the test change
+    def make(base_url="https://example.com", script_dir=".", microservice="ms", env="dev", **kwargs):
+        config = APITesterConfig(base_url, "", "", {}, {}, {}, {}, "")
+        return APITester(config, script_dir, microservice, env, **kwargs)
+
+    return make
@@ -0,0 +1,47 @@
+from stub_server import StubServer
+
+
+def test_pool_size_follows_concurrency(make_tester):
+    # when
+    sequential = make_tester()
+    concurrent = make_tester(concurrency=32)
+
+    # then
+    assert sequential.session.get_adapter("https://example.com")._pool_maxsize == 10
+    assert concurrent.session.get_adapter("https://example.com")._pool_maxsize == 32
+    assert concurrent.session.get_adapter("http://example.com")._pool_maxsize == 32
+
+def test_pool_settings_and_tls_verification(make_tester):
+    # when
+    api_tester = make_tester(pool_size=4, pool_block=True, verify_tls=False)
+
+    # then
+    adapter = api_tester.session.get_adapter("https://example.com")
+    assert adapter._pool_maxsize == 4
+    assert adapter._pool_block is True
+    assert api_tester.session.verify is False
+    assert make_tester().session.verify is True
+
+def test_sequential_calls_reuse_the_connection(make_tester):
+    # given
+    with StubServer() as stub:
+        api_tester = make_tester(stub.url)
+
+        # when
+        api_tester._call_all_apis([{"method": "GET", "route": f"/api/{index}"} for index in range(5)])
+
+    # then
+    assert api_tester._connections_summary() == {"new": 1, "reused": 4, "pool_size": 10, "pool_block": False}
+
+def test_concurrent_calls_stay_within_the_pool(make_tester):
+    # given
+    with StubServer(latency_sec=0.01) as stub:
+        api_tester = make_tester(stub.url, concurrency=8, pool_block=True)
+
+        # when
+        api_tester._call_all_apis([{"method": "GET", "route": f"/api/{index}"} for index in range(40)])
+
+    # then
+    connections = api_tester._connections_summary()
+    assert connections["new"] + connections["reused"] == 40
+    assert connections["new"] <= 10
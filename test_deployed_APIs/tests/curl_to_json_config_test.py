@@ -0,0 +1,144 @@
+import base64
+import json
+import pytest
+
+from curl_to_json_config.curl_to_json_config import _parse_curl_item, iter_har_entries, merge_into_apis_to_test, parse_curl_command, parse_har_entry, parse_in_parallel, split_curl_commands
+
+
+def test_parse_curl_command_data_makes_post():
+    # when
+    res = parse_curl_command("curl 'https://example.com/api/orders?page=2' -H 'Content-Type: application/json' --data '{\"id\": 1}'")
+
+    # then
+    assert res == {
+        "method": "POST",
+        "route": "/api/orders",
+        "headers": {"Content-Type": "application/json"},
+        "query_params": {"page": "2"},
+        "body": {"id": 1}
+    }
+
+def test_parse_curl_command_get_with_data():
+    # when
+    res = parse_curl_command("curl -G https://example.com/api/search -d 'q=shoes' --data 'size=42'")
+
+    # then
+    assert res["method"] == "GET"
+    assert res["query_params"] == {"q": "shoes", "size": "42"}
+    assert res["body"] == {}
+
+def test_parse_curl_command_basic_auth_and_explicit_method():
+    # when
+    res = parse_curl_command("curl -X PUT -u user:pass https://example.com/api/orders/1 --data-raw 'status=shipped' --compressed")
+
+    # then
+    assert res["method"] == "PUT"
+    assert res["headers"]["Authorization"] == f"Basic {base64.b64encode(b'user:pass').decode()}"
+    assert res["headers"]["Accept-Encoding"] == "deflate, gzip"
+    assert res["body"] == {"status": "shipped"}
+
+def test_parse_curl_command_data_from_file(tmp_path):
+    # given
+    (tmp_path / "body.txt").write_text("line one\nline two\n")
+    (tmp_path / "body.json").write_text('{\n  "id": 7\n}\n')
+
+    # when
+    binary = parse_curl_command("curl https://example.com/api/notes --data-binary @body.txt", str(tmp_path))
+    data = parse_curl_command("curl https://example.com/api/orders -d @body.json", str(tmp_path))
+    raw = parse_curl_command("curl https://example.com/api/handles --data-raw @someone")
+
+    # then
+    assert binary["method"] == "POST"
+    assert binary["body"] == {"line one\nline two\n": ""}
+    assert data["body"] == {"id": 7}
+    assert raw["body"] == {"@someone": ""}
+
+def test_split_curl_commands():
+    # given
+    text = "curl https://example.com/a \\\n  -H 'X-Id: 1'\n\ncurl https://example.com/b\n"
+
+    # when
+    res = list(split_curl_commands(text))
+
+    # then
+    assert len(res) == 2
+    assert [parse_curl_command(command)["route"] for command in res] == ["/a", "/b"]
+
+def test_iter_har_entries_across_small_chunks(tmp_path):
+    # given
+    entries = [
+        {"request": {"method": "get", "url": f"https://example.com/api/items/{index}?lang=it", "headers": [{"name": ":authority", "value": "example.com"}, {"name": "Accept-Encoding", "value": "gzip"}, {"name": "X-Id", "value": str(index)}]}}
+        for index in range(5)
+    ]
+    har_file = tmp_path / "export.har"
+    har_file.write_text(json.dumps({"log": {"version": "1.2", "entries": entries}}, indent=2))
+
+    # when
+    res = [parse_har_entry(entry) for entry in iter_har_entries(str(har_file), chunk_size=7)]
+
+    # then
+    assert [api_config["route"] for api_config in res] == [f"/api/items/{index}" for index in range(5)]
+    assert res[3] == {"method": "GET", "route": "/api/items/3", "headers": {"X-Id": "3"}, "query_params": {"lang": "it"}, "body": {}}
+
+def test_iter_har_entries_truncated_file(tmp_path):
+    # given
+    har_file = tmp_path / "export.har"
+    har_file.write_text('{"log": {"entries": [{"request": {"method": "GET"')
+
+    # when & then
+    with pytest.raises(ValueError, match="Truncated"):
+        list(iter_har_entries(str(har_file), chunk_size=8))
+
+def test_parse_har_entry_drops_credentials_and_hop_by_hop_headers():
+    # given
+    headers = ["Authorization", "Cookie", "X-BEAR-SESSION-TOKEN", "Proxy-Authorization", "TE", "Keep-Alive", "X-Tenant"]
+
+    # when
+    res = parse_har_entry({"request": {"method": "GET", "url": "https://example.com/api", "headers": [{"name": name, "value": "v"} for name in headers]}})
+
+    # then
+    assert res["headers"] == {"X-Tenant": "v"}
+
+def test_parse_har_entry_post_params():
+    # when
+    res = parse_har_entry({"request": {"method": "POST", "url": "https://example.com/login", "postData": {"params": [{"name": "user", "value": "u"}, {"name": "remember"}]}}})
+
+    # then
+    assert res["body"] == {"user": "u", "remember": ""}
+
+def test_parse_in_parallel_keeps_order():
+    # given
+    commands = ((f"curl https://example.com/api/{index}", ".") for index in range(7))
+
+    # when
+    res = list(parse_in_parallel(_parse_curl_item, commands, workers=2, batch_size=3))
+
+    # then
+    assert [api_config["route"] for api_config in res] == [f"/api/{index}" for index in range(7)]
+
+def test_merge_into_existing_apis_to_test(tmp_path):
+    # given
+    apis_to_test_file = tmp_path / "api_configs" / "apis_to_test.json"
+    apis_to_test_file.parent.mkdir()
+    apis_to_test_file.write_text(json.dumps([{"method": "GET", "route": "/a", "query_params": {"x": "1"}}]))
+    api_configs = [
+        {"method": "get", "route": "/a", "query_params": {"x": "1"}},
+        {"method": "GET", "route": "/a", "query_params": {"x": "2"}},
+        {"method": "POST", "route": "/a", "query_params": {}},
+        {"method": "POST", "route": "/a"}
+    ]
+
+    # when
+    added, duplicates = merge_into_apis_to_test(iter(api_configs), str(apis_to_test_file))
+
+    # then
+    assert (added, duplicates) == (2, 2)
+    assert [(api_config["method"], api_config["query_params"]) for api_config in json.loads(apis_to_test_file.read_text())] == [("GET", {"x": "1"}), ("GET", {"x": "2"}), ("POST", {})]
+
+def test_merge_into_new_apis_to_test(tmp_path):
+    # when
+    added, duplicates = merge_into_apis_to_test([{"method": "GET", "route": "/a"}], str(tmp_path / "out" / "apis_to_test.json"))
+
+    # then
+    assert (added, duplicates) == (1, 0)
+    assert json.loads((tmp_path / "out" / "apis_to_test.json").read_text()) == [{"method": "GET", "route": "/a"}]
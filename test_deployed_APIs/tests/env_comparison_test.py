@@ -0,0 +1,81 @@
+import json
+import pytest
+import requests
+
+from env_comparison import EnvComparison
+
+STAGING_URL = "https://staging.example.com"
+PROD_URL = "https://prod.example.com"
+
+
+class TestEnvComparison:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path, monkeypatch, make_tester):
+        monkeypatch.chdir(tmp_path)
+        self.apis_to_test_file = tmp_path / "apis_to_test.json"
+        self.staging = make_tester(STAGING_URL, str(tmp_path), env="staging")
+        self.prod = make_tester(PROD_URL, str(tmp_path), env="prod")
+        self.staging.apis_to_test_file = self.prod.apis_to_test_file = str(self.apis_to_test_file)
+
+    def write_apis(self, apis):
+        with open(self.apis_to_test_file, "w") as file:
+            json.dump(apis, file)
+
+    def test_report_per_route(self, requests_mock):
+        # given
+        self.write_apis([{"method": "GET", "route": "/orders"}, {"method": "GET", "route": "/users"}])
+        requests_mock.get(f"{STAGING_URL}/orders", json={"items": [{"id": 1, "total": 10}], "generated_at": "t1"})
+        requests_mock.get(f"{PROD_URL}/orders", json={"items": [{"id": 1, "total": 12}], "generated_at": "t2"})
+        requests_mock.get(f"{STAGING_URL}/users", status_code=200, json={})
+        requests_mock.get(f"{PROD_URL}/users", status_code=500, json={})
+
+        # when
+        report = EnvComparison(self.staging, self.prod, ["$.generated_at"]).run_and_save_results()
+
+        # then
+        orders = report["routes"]["/orders"]
+        assert orders["staging"]["status_code"] == 200 and orders["prod"]["status_code"] == 200
+        assert not orders["status_differs"]
+        assert orders["body_differences"] == [{"path": "$.items[0].total", "change": "changed", "staging": 10, "prod": 12}]
+        assert orders["latency_delta_sec"] == pytest.approx(orders["prod"]["response_time_sec"] - orders["staging"]["response_time_sec"], abs=1e-3)
+
+        assert report["routes"]["/users"]["status_differs"]
+        assert report["summary"]["routes"] == 2
+        assert report["summary"]["status_differences"] == 1
+        assert report["summary"]["body_differences"] == 1
+
+        with open("api_results/api_compare_ms_staging_vs_prod.json") as file:
+            assert json.load(file)["summary"] == report["summary"]
+
+    def test_both_environments_called_with_their_own_session(self, requests_mock):
+        # given
+        self.write_apis([{"method": "GET", "route": "/orders"}])
+        self.staging._set_token("staging-token")
+        self.prod._set_token("prod-token")
+        requests_mock.get(f"{STAGING_URL}/orders", json={})
+        requests_mock.get(f"{PROD_URL}/orders", json={})
+
+        # when
+        EnvComparison(self.staging, self.prod, concurrency=4).run_and_save_results()
+
+        # then
+        tokens = {request.netloc: request.headers["Authorization"] for request in requests_mock.request_history}
+        assert tokens == {"staging.example.com": "Bearer staging-token", "prod.example.com": "Bearer prod-token"}
+
+    def test_error_on_one_side_skips_body_and_latency(self, requests_mock):
+        # given
+        self.write_apis([{"method": "GET", "route": "/orders"}])
+        requests_mock.get(f"{STAGING_URL}/orders", json={})
+        requests_mock.get(f"{PROD_URL}/orders", exc=requests.exceptions.ConnectionError("refused"))
+
+        # when
+        report = EnvComparison(self.staging, self.prod).run(self.staging._expand_apis_to_test(self.staging._load_apis_to_test()))
+
+        # then
+        orders = report["routes"]["/orders"]
+        assert "error" in orders["prod"]
+        assert orders["status_differs"]
+        assert orders["latency_delta_sec"] is None
+        assert orders["body_differences"] == []
+        assert report["summary"]["latency_delta_p50_sec"] is None
@@ -0,0 +1,71 @@
+import pytest
+
+from latency_histogram import LatencyHistogram
+
+
+def test_percentiles_within_precision():
+    # given
+    sut = LatencyHistogram()
+
+    # when
+    for millis in range(1, 1001):
+        sut.record(millis / 1000)
+
+    # then
+    assert sut.total_count == 1000
+    assert sut.percentile(50) == pytest.approx(0.5, rel=0.01)
+    assert sut.percentile(90) == pytest.approx(0.9, rel=0.01)
+    assert sut.percentile(99) == pytest.approx(0.99, rel=0.01)
+    assert sut.percentile(100) == 1.0
+
+def test_summary_of_empty_histogram():
+    # when
+    res = LatencyHistogram().summary()
+
+    # then
+    assert res == {"count": 0, "p50_sec": 0.0, "p90_sec": 0.0, "p95_sec": 0.0, "p99_sec": 0.0, "max_sec": 0.0}
+
+def test_values_above_max_are_clamped():
+    # given
+    sut = LatencyHistogram(max_value_sec=10)
+
+    # when
+    sut.record(60)
+
+    # then
+    assert sut.summary()["max_sec"] == 10.0
+
+def test_merge():
+    # given
+    sut = LatencyHistogram()
+    other = LatencyHistogram()
+    sut.record(0.1)
+    other.record(0.3)
+    other.record(0.5)
+
+    # when
+    sut.merge(other)
+
+    # then
+    assert sut.total_count == 3
+    assert sut.percentile(50) == pytest.approx(0.3, rel=0.01)
+    assert sut.max_value == 500_000
+    assert sut.min_value == 100_000
+
+def test_merge_different_ranges_raises():
+    # when & then
+    with pytest.raises(ValueError, match="max_value_sec"):
+        LatencyHistogram(10).merge(LatencyHistogram(20))
+
+def test_to_dict_and_from_dict_roundtrip():
+    # given
+    sut = LatencyHistogram()
+    for latency in [0.002, 0.05, 1.5]:
+        sut.record(latency)
+
+    # when
+    res = LatencyHistogram.from_dict(sut.to_dict())
+
+    # then
+    assert res.counts == sut.counts
+    assert res.summary() == sut.summary()
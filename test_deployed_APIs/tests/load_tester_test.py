@@ -0,0 +1,78 @@
+import pytest
+
+from api_tester import APITester
+from api_tester_config import APITesterConfig
+from latency_histogram import LatencyHistogram
+from load_tester import LoadTester, parse_duration
+
+
+@pytest.mark.parametrize("duration, expected", [("30s", 30.0), ("10m", 600.0), ("1h", 3600.0), ("1.5", 1.5)])
+def test_parse_duration(duration, expected):
+    # when
+    res = parse_duration(duration)
+
+    # then
+    assert res == expected
+
+
+@pytest.mark.usefixtures("requests_mock")
+class TestLoadTester:
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.config = APITesterConfig (
+            "https://example.com",
+            "https://example.com/auth",
+            "https://sessionmanager.com",
+            {},
+            {},
+            {},
+            {},
+            "Basic dXNlcjpwYXNz"
+        )
+
+        self.api_tester = APITester(self.config, "fake_dir.json", "ms", "dev")
+
+    def test_run_sends_requests_at_target_rate(self, requests_mock):
+        # given
+        mock_apis = [{"method": "GET", "route": "/api1"}, {"method": "GET", "route": "/api2"}]
+        requests_mock.get(f"{self.config.base_url}/api1", json={})
+        requests_mock.get(f"{self.config.base_url}/api2", status_code=500, json={})
+
+        self.sut = LoadTester(self.api_tester, rps=50, duration_sec=0.2)
+
+        # when
+        sent, wall_time = self.sut._run(mock_apis)
+
+        # then
+        assert sent == 10
+        assert wall_time >= 0.18
+        assert self.sut.route_stats["/api1"]["count"] == 5
+        assert self.sut.route_stats["/api1"]["status_codes"] == {"200": 5}
+        assert self.sut.route_stats["/api2"]["status_codes"] == {"500": 5}
+
+    def test_build_summary(self):
+        # given
+        self.sut = LoadTester(self.api_tester, rps=10, duration_sec=1)
+        histogram = LatencyHistogram()
+        for latency in [0.1, 0.2, 0.3, 0.9]:
+            histogram.record(latency)
+
+        self.sut.route_stats = {
+            "/api1": {"count": 4, "errors": 1, "status_codes": {"200": 3}, "rate_limit_wait_sec": 0.25, "latency": histogram}
+        }
+
+        # when
+        res = self.sut._build_summary(sent=4, wall_time=2.0)
+
+        # then
+        assert res["achieved_rps"] == 2.0
+        assert res["routes"]["/api1"] == {
+            "count": 4,
+            "errors": 1,
+            "status_codes": {"200": 3},
+            "rate_limit_wait_sec": 0.25,
+            "latency": histogram.summary(),
+            "latency_histogram": histogram.to_dict()
+        }
+        assert res["routes"]["/api1"]["latency"]["max_sec"] == 0.9
@@ -0,0 +1,97 @@
+import json
+import logging
+import pytest
+
+from log_pipeline import DeferredQueueHandler, JsonFormatter, LogPipeline, SuccessSampler
+from retry_policy import RetryPolicy
+
+BASE_URL = "https://example.com"
+
+
+def make_record(level=logging.INFO, message="url: %s, Status: %s", args=("/api", 200), **extra):
+    record = logging.LogRecord("root", level, __file__, 1, message, args, None)
+    record.__dict__.update(extra)
+    return record
+
+def read_lines(path):
+    with open(path) as file:
+        return [json.loads(line) for line in file]
+
+def test_json_formatter_structured_fields():
+    # given
+    record = make_record(correlation_id="abc", route="/api", status_code=200, unrelated="dropped")
+
+    # when
+    res = json.loads(JsonFormatter().format(record))
+
+    # then
+    assert res["level"] == "INFO"
+    assert res["message"] == "url: /api, Status: 200"
+    assert res["correlation_id"] == "abc"
+    assert res["route"] == "/api"
+    assert res["status_code"] == 200
+    assert "unrelated" not in res and "microservice" not in res
+
+def test_success_sampler_never_drops_errors():
+    # given
+    sampler = SuccessSampler(0.0)
+
+    # when & then
+    assert not sampler.filter(make_record(success=True))
+    assert sampler.filter(make_record(success=False))
+    assert sampler.filter(make_record(level=logging.ERROR))
+    assert SuccessSampler(1.0).filter(make_record(success=True))
+
+def test_success_sampler_invalid_rate():
+    # when & then
+    with pytest.raises(ValueError):
+        SuccessSampler(1.5)
+
+def test_deferred_queue_handler_keeps_message_unformatted():
+    # given
+    record = make_record()
+
+    # when
+    res = DeferredQueueHandler(None).prepare(record)
+
+    # then
+    assert res is record
+    assert res.msg == "url: %s, Status: %s"
+    assert res.args == ("/api", 200)
+
+def test_pipeline_writes_queued_records_on_stop(tmp_path):
+    # given
+    log_file = tmp_path / "api_test.log"
+    pipeline = LogPipeline(str(log_file), sample_rate=0.0).start()
+
+    # when
+    try:
+        logging.info("sampled out %s", "/a", extra={"success": True})
+        logging.error("API: %s failed with error: %s", "/b", "timeout", extra={"route": "/b"})
+    finally:
+        pipeline.stop()
+    logging.error("after stop")
+
+    # then
+    assert [(line["level"], line["message"]) for line in read_lines(log_file)] == [("ERROR", "API: /b failed with error: timeout")]
+
+def test_call_lines_share_correlation_id(tmp_path, requests_mock, mocker, make_tester):
+    # given
+    mocker.patch("api_tester.sleep")
+    log_file = tmp_path / "api_test.log"
+    api_tester = make_tester(BASE_URL, str(tmp_path), retry_policy=RetryPolicy(max_attempts=2))
+    requests_mock.get(f"{BASE_URL}/api", [{"status_code": 503}, {"status_code": 200, "json": {}}])
+    pipeline = LogPipeline(str(log_file)).start()
+
+    # when
+    try:
+        api_tester._call_single_api_and_store_response({"method": "GET", "route": "/api"})
+    finally:
+        pipeline.stop()
+
+    # then
+    retry_line, call_line = read_lines(log_file)
+    assert retry_line["level"] == "WARNING"
+    assert call_line["status_code"] == 200
+    assert call_line["route"] == "/api" and call_line["microservice"] == "ms" and call_line["env"] == "dev"
+    assert retry_line["correlation_id"] == call_line["correlation_id"]
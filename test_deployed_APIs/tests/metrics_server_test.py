@@ -0,0 +1,69 @@
+import requests
+
+from metrics_server import OPENMETRICS_CONTENT_TYPE, MetricsServer, RunMetrics, status_class
+from stub_server import StubServer
+
+
+def test_status_class():
+    # when & then
+    assert status_class(200) == "2xx"
+    assert status_class(503) == "5xx"
+    assert status_class(None) == "error"
+
+def test_render_counters_histogram_and_gauge():
+    # given
+    metrics = RunMetrics()
+    metrics.request_started("ms", "dev")
+    metrics.request_started("ms", "dev")
+    metrics.request_finished("ms", "dev", "GET", "/a", 200, 0.02)
+
+    # when
+    text = metrics.render()
+
+    # then
+    labels = 'microservice="ms",env="dev",method="GET",route="/a"'
+    assert f"api_tester_requests_total{{{labels}}} 1" in text
+    assert 'api_tester_responses_total{microservice="ms",env="dev",route="/a",status_class="2xx"} 1' in text
+    assert 'api_tester_in_flight_requests{microservice="ms",env="dev"} 1' in text
+    assert f'api_tester_request_duration_seconds_bucket{{{labels},le="0.01"}} 0' in text
+    assert f'api_tester_request_duration_seconds_bucket{{{labels},le="0.025"}} 1' in text
+    assert f'api_tester_request_duration_seconds_bucket{{{labels},le="+Inf"}} 1' in text
+    assert f"api_tester_request_duration_seconds_count{{{labels}}} 1" in text
+    assert text.endswith("# EOF\n")
+
+def test_render_escapes_label_values():
+    # given
+    metrics = RunMetrics()
+    metrics.request_started("ms", "dev")
+    metrics.request_finished("ms", "dev", "GET", '/a"b\\c', None, 20.0)
+
+    # when
+    text = metrics.render()
+
+    # then
+    assert 'route="/a\\"b\\\\c",status_class="error"} 1' in text
+    assert 'le="10.0"} 0' in text
+
+def test_metrics_served_during_run(make_tester):
+    # given
+    metrics = RunMetrics()
+
+    with StubServer() as stub:
+        api_tester = make_tester(stub.url, metrics=metrics)
+        api_tester._call_single_api({"method": "GET", "route": "/api/v1/resource"})
+        api_tester._call_single_api({"method": "GET", "route": "/status/500"})
+
+    metrics_server = MetricsServer(metrics, 0).start()
+    try:
+        # when
+        response = requests.get(f"http://127.0.0.1:{metrics_server.port}/metrics")
+        missing = requests.get(f"http://127.0.0.1:{metrics_server.port}/other")
+    finally:
+        metrics_server.stop()
+
+    # then
+    assert response.headers["Content-Type"] == OPENMETRICS_CONTENT_TYPE
+    assert 'route="/api/v1/resource",status_class="2xx"} 1' in response.text
+    assert 'route="/status/500",status_class="5xx"} 1' in response.text
+    assert 'api_tester_in_flight_requests{microservice="ms",env="dev"} 0' in response.text
+    assert missing.status_code == 404
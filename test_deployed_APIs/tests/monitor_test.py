@@ -0,0 +1,134 @@
+import json
+import os
+import pytest
+
+from monitor import Monitor, RouteWindow
+
+BASE_URL = "https://example.com"
+
+
+def test_route_window_keeps_fixed_size():
+    # given
+    window = RouteWindow(size=3)
+
+    # when
+    for index in range(10):
+        window.record(index % 2 == 0, index / 10)
+
+    # then
+    assert len(window.successes) == 3
+    assert list(window.latencies) == [0.7, 0.8, 0.9]
+    assert window.error_rate == pytest.approx(0.6667, abs=1e-4)
+    assert window.p95_sec == 0.9
+
+def test_route_window_failure_threshold():
+    # given
+    window = RouteWindow(size=10, failure_threshold=2)
+
+    # when & then
+    assert window.record(True, 0.1) == "unknown"
+    window.record(False, None)
+    assert window.state == "healthy"
+    window.record(False, None)
+    assert window.state == "failing"
+    window.record(True, 0.1)
+    assert window.state == "healthy"
+
+
+class TestMonitor:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path, monkeypatch, make_tester):
+        monkeypatch.chdir(tmp_path)
+        self.api_tester = make_tester(BASE_URL, str(tmp_path))
+        self.api_tester.apis_to_test_file = str(tmp_path / "apis_to_test.json")
+        self.events_path = tmp_path / "api_results" / "api_monitor_ms_dev.jsonl"
+
+    def write_apis(self, apis, mtime_ns):
+        with open(self.api_tester.apis_to_test_file, "w") as file:
+            json.dump(apis, file)
+        os.utime(self.api_tester.apis_to_test_file, ns=(mtime_ns, mtime_ns))
+
+    def read_events(self):
+        if not self.events_path.exists():
+            return []
+        with open(self.events_path) as file:
+            return [json.loads(line) for line in file]
+
+    def test_only_state_transitions_are_emitted(self, requests_mock):
+        # given
+        self.write_apis([{"method": "GET", "route": "/flaky"}, {"method": "GET", "route": "/stable"}], 1_000_000_000)
+        requests_mock.get(f"{BASE_URL}/flaky", [{"status_code": 200}, {"status_code": 500}, {"status_code": 500}, {"status_code": 200}])
+        requests_mock.get(f"{BASE_URL}/stable", status_code=200)
+
+        # when
+        cycles = Monitor(self.api_tester, interval_sec=0).run(max_cycles=4)
+
+        # then
+        assert cycles == 4
+        events = self.read_events()
+        assert [(event["route"], event["from"], event["to"]) for event in events] == [("/flaky", "healthy", "failing"), ("/flaky", "failing", "healthy")]
+        assert events[0]["status_code"] == 500
+        assert events[1]["error_rate"] == 0.5
+        assert not os.path.exists("api_results/api_responses_ms_dev.json")
+
+    def test_failing_route_is_reported_from_the_first_cycle(self, requests_mock):
+        # given
+        self.write_apis([{"method": "GET", "route": "/broken"}], 1_000_000_000)
+        requests_mock.get(f"{BASE_URL}/broken", status_code=503)
+
+        # when
+        Monitor(self.api_tester, interval_sec=0).run(max_cycles=3)
+
+        # then
+        assert [(event["from"], event["to"]) for event in self.read_events()] == [("unknown", "failing")]
+
+    def test_apis_reloaded_only_when_file_changes(self, requests_mock, mocker):
+        # given
+        self.write_apis([{"method": "GET", "route": "/old"}], 1_000_000_000)
+        requests_mock.get(f"{BASE_URL}/old", status_code=200)
+        requests_mock.get(f"{BASE_URL}/new", status_code=200)
+        monitor = Monitor(self.api_tester, interval_sec=0)
+        monitor.run(max_cycles=1)
+
+        load = mocker.patch.object(self.api_tester, "_load_apis_to_test", wraps=self.api_tester._load_apis_to_test)
+
+        # when
+        monitor.run(max_cycles=2)
+        self.write_apis([{"method": "GET", "route": "/new"}], 2_000_000_000)
+        monitor.run(max_cycles=3)
+
+        # then
+        assert load.call_count == 1
+        assert list(monitor.windows) == [("GET", "/new")]
+
+    def test_invalid_file_keeps_previous_suite(self, requests_mock):
+        # given
+        self.write_apis([{"method": "GET", "route": "/old"}], 1_000_000_000)
+        requests_mock.get(f"{BASE_URL}/old", status_code=200)
+        monitor = Monitor(self.api_tester, interval_sec=0)
+        monitor.run(max_cycles=1)
+
+        with open(self.api_tester.apis_to_test_file, "w") as file:
+            file.write('[{"method": "GET", ')
+
+        # when
+        monitor.run(max_cycles=2)
+
+        # then
+        assert list(monitor.windows) == [("GET", "/old")]
+        assert len(monitor.windows[("GET", "/old")].successes) == 2
+
+    def test_stop_interrupts_the_wait(self, requests_mock):
+        # given
+        self.write_apis([{"method": "GET", "route": "/old"}], 1_000_000_000)
+        requests_mock.get(f"{BASE_URL}/old", status_code=200)
+        monitor = Monitor(self.api_tester, interval_sec=3600)
+        monitor.stop()
+
+        # when
+        cycles = monitor.run()
+
+        # then
+        assert cycles == 0
+
@@ -0,0 +1,82 @@
+import pytest
+from time import perf_counter
+
+from load_tester import LoadTester
+from rate_limiter import HostRateLimiter, TokenBucket
+from stub_server import StubServer
+
+
+def test_token_bucket_allows_burst_then_rate():
+    # given
+    bucket = TokenBucket(rate=50, burst=3)
+
+    # when
+    start_time = perf_counter()
+    waits = [bucket.acquire() for _ in range(8)]
+    elapsed = perf_counter() - start_time
+
+    # then
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert all(wait > 0 for wait in waits[3:])
+    assert elapsed == pytest.approx(5 / 50, abs=0.03)
+
+@pytest.mark.parametrize("rate, burst", [(0, 1), (-1, 1), (10, 0)])
+def test_token_bucket_invalid_settings(rate, burst):
+    # when & then
+    with pytest.raises(ValueError, match="Invalid token bucket"):
+        TokenBucket(rate, burst)
+
+def test_host_rate_limiter_buckets_per_host():
+    # given
+    limiter = HostRateLimiter(rate=1, burst=1)
+
+    # when
+    waits = [limiter.acquire("a.example.com"), limiter.acquire("b.example.com")]
+
+    # then
+    assert waits == [0.0, 0.0]
+    assert limiter.buckets.keys() == {"a.example.com", "b.example.com"}
+
+def test_host_rate_limiter_default_burst():
+    # when & then
+    assert HostRateLimiter(rate=20).burst == 20
+    assert HostRateLimiter(rate=0.5).burst == 1
+
+def test_wait_excluded_from_response_time(make_tester):
+    # given
+    limiter = HostRateLimiter(rate=20, burst=1)
+
+    with StubServer() as stub:
+        first = make_tester(stub.url, rate_limiter=limiter)
+        second = make_tester(stub.url, env="test", rate_limiter=limiter, concurrency=4)
+
+        # when
+        start_time = perf_counter()
+        first._call_all_apis([{"method": "GET", "route": f"/api/{index}"} for index in range(3)])
+        second._call_all_apis([{"method": "GET", "route": f"/api/{index}"} for index in range(3)])
+        elapsed = perf_counter() - start_time
+
+    # then
+    assert elapsed >= 5 / 20 - 0.01
+    assert first._rate_limit_summary()["delayed_calls"] == 2
+    assert second._rate_limit_summary()["delayed_calls"] == 3
+    assert all(result["response_time_sec"] < 0.04 for route, result in second.results.items() if route.startswith("/api"))
+    assert second.results["/api/2"]["rate_limit_wait_sec"] > 0
+
+def test_wait_excluded_from_load_test_latency(make_tester):
+    # given
+    limiter = HostRateLimiter(rate=20, burst=1)
+
+    with StubServer() as stub:
+        api_tester = make_tester(stub.url, rate_limiter=limiter)
+        load_tester = LoadTester(api_tester, rps=100, duration_sec=0.1, max_in_flight=10)
+
+        # when
+        sent, wall_time = load_tester._run([{"method": "GET", "route": "/api"}])
+
+    # then
+    stats = load_tester.route_stats["/api"]
+    assert sent == 10
+    assert wall_time >= 9 / 20 - 0.01
+    assert stats["rate_limit_wait_sec"] >= 1.5
+    assert stats["latency"].summary()["max_sec"] < 0.1
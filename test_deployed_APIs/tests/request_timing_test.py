@@ -0,0 +1,97 @@
+import socket
+import threading
+import pytest
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from unittest.mock import patch
+
+from request_timing import RequestTimer, TimedHTTPAdapter
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"field1": "value1"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_phases_of_new_and_reused_connection(server_url):
+    # given
+    session = requests.Session()
+    session.mount("http://", TimedHTTPAdapter())
+
+    # when
+    with RequestTimer() as first_timer:
+        session.get(f"{server_url}/api")
+        first_phases = first_timer.phases(first_timer.headers_received_at)
+
+    with RequestTimer() as second_timer:
+        session.get(f"{server_url}/api")
+        second_phases = second_timer.phases(second_timer.headers_received_at)
+
+    # then
+    assert first_phases["connection_reused"] is False
+    assert first_timer.connected_at is not None
+    assert first_phases["tls_sec"] == 0.0
+    assert second_phases["connection_reused"] is True
+    assert second_phases["dns_sec"] == 0.0
+    assert second_phases["connect_sec"] == 0.0
+    assert second_phases["ttfb_sec"] >= 0
+
+
+def test_falls_back_to_the_next_resolved_address(server_url):
+    # given
+    port = int(server_url.rsplit(":", 1)[1])
+    resolve = socket.getaddrinfo
+
+    def dual_stack_getaddrinfo(host, *args, **kwargs):
+        # an unreachable address first, as for a dual-stack host with broken IPv6
+        if host == "dual-stack.test":
+            return [
+                (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", 1)),
+                (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", port))
+            ]
+        return resolve(host, *args, **kwargs)
+
+    session = requests.Session()
+    session.mount("http://", TimedHTTPAdapter())
+
+    # when
+    with patch("socket.getaddrinfo", side_effect=dual_stack_getaddrinfo):
+        with RequestTimer() as timer:
+            response = session.get(f"http://dual-stack.test:{port}/api")
+
+    # then
+    assert response.status_code == 200
+    assert timer.new_connection is True
+    assert timer.phases(timer.headers_received_at)["connection_reused"] is False
+
+def test_phases_not_observed_without_timed_adapter(requests_mock):
+    # given
+    requests_mock.get("https://example.com/api", json={})
+
+    # when
+    with RequestTimer() as timer:
+        requests.get("https://example.com/api")
+
+    # then
+    assert timer.phases(0.0) is None
@@ -0,0 +1,38 @@
+import json
+
+from result_writer import JsonlResultWriter
+
+
+def test_write_and_close_with_summary(tmp_path):
+    # given
+    sut = JsonlResultWriter("results.jsonl", directory=tmp_path)
+
+    # when
+    sut.write({"type": "call", "route": "/api1"})
+    sut.write({"type": "call", "route": "/api2"})
+    sut.close({"calls": 2})
+
+    # then
+    lines = (tmp_path / "results.jsonl").read_text().splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"type": "call", "route": "/api1"},
+        {"type": "call", "route": "/api2"},
+        {"type": "summary", "calls": 2}
+    ]
+    assert lines[0] == '{"type":"call","route":"/api1"}'
+
+def test_write_flushes_periodically(tmp_path):
+    # given
+    sut = JsonlResultWriter("results.jsonl", directory=tmp_path, flush_every=2)
+
+    # when
+    sut.write({"route": "/api1"})
+    content_before_flush = (tmp_path / "results.jsonl").read_text()
+    sut.write({"route": "/api2"})
+    content_after_flush = (tmp_path / "results.jsonl").read_text()
+    sut.close()
+
+    # then
+    assert content_before_flush == ""
+    assert len(content_after_flush.splitlines()) == 2
+    assert sut.pending_records == 0
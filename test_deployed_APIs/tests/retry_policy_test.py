@@ -0,0 +1,79 @@
+import pytest
+import requests
+from email.utils import formatdate
+from time import time
+
+from retry_policy import RetryPolicy, parse_retry_after
+
+
+def test_override():
+    # given
+    sut = RetryPolicy()
+
+    # when
+    res = sut.override({"max_attempts": 3, "retry_statuses": [429, 503], "read_timeout_sec": 5})
+
+    # then
+    assert res.max_attempts == 3
+    assert res.retry_statuses == (429, 503)
+    assert res.timeout == (10.0, 5)
+    assert sut.max_attempts == 1
+
+def test_override_unknown_field_raises():
+    # when & then
+    with pytest.raises(ValueError, match="Unknown retry policy fields: attempts"):
+        RetryPolicy().override({"attempts": 3})
+
+@pytest.mark.parametrize("overrides, error", [
+    ({"retry_exceptions": ["Timout"]}, "retry_exceptions Timout"),
+    ({"max_attempts": "3"}, "max_attempts '3'"),
+    ({"max_attempts": 0}, "max_attempts 0"),
+    ({"retry_statuses": 503}, "retry_statuses 503"),
+    ({"retry_statuses": ["503"]}, "retry_statuses"),
+    ({"read_timeout_sec": -1}, "read_timeout_sec -1"),
+    ({"respect_retry_after": "yes"}, "respect_retry_after"),
+    (["max_attempts"], "use an object")
+])
+def test_override_invalid_value_raises(overrides, error):
+    # when & then
+    with pytest.raises(ValueError, match=error):
+        RetryPolicy().override(overrides)
+
+def test_should_retry_exception():
+    # given
+    sut = RetryPolicy()
+
+    # when & then
+    assert sut.should_retry_exception(requests.exceptions.ConnectTimeout())
+    assert sut.should_retry_exception(requests.exceptions.ConnectionError())
+    assert not sut.should_retry_exception(requests.exceptions.InvalidURL())
+
+def test_backoff_is_jittered_and_capped():
+    # given
+    sut = RetryPolicy(backoff_base_sec=1, backoff_max_sec=3)
+
+    # when
+    waits = [sut.backoff(attempt) for attempt in range(1, 10) for _ in range(20)]
+
+    # then
+    assert all(0 <= wait <= 3 for wait in waits)
+    assert len(set(waits)) > 1
+
+def test_backoff_respects_retry_after():
+    # given
+    sut = RetryPolicy(backoff_max_sec=10)
+
+    # when & then
+    assert sut.backoff(1, "2") == 2.0
+    assert sut.backoff(1, "120") == 10
+
+def test_parse_retry_after_http_date():
+    # when
+    res = parse_retry_after(formatdate(time() + 60, usegmt=True))
+
+    # then
+    assert 55 <= res <= 61
+
+def test_parse_retry_after_invalid():
+    # when & then
+    assert parse_retry_after("soon") is None
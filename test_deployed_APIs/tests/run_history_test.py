@@ -0,0 +1,115 @@
+import pytest
+
+from latency_histogram import LatencyHistogram
+from run_history import RunHistory
+from stub_server import StubServer
+from test_deployed_APIs import history_command
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = RunHistory(str(tmp_path / "history" / "run_history.sqlite3"), batch_size=2)
+    yield history
+    history.close()
+
+def count_calls(history):
+    return history.connection.execute("SELECT COUNT(*) FROM calls").fetchone()[0]
+
+def record_run(history, response_times, route="/api/v1/orders"):
+    recorder = history.start_run("ms", "test", "suite")
+    histogram = LatencyHistogram()
+    for response_time in response_times:
+        recorder.add_call(route, "GET", 200, response_time)
+        histogram.record(response_time)
+    recorder.add_call(route, "GET", error="Connection refused")
+    recorder.finish(1.5, {route: histogram})
+    return recorder
+
+def test_calls_are_inserted_in_batches(history):
+    # given
+    recorder = history.start_run("ms", "test", "suite")
+
+    # when & then
+    recorder.add_call("/a", "GET", 200, 0.1)
+    assert count_calls(history) == 0
+    recorder.add_call("/a", "GET", 200, 0.2)
+    assert count_calls(history) == 2
+    recorder.add_call("/a", "GET", 200, 0.3)
+    recorder.finish(0.6, {})
+    assert count_calls(history) == 3
+
+def test_recent_runs(history):
+    # given
+    record_run(history, [0.1, 0.2])
+    last = record_run(history, [0.3])
+
+    # when
+    res = history.recent_runs("ms", "test", last_runs=1)
+
+    # then
+    assert len(res) == 1
+    assert res[0]["run_id"] == last.run_id
+    assert res[0]["calls"] == 2
+    assert res[0]["errors"] == 1
+    assert res[0]["wall_time_sec"] == 1.5
+    assert history.recent_runs("ms", "dev") == []
+
+def test_route_trend(history):
+    # given
+    record_run(history, [0.1, 0.2])
+    record_run(history, [0.4])
+    record_run(history, [0.5], route="/other")
+
+    # when
+    res = history.route_trend("ms", "test", "/api/v1/orders", last_runs=30)
+
+    # then
+    assert [run["count"] for run in res] == [2, 3]
+    assert [run["errors"] for run in res] == [1, 1]
+    assert res[0]["p95_sec"] == pytest.approx(0.4, rel=0.01)
+
+def test_route_percentile_over_last_runs(history):
+    # given
+    record_run(history, [5.0] * 10)
+    record_run(history, [0.01 * index for index in range(1, 101)])
+
+    # when & then
+    assert history.route_percentile("ms", "test", "/api/v1/orders", 0.95, last_runs=1) == pytest.approx(0.95)
+    assert history.route_percentile("ms", "test", "/api/v1/orders", 0.95, last_runs=2) == 5.0
+    assert history.route_percentile("ms", "test", "/unknown", 0.95) is None
+
+def test_api_tester_appends_calls(history, make_tester):
+    # given
+    apis = [{"method": "GET", "route": "/api/v1/resource"}, {"method": "GET", "route": "/status/500"}]
+
+    with StubServer() as stub:
+        api_tester = make_tester(stub.url, env="test", history=history)
+        api_tester.history_recorder = history.start_run("ms", "test", "suite")
+
+        # when
+        api_tester._call_all_apis(apis)
+        api_tester.history_recorder.finish(0.1, api_tester.latency_histograms)
+
+    # then
+    rows = history.connection.execute("SELECT route, method, status_code FROM calls ORDER BY route").fetchall()
+    assert rows == [("/api/v1/resource", "GET", 200), ("/status/500", "GET", 500)]
+    assert history.route_trend("ms", "test", "/status/500")[0]["count"] == 1
+
+def test_history_command(history, capsys):
+    # given
+    record_run(history, [0.1, 0.2, 0.3])
+
+    # when
+    res = history_command(["--ms", "ms", "--env", "test", "--route", "/api/v1/orders", "--history-db", history.db_path])
+
+    # then
+    assert res is True
+    assert "/api/v1/orders: p95 0.3s over the calls of the last 1 runs" in capsys.readouterr().out
+
+def test_history_command_missing_database(tmp_path, capsys):
+    # when
+    res = history_command(["--ms", "ms", "--env", "test", "--history-db", str(tmp_path / "missing.sqlite3")])
+
+    # then
+    assert res is False
+    assert "not found" in capsys.readouterr().out
@@ -0,0 +1,158 @@
+import json
+import os
+import pytest
+
+from api_tester import APITester
+from api_tester_config import APITesterConfig
+from baseline import BaselineComparator
+from scenario_runner import ScenarioRunner, step_dependencies, validate_scenario
+
+
+ORDER_SCENARIO = {
+    "name": "order_flow",
+    "steps": [
+        {"id": "create_order", "method": "POST", "route": "/orders", "body": {"item": "shoes"}, "extract": {"order_id": "$.payload.id"}},
+        {"id": "read_order", "route": "/orders/{order_id}"},
+        {"id": "update_order", "method": "PUT", "route": "/orders/{order_id}", "body": {"id": "{order_id}", "status": "paid"}},
+        {"id": "read_updated_order", "route": "/orders/{order_id}/status", "depends_on": ["update_order"]},
+        {"id": "list_customers", "route": "/customers"}
+    ]
+}
+
+
+def test_step_dependencies():
+    # when
+    res = step_dependencies(ORDER_SCENARIO)
+
+    # then
+    assert res == {
+        "create_order": set(),
+        "read_order": {"create_order"},
+        "update_order": {"create_order"},
+        "read_updated_order": {"create_order", "update_order"},
+        "list_customers": set()
+    }
+
+def test_validate_scenario_missing_variable_raises():
+    # when & then
+    with pytest.raises(ValueError, match="no step extracts order_id"):
+        validate_scenario({"name": "broken", "steps": [{"id": "read_order", "route": "/orders/{order_id}"}]})
+
+def test_validate_scenario_cycle_raises():
+    # given
+    scenario = {"name": "cycle", "steps": [
+        {"id": "a", "route": "/a", "depends_on": ["b"]},
+        {"id": "b", "route": "/b", "depends_on": ["a"]}
+    ]}
+
+    # when & then
+    with pytest.raises(ValueError, match="dependency cycle"):
+        validate_scenario(scenario)
+
+def test_validate_scenario_unknown_dependency_raises():
+    # when & then
+    with pytest.raises(ValueError, match="unknown dependencies c"):
+        validate_scenario({"name": "unknown", "steps": [{"id": "a", "route": "/a", "depends_on": ["c"]}]})
+
+def test_validate_scenario_invalid_policy_raises():
+    # when & then
+    with pytest.raises(ValueError, match="step 'a'.*Unknown retry policy fields: max_retries"):
+        validate_scenario({"name": "policies", "steps": [{"id": "a", "route": "/a", "retry_policy": {"max_retries": 3}}]})
+
+
+@pytest.mark.usefixtures("requests_mock")
+class TestScenarioRunner:
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.config = APITesterConfig("https://example.com", "https://example.com/auth", "https://sessionmanager.com", {}, {}, {}, {}, "Basic dXNlcjpwYXNz")
+        self.api_tester = APITester(self.config, "fake_dir.json", "ms", "dev")
+        self.sut = ScenarioRunner(self.api_tester, max_workers=4)
+
+    def test_run_chains_extracted_values(self, requests_mock):
+        # given
+        requests_mock.post(f"{self.config.base_url}/orders", json={"payload": {"id": 42}})
+        requests_mock.get(f"{self.config.base_url}/orders/42", json={"id": 42})
+        update_mock = requests_mock.put(f"{self.config.base_url}/orders/42", json={"id": 42, "status": "paid"})
+        requests_mock.get(f"{self.config.base_url}/orders/42/status", json={"status": "paid"})
+        requests_mock.get(f"{self.config.base_url}/customers", json=[])
+
+        # when
+        self.sut.run([ORDER_SCENARIO])
+
+        # then
+        assert {step_id: step["state"] for step_id, step in self.sut.report["order_flow"].items()} == {
+            "create_order": "passed",
+            "read_order": "passed",
+            "update_order": "passed",
+            "read_updated_order": "passed",
+            "list_customers": "passed"
+        }
+        assert update_mock.last_request.json() == {"id": 42, "status": "paid"}
+        assert self.api_tester.status_log["200"].count("/orders/42") == 2
+
+        sent_requests = [(request.method, request.path) for request in requests_mock.request_history]
+        assert sent_requests.index(("POST", "/orders")) < sent_requests.index(("GET", "/orders/42"))
+        assert sent_requests.index(("PUT", "/orders/42")) < sent_requests.index(("GET", "/orders/42/status"))
+
+    def test_run_skips_dependents_of_failed_step(self, requests_mock):
+        # given
+        requests_mock.post(f"{self.config.base_url}/orders", status_code=500, json={})
+        requests_mock.get(f"{self.config.base_url}/customers", json=[])
+
+        # when
+        self.sut.run([ORDER_SCENARIO])
+
+        # then
+        report = self.sut.report["order_flow"]
+        assert report["create_order"]["state"] == "failed"
+        assert report["list_customers"]["state"] == "passed"
+        assert report["read_order"]["state"] == "skipped"
+        assert report["read_updated_order"]["state"] == "skipped"
+
+    def test_run_fails_step_when_extraction_fails(self, requests_mock):
+        # given
+        requests_mock.post(f"{self.config.base_url}/orders", json={"payload": {}})
+        requests_mock.get(f"{self.config.base_url}/customers", json=[])
+
+        # when
+        self.sut.run([ORDER_SCENARIO])
+
+        # then
+        assert self.sut.report["order_flow"]["create_order"]["state"] == "failed"
+        assert "Cannot extract 'order_id'" in self.sut.report["order_flow"]["create_order"]["error"]
+
+    def test_run_and_save_results_streams_jsonl(self, tmp_path, monkeypatch, requests_mock):
+        # given
+        monkeypatch.chdir(tmp_path)
+        api_tester = APITester(self.config, str(tmp_path), "ms", "dev", stream_results=True)
+        requests_mock.get(f"{self.config.base_url}/customers", json=[])
+
+        # when
+        ScenarioRunner(api_tester).run_and_save_results([{"name": "customers", "steps": [{"id": "list_customers", "route": "/customers"}]}])
+
+        # then
+        assert sorted(os.listdir(tmp_path / "api_results")) == [
+            "api_responses_ms_dev.jsonl",
+            "api_scenarios_ms_dev.json",
+            "api_status_ms_dev.json"
+        ]
+        with open(tmp_path / "api_results" / "api_responses_ms_dev.jsonl") as file:
+            call_line, summary_line = [json.loads(line) for line in file]
+        assert call_line["route"] == "/customers"
+        assert summary_line["type"] == "summary" and summary_line["calls"] == 1
+
+    def test_run_and_save_results_checks_baseline_latency(self, tmp_path, monkeypatch, requests_mock):
+        # given
+        monkeypatch.chdir(tmp_path)
+        baseline = BaselineComparator({"/customers": {"status_code": 200, "latency": {"p95_sec": 0.0}}}, p95_min_delta_sec=0)
+        api_tester = APITester(self.config, str(tmp_path), "ms", "dev", baseline=baseline)
+        requests_mock.get(f"{self.config.base_url}/customers", json=[])
+
+        # when
+        ScenarioRunner(api_tester).run_and_save_results([{"name": "customers", "steps": [{"id": "list_customers", "route": "/customers"}]}])
+
+        # then
+        assert "/customers" in baseline.latency_regressions
+        with open(tmp_path / "api_results" / "api_baseline_ms_dev.json") as file:
+            assert json.load(file)["has_regressions"]
@@ -0,0 +1,179 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+
+from latency_histogram import LatencyHistogram
+from shard import filter_shard, merge_shard_results, parse_shard, shard_of, shard_suffix
+from stub_server import StubServer
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SHARD_RUNNER = """
+import sys
+from api_tester import APITester
+from api_tester_config import APITesterConfig
+from shard import parse_shard
+
+config = APITesterConfig(sys.argv[1], "", "", {}, {}, {}, {}, "")
+shard = parse_shard(sys.argv[2]) if len(sys.argv) > 2 and sys.argv[2] != "-" else None
+APITester(config, ".", "ms", "dev", shard=shard, stream_results="--jsonl" in sys.argv).call_apis_and_save_results()
+"""
+
+APIS_TO_TEST = [{"method": "GET", "route": f"/api/v1/resource{index}"} for index in range(20)] + [
+    {"method": "GET", "route": "/status/500"},
+    {"method": "POST", "route": "/status/404", "body": {"field1": "value1"}}
+]
+
+
+@pytest.mark.parametrize("shard, expected", [("1/4", (1, 4)), ("4/4", (4, 4))])
+def test_parse_shard(shard, expected):
+    # when & then
+    assert parse_shard(shard) == expected
+
+@pytest.mark.parametrize("shard", ["0/4", "5/4", "1", "a/b"])
+def test_parse_shard_invalid_raises(shard):
+    # when & then
+    with pytest.raises(ValueError, match="Invalid shard"):
+        parse_shard(shard)
+
+def test_shard_suffix():
+    # when & then
+    assert shard_suffix((2, 4)) == "_shard2of4"
+    assert shard_suffix(None) == ""
+
+def test_filter_shard_partitions_routes():
+    # when
+    shards = [list(filter_shard(APIS_TO_TEST, (index, 3))) for index in range(1, 4)]
+
+    # then
+    assert sorted(api_info["route"] for shard in shards for api_info in shard) == sorted(api_info["route"] for api_info in APIS_TO_TEST)
+    assert all(shard_of(api_info, 3) == index + 1 for index, shard in enumerate(shards) for api_info in shard)
+
+def test_filter_shard_keeps_template_cases_together():
+    # given
+    api_cases = [{"method": "GET", "route": f"/customers/{index}", "route_template": "/customers/{id}"} for index in range(20)]
+
+    # when
+    shards = [list(filter_shard(api_cases, (index, 4))) for index in range(1, 5)]
+
+    # then
+    assert sorted(len(shard) for shard in shards) == [0, 0, 0, 20]
+
+def test_merge_missing_shard_raises(tmp_path):
+    # given
+    (tmp_path / "api_status_ms_dev_shard1of2.json").write_text("{}")
+
+    # when & then
+    with pytest.raises(FileNotFoundError, match="_shard2of2"):
+        merge_shard_results("ms", "dev", str(tmp_path))
+
+def test_merge_mismatched_shard_counts_raises(tmp_path):
+    # given
+    for suffix in ("_shard1of2", "_shard2of2", "_shard3of4"):
+        (tmp_path / f"api_status_ms_dev{suffix}.json").write_text("{}")
+
+    # when & then
+    with pytest.raises(ValueError, match="different numbers of shards \\(2, 4\\)"):
+        merge_shard_results("ms", "dev", str(tmp_path))
+
+def test_merge_missing_shard_file_raises(tmp_path):
+    # given
+    for index in (1, 2):
+        (tmp_path / f"api_status_ms_dev_shard{index}of2.json").write_text("{}")
+        (tmp_path / f"api_responses_ms_dev_shard{index}of2.json").write_text("{}")
+    (tmp_path / "api_latency_ms_dev_shard1of2.json").write_text('{"routes": {}}')
+    (tmp_path / "api_transfer_ms_dev_shard1of2.json").write_text('{"accept_encoding": "gzip", "routes": {}}')
+
+    # when & then
+    with pytest.raises(FileNotFoundError, match="api_latency_ms_dev_shard2of2.json"):
+        merge_shard_results("ms", "dev", str(tmp_path))
+
+def test_merge_mixed_response_formats_raises(tmp_path):
+    # given
+    for index in (1, 2):
+        (tmp_path / f"api_status_ms_dev_shard{index}of2.json").write_text("{}")
+    (tmp_path / "api_responses_ms_dev_shard1of2.json").write_text("{}")
+    (tmp_path / "api_responses_ms_dev_shard2of2.jsonl").write_text("")
+
+    # when & then
+    with pytest.raises(ValueError, match="mix .json and .jsonl"):
+        merge_shard_results("ms", "dev", str(tmp_path))
+
+def run_in_process(run_dir, *args):
+    os.makedirs(run_dir / "api_configs", exist_ok=True)
+    (run_dir / "api_configs" / "apis_to_test.json").write_text(json.dumps(APIS_TO_TEST))
+    return subprocess.Popen(
+        [sys.executable, "-c", SHARD_RUNNER, *args],
+        cwd=run_dir,
+        env={**os.environ, "PYTHONPATH": PACKAGE_DIR},
+        stdout=subprocess.DEVNULL
+    )
+
+def read_results(run_dir, filename):
+    with open(run_dir / "api_results" / filename) as file:
+        return json.load(file)
+
+def test_shard_processes_merge_into_single_run_outputs(tmp_path):
+    # given
+    single_dir = tmp_path / "single"
+    sharded_dir = tmp_path / "sharded"
+
+    with StubServer() as server:
+        processes = [run_in_process(single_dir, server.url)]
+        processes += [run_in_process(sharded_dir, server.url, f"{index}/3") for index in range(1, 4)]
+
+        # when
+        assert all(process.wait(timeout=60) == 0 for process in processes)
+        merge_shard_results("ms", "dev", str(sharded_dir / "api_results"))
+
+    # then
+    single_results = read_results(single_dir, "api_responses_ms_dev.json")
+    merged_results = read_results(sharded_dir, "api_responses_ms_dev.json")
+    assert merged_results.keys() == single_results.keys()
+    assert all(merged_results[route]["response"] == single_results[route]["response"] for route in single_results if route not in ("microservice", "env"))
+
+    single_status = read_results(single_dir, "api_status_ms_dev.json")
+    merged_status = read_results(sharded_dir, "api_status_ms_dev.json")
+    assert sorted(merged_status["200"]) == sorted(single_status["200"])
+    assert merged_status["500"] == single_status["500"] == ["/status/500"]
+    assert merged_status["Other"] == single_status["Other"] == {"/status/404": "404"}
+
+    merged_latency = read_results(sharded_dir, "api_latency_ms_dev.json")
+    assert sum(LatencyHistogram.from_dict(histogram).total_count for histogram in merged_latency["routes"].values()) == len(APIS_TO_TEST)
+
+    single_transfer = read_results(single_dir, "api_transfer_ms_dev.json")
+    merged_transfer = read_results(sharded_dir, "api_transfer_ms_dev.json")
+    assert merged_transfer["routes"] == single_transfer["routes"]
+    assert merged_transfer["wire_bytes"] == single_transfer["wire_bytes"]
+    assert merged_transfer["decoded_bytes"] == single_transfer["decoded_bytes"]
+    assert merged_transfer["accept_encoding"] == single_transfer["accept_encoding"]
+    assert len(merged_transfer["heaviest_routes"]) == len(single_transfer["heaviest_routes"]) == 10
+
+def read_jsonl(run_dir, filename):
+    with open(run_dir / "api_results" / filename) as file:
+        return [json.loads(line) for line in file]
+
+def test_jsonl_shards_merge_into_single_run_outputs(tmp_path):
+    # given
+    single_dir = tmp_path / "single"
+    sharded_dir = tmp_path / "sharded"
+
+    with StubServer() as server:
+        processes = [run_in_process(single_dir, server.url, "-", "--jsonl")]
+        processes += [run_in_process(sharded_dir, server.url, f"{index}/2", "--jsonl") for index in range(1, 3)]
+
+        # when
+        assert all(process.wait(timeout=60) == 0 for process in processes)
+        merge_shard_results("ms", "dev", str(sharded_dir / "api_results"))
+
+    # then
+    single_lines = read_jsonl(single_dir, "api_responses_ms_dev.jsonl")
+    merged_lines = read_jsonl(sharded_dir, "api_responses_ms_dev.jsonl")
+    assert sorted(line["route"] for line in merged_lines[:-1]) == sorted(line["route"] for line in single_lines[:-1])
+    assert merged_lines[-1]["type"] == "summary"
+    assert merged_lines[-1]["calls"] == single_lines[-1]["calls"] == len(APIS_TO_TEST)
+    assert merged_lines[-1]["status"] == single_lines[-1]["status"]
+    assert merged_lines[-1]["latency"]["count"] == len(APIS_TO_TEST)
+    assert not (sharded_dir / "api_results" / "api_responses_ms_dev.json").exists()
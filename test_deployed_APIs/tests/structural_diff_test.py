@@ -0,0 +1,68 @@
+from structural_diff import diff_structures, hash_tree
+
+
+def test_hash_tree_ignores_key_order():
+    # when & then
+    assert hash_tree({"a": 1, "b": [1, 2]}).digest == hash_tree({"b": [1, 2], "a": 1}).digest
+
+def test_hash_tree_list_order_matters():
+    # when & then
+    assert hash_tree([1, 2]).digest != hash_tree([2, 1]).digest
+
+def test_diff_equal_structures():
+    # when
+    res = diff_structures({"a": {"b": [1, 2, 3]}}, {"a": {"b": [1, 2, 3]}})
+
+    # then
+    assert res == []
+
+def test_diff_changed_added_removed():
+    # given
+    baseline = {"id": 1, "items": [{"name": "x"}, {"name": "y"}], "old": True}
+    current = {"id": 1, "items": [{"name": "x"}, {"name": "z"}, {"name": "w"}], "new": "value"}
+
+    # when
+    res = diff_structures(baseline, current)
+
+    # then
+    assert res == [
+        {"path": "$.items[1].name", "change": "changed", "baseline": "y", "current": "z"},
+        {"path": "$.items[2]", "change": "added", "baseline": None, "current": {"name": "w"}},
+        {"path": "$.old", "change": "removed", "baseline": True, "current": None},
+        {"path": "$.new", "change": "added", "baseline": None, "current": "value"}
+    ]
+
+def test_diff_type_change():
+    # when
+    res = diff_structures({"a": [1]}, {"a": {"0": 1}})
+
+    # then
+    assert res == [{"path": "$.a", "change": "changed", "baseline": [1], "current": {"0": 1}}]
+
+def test_diff_max_differences():
+    # when
+    res = diff_structures(list(range(10)), list(range(10, 20)), max_differences=3)
+
+    # then
+    assert len(res) == 3
+
+def test_diff_ignored_paths():
+    # given
+    baseline = {"id": 1, "generated_at": "t1", "meta": {"trace": "a"}, "items": [{"id": 1, "etag": "x"}, {"id": 2, "etag": "y"}]}
+    current = {"id": 2, "generated_at": "t2", "meta": {"trace": "b", "extra": True}, "items": [{"id": 1, "etag": "z"}, {"id": 3, "etag": "w"}]}
+
+    # when
+    res = diff_structures(baseline, current, ignored_paths=["$.generated_at", "$.meta", "$.items[*].etag"])
+
+    # then
+    assert res == [
+        {"path": "$.id", "change": "changed", "baseline": 1, "current": 2},
+        {"path": "$.items[1].id", "change": "changed", "baseline": 2, "current": 3}
+    ]
+
+def test_diff_ignored_paths_match_whole_segments():
+    # when
+    res = diff_structures({"id": 1, "identifier": "a"}, {"id": 2, "identifier": "b"}, ignored_paths=["$.id"])
+
+    # then
+    assert res == [{"path": "$.identifier", "change": "changed", "baseline": "a", "current": "b"}]
@@ -0,0 +1,39 @@
+import pytest
+
+from templating import extract_path, find_placeholders, render_template
+
+
+def test_find_placeholders():
+    # when
+    res = find_placeholders({"route": "/orders/{order_id}", "body": {"items": ["{item_id}", 3]}, "query_params": {}})
+
+    # then
+    assert res == {"order_id", "item_id"}
+
+def test_render_template():
+    # given
+    variables = {"order_id": 42, "name": "shoes"}
+
+    # when
+    res = render_template({"route": "/orders/{order_id}/items", "body": {"id": "{order_id}", "label": "{name}-{order_id}", "other": "{unknown}"}}, variables)
+
+    # then
+    assert res == {"route": "/orders/42/items", "body": {"id": 42, "label": "shoes-42", "other": "{unknown}"}}
+
+def test_extract_path():
+    # given
+    data = {"payload": {"items": [{"id": 1}, {"id": 2}]}}
+
+    # when & then
+    assert extract_path(data, "$.payload.items[1].id") == 2
+    assert extract_path(data, "$") == data
+
+def test_extract_path_missing_key_raises():
+    # when & then
+    with pytest.raises(KeyError):
+        extract_path({"payload": {}}, "$.payload.id")
+
+def test_extract_path_invalid_raises():
+    # when & then
+    with pytest.raises(ValueError, match="must start with"):
+        extract_path({}, "payload.id")
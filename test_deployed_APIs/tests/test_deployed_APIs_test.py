@@ -1,7 +1,8 @@
 import os
 
 from unittest.mock import patch
-from test_deployed_APIs import get_dot_env_file_name, clear_env, load_configurations, check_config_variables, retrieve_configs_from_env_file
+from argparse import Namespace
+from test_deployed_APIs import get_dot_env_file_name, load_configurations, check_config_variables, retrieve_configs_from_env_file, run_api_tests
 from api_tester_config import APITesterConfig
 
 def test_get_dot_env_file_name():
@@ -15,36 +16,50 @@ def test_get_dot_env_file_name():
     # then
     assert res == f".env.{microservice}.{env}"
 
+@patch("os.path.exists")
 @patch("test_deployed_APIs.dotenv_values")
-@patch.dict(os.environ, {"VAR1": "123", "VAR2": "456", "VAR3": "789"}, clear=True)
-def test_clear_env(mock_dotenv_values):
+@patch.dict(os.environ, {}, clear=True)
+def test_load_configurations_correctly(mock_dotenv_values, mock_path_exists):
     # given
+    mock_path_exists.return_value = True
     mock_dotenv_values.return_value = {
-        "VAR1": "value1",
-        "VAR2": "value2"
+        "BASE_URL": "fake_data",
+        "AUTH_URL": "fake_data",
+        "SESSION_MANAGER_URL": "fake_data",
+        "AUTH_PAYLOAD": '{"fake_field": "fake_value"}',
+        "AUTH_BASIC_AUTH_HEADER": "fake_data",
+        "SESSION_MANAGER_PAYLOAD": '{"fake_field": "fake_value"}'
     }
 
     # when
-    clear_env("ms", "dev", "fake_path")
+    res = load_configurations("ms", "dev", "fake_path")
 
     # then
-    assert "VAR1" not in os.environ
-    assert "VAR2" not in os.environ
-    assert "VAR3" in os.environ
+    assert res == APITesterConfig(
+        "fake_data",
+        "fake_data",
+        "fake_data",
+        {"fake_field": "fake_value"},
+        {"fake_field": "fake_value"},
+        {},
+        {},
+        "fake_data"
+    )
+    assert os.environ == {}
 
 @patch("os.path.exists")
-@patch("test_deployed_APIs.load_dotenv")
-def test_load_configurations_correctly(mock_path_exists, mock_load_env):
+@patch("test_deployed_APIs.dotenv_values")
+def test_load_configurations_missing_variables(mock_dotenv_values, mock_path_exists):
     # given
     mock_path_exists.return_value = True
-    mock_load_env.return_value = True
+    mock_dotenv_values.return_value = {"BASE_URL": "fake_data"}
 
     # when
     res = load_configurations("ms", "dev", "fake_path")
 
     # then
-    assert res == True
-    
+    assert res is None
+
 @patch("os.path.exists")
 def test_load_configurations_not_found(mock_path_exists):
     # given
@@ -54,79 +69,87 @@ def test_load_configurations_not_found(mock_path_exists):
     res = load_configurations("ms", "dev", "fake_path")
 
     # then
-    assert res == False
+    assert res is None
 
-@patch.dict(os.environ, {
-    "BASE_URL": "fake_data",
-    "AUTH_URL": "fake_data",
-    "SESSION_MANAGER_URL": "fake_data",
-    "AUTH_PAYLOAD": "fake_data",
-    "AUTH_BASIC_AUTH_HEADER": "fake_data",
-    "SESSION_MANAGER_PAYLOAD": "fake_data"
-    }, clear=True)
 def test_check_config_variables_normal_ms_correctly():
+    # given
+    env_vars = {
+        "BASE_URL": "fake_data",
+        "AUTH_URL": "fake_data",
+        "SESSION_MANAGER_URL": "fake_data",
+        "AUTH_PAYLOAD": "fake_data",
+        "AUTH_BASIC_AUTH_HEADER": "fake_data",
+        "SESSION_MANAGER_PAYLOAD": "fake_data"
+    }
+
     # when
-    res = check_config_variables("ms", "dev")
+    res = check_config_variables("ms", "dev", env_vars)
 
     # then
     assert res == True
     
-@patch.dict(os.environ, {
-    "BASE_URL": "fake_data",
-    "SESSION_MANAGER_URL": "fake_data",
-    "AUTH_BASIC_AUTH_HEADER": "fake_data",
-    "SESSION_MANAGER_PAYLOAD": "fake_data"
-    }, clear=True)
 def test_check_config_variables_normal_ms_env_vars_not_defined():
+    # given
+    env_vars = {
+        "BASE_URL": "fake_data",
+        "SESSION_MANAGER_URL": "fake_data",
+        "AUTH_BASIC_AUTH_HEADER": "fake_data",
+        "SESSION_MANAGER_PAYLOAD": "fake_data"
+    }
+
     # when
-    res = check_config_variables("ms", "dev")
+    res = check_config_variables("ms", "dev", env_vars)
 
     # then
     assert res == False
 
-@patch.dict(os.environ, {
-    "BASE_URL": "fake_data",
-    "AUTH_URL": "fake_data",
-    "SESSION_MANAGER_URL": "fake_data",
-    "AUTH_PAYLOAD": "fake_data",
-    "AUTH_BASIC_AUTH_HEADER": "fake_data",
-    "GOLIA_SESSION_MANAGER_CREATE_PAYLOAD": "fake_data",
-    "GOLIA_SESSION_MANAGER_UPDATE_PAYLOAD": "fake_data"
-    }, clear=True)
 def test_check_config_variables_golia_correctly():
+    # given
+    env_vars = {
+        "BASE_URL": "fake_data",
+        "AUTH_URL": "fake_data",
+        "SESSION_MANAGER_URL": "fake_data",
+        "AUTH_PAYLOAD": "fake_data",
+        "AUTH_BASIC_AUTH_HEADER": "fake_data",
+        "GOLIA_SESSION_MANAGER_CREATE_PAYLOAD": "fake_data",
+        "GOLIA_SESSION_MANAGER_UPDATE_PAYLOAD": "fake_data"
+    }
+
     # when
-    res = check_config_variables("golia", "dev")
+    res = check_config_variables("golia", "dev", env_vars)
 
     # then
     assert res == True
 
-@patch.dict(os.environ, {
-    "BASE_URL": "fake_data",
-    "SESSION_MANAGER_URL": "fake_data",
-    "AUTH_BASIC_AUTH_HEADER": "fake_data",
-    "SESSION_MANAGER_PAYLOAD": "fake_data",
-    "GOLIA_SESSION_MANAGER_CREATE_PAYLOAD": "fake_data"
-    }, clear=True)
 def test_check_config_variables_golia_env_vars_not_defined():
+    # given
+    env_vars = {
+        "BASE_URL": "fake_data",
+        "SESSION_MANAGER_URL": "fake_data",
+        "AUTH_BASIC_AUTH_HEADER": "fake_data",
+        "SESSION_MANAGER_PAYLOAD": "fake_data",
+        "GOLIA_SESSION_MANAGER_CREATE_PAYLOAD": "fake_data"
+    }
+
     # when
-    res = check_config_variables("golia", "dev")
+    res = check_config_variables("golia", "dev", env_vars)
 
     # then
     assert res == False
 
-@patch.dict(os.environ, {
-    "BASE_URL": "fake_data",
-    "AUTH_URL": "fake_data",
-    "SESSION_MANAGER_URL": "fake_data",
-    "AUTH_PAYLOAD": '{"fake_field": "fake_value"}',
-    "AUTH_BASIC_AUTH_HEADER": "fake_data",
-    "SESSION_MANAGER_PAYLOAD": '{"fake_field": "fake_value"}'
-    }, clear=True)
 def test_retrieve_configs_from_env_file():
     # given
+    env_vars = {
+        "BASE_URL": "fake_data",
+        "AUTH_URL": "fake_data",
+        "SESSION_MANAGER_URL": "fake_data",
+        "AUTH_PAYLOAD": '{"fake_field": "fake_value"}',
+        "AUTH_BASIC_AUTH_HEADER": "fake_data",
+        "SESSION_MANAGER_PAYLOAD": '{"fake_field": "fake_value"}'
+    }
 
     # when
-    res = retrieve_configs_from_env_file()
+    res = retrieve_configs_from_env_file(env_vars)
 
     # then
     assert res == APITesterConfig(
@@ -138,4 +161,19 @@ def test_retrieve_configs_from_env_file():
         {},
         {},
         "fake_data"
-    )
\ No newline at end of file
+    )
+@patch("test_deployed_APIs.load_configurations")
+def test_run_api_tests_invalid_scenarios_fail_before_login(mock_load_configurations, tmp_path):
+    # given
+    mock_load_configurations.return_value = APITesterConfig("https://example.com", "https://example.com/auth", "", {}, {}, {}, {}, "")
+    scenarios_file = tmp_path / "scenarios.json"
+    scenarios_file.write_text('[{"name": "cycle", "steps": [{"id": "a", "route": "/a", "depends_on": ["b"]}, {"id": "b", "route": "/b", "depends_on": ["a"]}]}]')
+    args = Namespace(pool_size=None, rps=None, find_capacity=False, max_in_flight=10, concurrency=None, slow_threshold=None, jsonl=False, body_policy="full", shard=None, pool_block=False, no_verify_tls=False, accept_encoding=None, baseline=None, watch=None, scenarios=str(scenarios_file))
+
+    with patch("api_tester.APITester.authenticate") as mock_authenticate:
+        # when
+        res = run_api_tests("ms", "dev", str(tmp_path), args)
+
+    # then
+    assert res is False
+    mock_authenticate.assert_not_called()